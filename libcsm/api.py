@@ -24,16 +24,25 @@
 """
 Submodule for interacting with CSM API services.
 """
+from json import dumps
 from json import loads
+from threading import Lock
+from time import monotonic
+from time import time
+from typing import NamedTuple
+import os
 
 from urllib import request
 from urllib.parse import urlencode
 import base64
-from kubernetes import client
-from kubernetes import config
 from urllib3.exceptions import MaxRetryError
 
+from libcsm.os import atomic_write
+from libcsm.os import file_lock
+
 SECRET = 'admin-client-auth'
+TOKEN_REFRESH_MARGIN = 30
+TOKEN_FILE_VARIABLE = 'LIBCSM_TOKEN_CACHE'
 
 
 class AuthException(Exception):
@@ -50,23 +59,190 @@ class AuthException(Exception):
         super().__init__(self.message)
 
 
+class _CachedToken(NamedTuple):
+    """
+    A token and the monotonic time it expires at, if known.
+    """
+
+    token: str
+    expires_at: [float, None]
+
+
+class TokenCache:
+    """
+    A process-wide cache of API tokens, keyed by token endpoint and client ID.
+
+    Tokens are only cached when the token response includes ``expires_in``,
+    and are considered stale ``refresh_margin`` seconds before they expire so
+    callers refresh ahead of the identity provider rejecting them. Concurrent
+    fetches for the same key share a lock, so only one caller performs the
+    round trip while the rest wait for and reuse its result.
+
+    The client credentials read from Kubernetes are cached too, keyed by the
+    Kubernetes configuration they were read with, so the secret is read once
+    per process rather than once per ``Auth``.
+    """
+
+    def __init__(self, refresh_margin: float = TOKEN_REFRESH_MARGIN) -> None:
+        """
+        :param refresh_margin: Seconds before expiry that a token is treated as stale.
+        """
+        self.refresh_margin = refresh_margin
+        self._tokens = {}
+        self._credentials = {}
+        self._locks = {}
+        self._lock = Lock()
+
+    def _key_lock(self, key: tuple) -> Lock:
+        """
+        Return the lock serializing fetches for ``key``.
+
+        :param key: The cache key.
+        """
+        with self._lock:
+            return self._locks.setdefault(key, Lock())
+
+    def get(self, key: tuple) -> [_CachedToken, None]:
+        """
+        Return the cached token for ``key`` if it is still fresh.
+
+        :param key: The cache key.
+        :returns: The cached token, or ``None`` if it is missing or stale.
+        """
+        cached = self._tokens.get(key)
+        if cached is None or monotonic() >= cached.expires_at - self.refresh_margin:
+            return None
+        return cached
+
+    def fetch(self, key: tuple, fetcher, force: bool = False, rejected: str = None) -> _CachedToken:
+        """
+        Return a fresh token for ``key``, calling ``fetcher`` only if needed.
+
+        ``fetcher`` must return a tuple of the token and its lifetime in
+        seconds (or ``None`` if the lifetime is unknown, in which case the
+        token is returned but not cached).
+
+        :param key: The cache key.
+        :param fetcher: Callable performing the token request.
+        :param force: Fetch a new token even if the cached one is fresh.
+        :param rejected: With ``force``, only fetch if the cached token is this one,
+                         so callers that were all rejected with the same token
+                         share the first caller's new token.
+        :returns: The token.
+        """
+        with self._key_lock(key):
+            cached = self.get(key)
+            if cached is not None and not (force and rejected in (None, cached.token)):
+                return cached
+            token, expires_in = fetcher()
+            if expires_in is None:
+                self._tokens.pop(key, None)
+                return _CachedToken(token, None)
+            cached = _CachedToken(token, monotonic() + expires_in)
+            self._tokens[key] = cached
+            return cached
+
+    def credentials(self, key: str, loader) -> tuple:
+        """
+        Return the cached client credentials for ``key``, calling ``loader`` only if needed.
+
+        :param key: The Kubernetes configuration the credentials are read with.
+        :param loader: Callable reading the credentials, only called once per ``key``.
+        :returns: The credentials.
+        """
+        with self._key_lock(('credentials', key)):
+            if key not in self._credentials:
+                self._credentials[key] = loader()
+            return self._credentials[key]
+
+    def forget_credentials(self, key: str) -> None:
+        """
+        Drop the cached client credentials for ``key``, e.g. after they were rejected.
+
+        :param key: The Kubernetes configuration the credentials were read with.
+        """
+        self._credentials.pop(key, None)
+
+    def seed(self, key: tuple, token: _CachedToken) -> None:
+        """
+        Store a token obtained elsewhere, e.g. from a token file.
+
+        :param key: The cache key.
+        :param token: The token to store.
+        """
+        with self._key_lock(key):
+            cached = self._tokens.get(key)
+            if cached is None or cached.expires_at < token.expires_at:
+                self._tokens[key] = token
+
+    def invalidate(self, key: tuple = None) -> None:
+        """
+        Drop the cached token for ``key``, or every cached token and credential.
+
+        :param key: The cache key, or ``None`` to clear the cache.
+        """
+        if key is None:
+            self._tokens.clear()
+            self._credentials.clear()
+        else:
+            self._tokens.pop(key, None)
+
+
+TOKEN_CACHE = TokenCache()
+
+
 class Auth:
     """
     Class for handling CSM API credentials stored in Kubernetes secrets.
 
     The initialization of this class passes any provided arguments along to
     ``kubernetes.config.load_kube_config``, allowing a user to override the config
-    location.
+    location. The Kubernetes client is only imported, and the config only
+    loaded, once the secret is first read.
+
+    Tokens, and the credentials read from the secret, are shared through
+    ``TOKEN_CACHE`` so every ``Auth`` in a process with the same Kubernetes
+    configuration reads the secret once and reuses one token. A refresh keeps
+    serving the previous token until the new one is stored, so threads sharing
+    an ``Auth`` never see it unset.
+
+    Tokens can also be shared between processes by persisting them to a
+    ``token_file``, or to the path in the ``LIBCSM_TOKEN_CACHE`` environment
+    variable, e.g. ``$XDG_RUNTIME_DIR/libcsm/token.json``. The file is written
+    with mode 0600 and is ignored if it is readable by anyone but its owner,
+    or if it holds a token for another endpoint or client than the secret.
     """
 
-    def __init__(self, **kwargs) -> None:
+    def __init__(self, cache: TokenCache = TOKEN_CACHE, token_file: str = None, **kwargs) -> None:
         """
 
+        :param cache: The ``TokenCache`` to share tokens through.
+        :param token_file: File to persist tokens to across processes
+                           (default: ``$LIBCSM_TOKEN_CACHE``, unset disables).
         :param kwargs:
         """
-        config.load_kube_config(**kwargs)
-        self.core = client.CoreV1Api()
+        self._kube_config = kwargs
+        self._core = None
+        self.cache = cache
+        self.token_file = token_file or os.getenv(TOKEN_FILE_VARIABLE) or None
         self._token = None
+        self._expires_at = None
+        self._cache_key = None
+        self._lock = Lock()
+
+    @property
+    def core(self):
+        """
+        The ``kubernetes.client.CoreV1Api``, created on first use.
+        """
+        if self._core is None:
+            # Imported here, the Kubernetes client is slow to import and is not
+            # needed when a cached token is used.
+            from kubernetes import client
+            from kubernetes import config
+            config.load_kube_config(**self._kube_config)
+            self._core = client.CoreV1Api()
+        return self._core
 
     def _get_secret(self) -> dict:
         """
@@ -74,6 +250,7 @@ class Auth:
 
         :return: The data dict from the resolved V1Secret.
         """
+        from kubernetes import client
         try:
             secret = self.core.read_namespaced_secret(SECRET, 'default').data
         except client.exceptions.ApiException as error:
@@ -84,13 +261,61 @@ class Auth:
             return secret
         return {}
 
-    def refresh_token(self) -> None:
+    def refresh_token(self, force: bool = False, rejected: str = None) -> None:
         """
         Refresh the authentication token.
 
+        A fresh token already held in the cache is reused unless ``force`` is
+        set, e.g. after the API gateway rejected the current token. A forced
+        refresh still reuses a cached token other than the ``rejected`` one, so
+        concurrent refreshes after the same rejection share a single fetch. The
+        current token is kept until the new one is stored.
+
+        :param force: Request a new token even if the cached one is fresh.
+        :param rejected: The token the API gateway rejected (default: the current token).
         :raises AuthException: if the Kubernetes configuration is invalid.
         """
-        del self.token
+        if force and rejected is None:
+            rejected = self._token
+        if self._cache_key is not None:
+            cached = self.cache.get(self._cache_key)
+            if cached is not None and not (force and cached.token == rejected):
+                self._set_token(cached)
+                return
+        config_key = repr(sorted(self._kube_config.items()))
+        url, data = self.cache.credentials(config_key, self._read_credentials)
+        self._cache_key = (url, data['client_id'])
+        if not force and self.token_file and self._load_token_file():
+            return
+
+        fetched = []
+
+        def fetch() -> tuple:
+            payload = urlencode(data).encode('utf-8')
+            message = request.Request(url)
+            try:
+                with request.urlopen(message, payload) as handle:
+                    response_data = loads(handle.read())
+            except OSError:
+                # The secret may have been rotated, read it again next time.
+                self.cache.forget_credentials(config_key)
+                raise
+            fetched.append(True)
+            return response_data.get('access_token'), response_data.get('expires_in')
+
+        cached = self.cache.fetch(self._cache_key, fetch, force=force, rejected=rejected)
+        if cached.token is not None:
+            self._set_token(cached)
+            if self.token_file and fetched and cached.expires_at is not None:
+                self._save_token_file(cached)
+
+    def _read_credentials(self) -> tuple:
+        """
+        Read the token endpoint and client credentials from the Kubernetes secret.
+
+        :raises AuthException: if the secret could not be read.
+        :returns: The token endpoint URL and the token request data.
+        """
         credentials = self._get_secret()
         if credentials == {}:
             raise AuthException('Could not resolve an API Token!')
@@ -100,26 +325,101 @@ class Auth:
             'grant_type': b'client_credentials',
         }
         url = base64.b64decode(credentials['endpoint']).decode('ascii')
-        payload = urlencode(data).encode('utf-8')
-        message = request.Request(url)
+        return url, data
+
+    def _set_token(self, cached: _CachedToken) -> None:
+        """
+        Replace the token and its expiry together.
+
+        :param cached: The new token.
+        """
+        with self._lock:
+            self._token = cached.token
+            self._expires_at = cached.expires_at
+
+    def _load_token_file(self) -> bool:
+        """
+        Load a fresh token from ``self.token_file`` into this object and the cache.
 
-        with request.urlopen(message, payload) as handle:
-            response = handle.read()
-            response_data = loads(response)
-            token = response_data.get('access_token')
-            if token is not None:
-                self._token = token
+        The token is only used if it was issued for ``self._cache_key``, the
+        endpoint and client from the secret.
+
+        :returns: Whether a fresh token was loaded.
+        """
+        try:
+            with file_lock(f'{self.token_file}.lock', shared=True):
+                with open(self.token_file, encoding='utf-8') as handle:
+                    status = os.fstat(handle.fileno())
+                    if status.st_uid != os.getuid() or status.st_mode & 0o077:
+                        return False
+                    entry = loads(handle.read())
+            key = (entry['endpoint'], entry['client_id'].encode('utf-8'))
+            expires_at = monotonic() + float(entry['expires_at']) - time()
+            token = _CachedToken(entry['access_token'], expires_at)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return False
+        if key != self._cache_key or monotonic() >= expires_at - self.cache.refresh_margin:
+            return False
+        self.cache.seed(key, token)
+        self._set_token(token)
+        return True
+
+    def _save_token_file(self, cached: _CachedToken) -> None:
+        """
+        Persist a token to ``self.token_file`` for use by other processes.
+
+        Failing to write the file is not fatal, the token is still usable.
+
+        :param cached: The token to save.
+        """
+        entry = {
+            'endpoint': self._cache_key[0],
+            'client_id': self._cache_key[1].decode('utf-8'),
+            'access_token': cached.token,
+            'expires_at': time() + cached.expires_at - monotonic(),
+        }
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.token_file)), mode=0o700, exist_ok=True)
+            with file_lock(f'{self.token_file}.lock'):
+                atomic_write(self.token_file, dumps(entry).encode('utf-8'))
+        except OSError as error:
+            print(f'Failed to write token cache [{self.token_file}]: {error}')
 
     @property
     def token(self) -> str:
         """
         The authentication token.
+
+        If the shared cached token for this endpoint is close to expiring it
+        is refreshed before being returned.
         """
+        if self.expiring:
+            self.refresh_token()
         return self._token
 
+    @property
+    def current_token(self) -> str:
+        """
+        The authentication token held now, never refreshed by reading it.
+
+        For callers that must not block, e.g. on an event loop; check ``expiring``
+        and refresh elsewhere.
+        """
+        return self._token
+
+    @property
+    def expiring(self) -> bool:
+        """
+        Whether the token is close to expiring, and reading ``token`` would refresh it.
+        """
+        return self._expires_at is not None \
+            and monotonic() >= self._expires_at - self.cache.refresh_margin
+
     @token.deleter
     def token(self) -> None:
         """
         Handle deleting the authentication token.
         """
-        self._token = None
+        with self._lock:
+            self._token = None
+            self._expires_at = None
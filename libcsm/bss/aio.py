@@ -0,0 +1,130 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+An ``asyncio`` client for CSM BSS, see ``libcsm.requests.aio``.
+"""
+
+import asyncio
+import http
+import json
+from typing import Dict
+from typing import List
+import requests
+from libcsm.bss.api import API
+from libcsm.requests.aio import AsyncClient
+
+
+class AsyncAPI(AsyncClient):
+    """
+    Class for providing an ``asyncio`` API to interact with BSS.
+
+    Its methods match ``libcsm.bss.api.API``, the ``*_many`` methods run one
+    request per XNAME concurrently.
+    """
+
+    service = 'bss'
+
+    def __init__(self, api_gateway_address: str = "api-gw-service-nmn.local", **kwargs) -> None:
+        """
+        :param api_gateway_address: The hostname for the API gateway.
+        :param kwargs: Passed to ``AsyncClient``, e.g. ``concurrency``.
+        """
+        super().__init__(api_gateway_address, **kwargs)
+        self.bootparams_url = f'https://{self.api_gateway_address}/apis/bss/boot/v1/bootparameters'
+
+    async def get_bss_bootparams(self, xname: str) -> dict:
+        """
+        Get bootparameters from BSS for a specifed xname.
+
+        :param xname: The XNAME to fetch boot parameters for.
+        """
+        bss_response = await self.request('GET', self.bootparams_url,
+                                          headers={"Content-Type": "application/json"},
+                                          data=json.dumps({'hosts': [xname]}))
+        if bss_response.status_code != http.HTTPStatus.OK:
+            raise requests.exceptions.RequestException(f'ERROR Failed to get BSS' \
+                f'bootparameters for {xname}. Recieved http response:' \
+                f'{bss_response.status_code} from  BSS.')
+        return bss_response.json()[0]
+
+    async def patch_bss_bootparams(self, xname: str, bss_json: dict) -> None:
+        """
+        Patch the bootparameters in BSS for a specified xname.
+
+        :param xname: The XNAME to patch in BSS.
+        :param bss_json: The JSON to patch with.
+        """
+        patch_response = await self.request('PATCH', self.bootparams_url,
+                                            headers={"Content-Type": "application/json"},
+                                            data=json.dumps(bss_json))
+        if patch_response.status_code != http.HTTPStatus.OK:
+            raise requests.exceptions.RequestException(f'ERROR Failed to patch BSS' \
+                f'bootparameters for {xname}. Recieved {patch_response.status_code}' \
+                f'from as BSS response.')
+
+    async def get_bss_bootparams_many(self, xnames: List[str]) -> Dict[str, dict]:
+        """
+        Get bootparameters from BSS for many xnames concurrently.
+
+        :param xnames: The XNAMEs to fetch boot parameters for.
+        :raises requests.exceptions.RequestException: When any request fails.
+        :returns: A dictionary of each XNAME's boot parameters.
+        """
+        bootparams = await asyncio.gather(*(self.get_bss_bootparams(xname) for xname in xnames))
+        return dict(zip(xnames, bootparams))
+
+    async def set_bss_image(self, xname: str, image_dict: dict) -> dict:
+        """
+        Set the images in BSS for a specific xname.
+
+        :param xname: The XNAME to set images for in BSS.
+        :param image_dict: The image properties to set.
+        :returns: The bootparameters read back from BSS after patching.
+        """
+        API._validate_image_dict(xname, image_dict)
+        bss_json = API._apply_images(xname, await self.get_bss_bootparams(xname), image_dict)
+        await self.patch_bss_bootparams(xname, bss_json)
+        return await self.get_bss_bootparams(xname)
+
+    async def set_bss_image_many(self, xnames: List[str], image_dict: dict) -> Dict[str, Exception]:
+        """
+        Set the images in BSS for many xnames concurrently.
+
+        A failure for one XNAME does not stop the others from being set.
+
+        :param xnames: The XNAMEs to set images for in BSS.
+        :param image_dict: The image properties to set.
+        :returns: A dictionary of each XNAME's error, or ``None`` if its images were set.
+        """
+        API._validate_image_dict(xnames, image_dict)
+
+        async def set_image(xname: str) -> [Exception, None]:
+            try:
+                await self.set_bss_image(xname, image_dict)
+            except (requests.exceptions.RequestException, KeyError, ValueError) as error:
+                return error
+            return None
+
+        errors = await asyncio.gather(*(set_image(xname) for xname in xnames))
+        return dict(zip(xnames, errors))
@@ -27,10 +27,27 @@ Submodule for interacting with CSM BSS.
 
 import json
 import http
+from typing import Dict
+from typing import List
 import requests
 from libcsm import api
+from libcsm.requests.retry import RETRY_POLICY
 from libcsm.requests.session import get_session
 
+BULK_CHUNK_SIZE = 100
+
+
+def _chunks(items: list, chunk_size: int) -> list:
+    """
+    Split ``items`` into lists of at most ``chunk_size`` items.
+
+    :param items: The items to split.
+    :param chunk_size: The maximum size of each chunk.
+    """
+    if chunk_size < 1:
+        raise ValueError(f'ERROR chunk_size must be at least 1, recieved {chunk_size}')
+    return [items[index:index + chunk_size] for index in range(0, len(items), chunk_size)]
+
 
 class API:
     """
@@ -45,7 +62,22 @@ class API:
         self.bootparams_url = f'https://{self.api_gateway_address}/apis/bss/boot/v1/bootparameters'
         self._auth = api.Auth()
         self._auth.refresh_token()
-        self.session = get_session()
+        self.session = get_session(host=self.api_gateway_address)
+
+    def _request(self, method: str, body: dict) -> requests.Response:
+        """
+        Send a request to the bootparameters endpoint, retrying transient failures.
+
+        :param method: The HTTP method, ``GET`` or ``PATCH``.
+        :param body: The JSON body to send.
+        :returns: The last response.
+        """
+        send = getattr(self.session, method.lower())
+        data = json.dumps(body)
+        return RETRY_POLICY.call('bss', method, lambda: send(self.bootparams_url,
+                                    headers={'Authorization': f'Bearer {self._auth.token}',
+                                                "Content-Type": "application/json"},
+                                    data=data), auth=self._auth)
 
     def get_bss_bootparams(self, xname: str) -> str:
         """
@@ -55,10 +87,7 @@ class API:
         """
         body = {'hosts': [xname]}
         try:
-            bss_response = self.session.get(self.bootparams_url,
-                                    headers={'Authorization': f'Bearer {self._auth.token}',
-                                                "Content-Type": "application/json"},
-                                    data=json.dumps(body))
+            bss_response = self._request('GET', body)
         except requests.exceptions.RequestException as ex:
             raise requests.exceptions.RequestException(f'ERROR exception:' \
                 f'{type(ex).__name__} when trying to get bootparameters')
@@ -76,10 +105,7 @@ class API:
         :param bss_json: The JSON to patch with.
         """
         try:
-            patch_response = self.session.patch(self.bootparams_url,
-                                headers={'Authorization': f'Bearer {self._auth.token}',
-                                        "Content-Type": "application/json"},
-                                data=json.dumps(bss_json))
+            patch_response = self._request('PATCH', bss_json)
         except requests.exceptions.RequestException as ex:
             raise requests.exceptions.RequestException(f'ERROR exception:' \
                 f'{type(ex).__name__} when trying to patch bootparameters')
@@ -89,14 +115,68 @@ class API:
                 f'from as BSS response.')
         print('BSS entry patched')
 
-    def set_bss_image(self, xname: str, image_dict: dict) -> None:
+    def get_bss_bootparams_bulk(self, xnames: List[str],
+                                chunk_size: int = BULK_CHUNK_SIZE) -> Dict[str, dict]:
         """
-        Set the images in BSS for a specific xname.
+        Get bootparameters from BSS for many xnames, ``chunk_size`` hosts per request.
 
-        The inputs are the node's xname and a dictionary containing initrd, kernel, and roofs
-        image paths that will be set in BSS.
+        XNAMEs that BSS has no bootparameters for are left out of the result.
 
-        :param xname: The XNAME to set images for in BSS.
+        :param xnames: The XNAMEs to fetch boot parameters for.
+        :param chunk_size: The number of XNAMEs to request at once.
+        :returns: A dictionary of each XNAME's boot parameters.
+        """
+        bootparams = {}
+        for chunk in _chunks(list(xnames), chunk_size):
+            body = {'hosts': chunk}
+            try:
+                bss_response = self._request('GET', body)
+            except requests.exceptions.RequestException as ex:
+                raise requests.exceptions.RequestException(f'ERROR exception:' \
+                    f'{type(ex).__name__} when trying to get bootparameters')
+            if bss_response.status_code != http.HTTPStatus.OK:
+                raise requests.exceptions.RequestException(f'ERROR Failed to get BSS' \
+                    f'bootparameters for {chunk}. Recieved http response:' \
+                    f'{bss_response.status_code} from  BSS.')
+            for entry in bss_response.json():
+                for host in entry.get('hosts', []):
+                    if host in chunk:
+                        bootparams[host] = dict(entry, hosts=[host])
+        return bootparams
+
+    def patch_bss_bootparams_bulk(self, bss_jsons: Dict[str, dict],
+                                  chunk_size: int = BULK_CHUNK_SIZE) -> Dict[str, Exception]:
+        """
+        Patch the bootparameters in BSS for many xnames.
+
+        XNAMEs being patched with identical bootparameters share a request, up
+        to ``chunk_size`` hosts per request.
+
+        :param bss_jsons: A dictionary of the JSON to patch each XNAME with.
+        :param chunk_size: The number of XNAMEs to patch at once.
+        :returns: A dictionary of each XNAME's error, or ``None`` if it was patched.
+        """
+        groups = {}
+        for xname, bss_json in bss_jsons.items():
+            body = {key: value for key, value in bss_json.items() if key != 'hosts'}
+            groups.setdefault(json.dumps(body, sort_keys=True), (body, []))[1].append(xname)
+        results = {}
+        for body, xnames in groups.values():
+            for chunk in _chunks(xnames, chunk_size):
+                try:
+                    self.patch_bss_bootparams(','.join(chunk), dict(body, hosts=chunk))
+                except requests.exceptions.RequestException as error:
+                    results.update({xname: error for xname in chunk})
+                else:
+                    results.update({xname: None for xname in chunk})
+        return results
+
+    @staticmethod
+    def _validate_image_dict(xname: str, image_dict: dict) -> None:
+        """
+        Verify ``image_dict`` has every image ``set_bss_image`` needs.
+
+        :param xname: The XNAME(s) the images are for.
         :param image_dict: The image properties to set.
         """
         if 'initrd' not in image_dict or 'kernel' not in image_dict or 'rootfs' not in image_dict:
@@ -105,7 +185,16 @@ class API:
                 f"and 'rootfs'. The inputs recieved were xname:{xname}, " \
                 f"image_dictionary:{image_dict}")
 
-        bss_json = self.get_bss_bootparams(xname)
+    @staticmethod
+    def _apply_images(xname: str, bss_json: dict, image_dict: dict) -> dict:
+        """
+        Set the images from ``image_dict`` in an XNAME's bootparameters.
+
+        :param xname: The XNAME the bootparameters belong to.
+        :param bss_json: The bootparameters to update in place.
+        :param image_dict: The image properties to set.
+        :returns: The updated bootparameters.
+        """
         if 'initrd' not in bss_json or 'kernel' not in bss_json:
             raise KeyError(f"BSS bootparams did not have the expected keys 'initrd' or 'kernel'." \
                 f"Boot parameters recieved: {bss_json}")
@@ -120,13 +209,91 @@ class API:
                 f"bss params") from exc
 
         bss_json['params'] = params.replace(current_rootfs, image_dict['rootfs'])
+        return bss_json
+
+    @staticmethod
+    def _print_images(xname: str, bss_json: dict) -> None:
+        """
+        Print the images set in an XNAME's bootparameters.
+
+        :param xname: The XNAME the bootparameters belong to.
+        :param bss_json: The bootparameters to print.
+        """
+        metal_server = bss_json['params'].split("metal.server=", 1)[1].split(" ",1)[0]
+        # One write per node, so nodes set in parallel do not interleave their lines.
+        print(f"New images in BSS for {xname} are:\n"
+              f"  Metal.server image:  {metal_server}\n"
+              f"  Initrd image:        {bss_json['initrd']}\n"
+              f"  Kernel image:        {bss_json['kernel']}\n", end='')
+
+    def set_bss_image(self, xname: str, image_dict: dict) -> None:
+        """
+        Set the images in BSS for a specific xname.
+
+        The inputs are the node's xname and a dictionary containing initrd, kernel, and roofs
+        image paths that will be set in BSS.
+
+        :param xname: The XNAME to set images for in BSS.
+        :param image_dict: The image properties to set.
+        """
+        self._validate_image_dict(xname, image_dict)
+
+        bss_json = self._apply_images(xname, self.get_bss_bootparams(xname), image_dict)
 
         self.patch_bss_bootparams(xname, bss_json)
 
         # verify images in BSS
-        print(f"New images in BSS for {xname} are:")
-        new_bss_json = self.get_bss_bootparams(xname)
-        print("  Metal.server image: ", \
-            new_bss_json['params'].split("metal.server=", 1)[1].split(" ",1)[0])
-        print("  Initrd image:       ", new_bss_json['initrd'])
-        print("  Kernel image:       ", new_bss_json['kernel'])
+        self._print_images(xname, self.get_bss_bootparams(xname))
+
+    def set_bss_image_bulk(self, xnames: List[str], image_dict: dict,
+                           chunk_size: int = BULK_CHUNK_SIZE) -> Dict[str, Exception]:
+        """
+        Set the images in BSS for many xnames, ``chunk_size`` hosts per request.
+
+        Unlike ``set_bss_image`` a failure for one XNAME does not stop the
+        others from being set; every XNAME's outcome is returned instead.
+
+        :param xnames: The XNAMEs to set images for in BSS.
+        :param image_dict: The image properties to set.
+        :param chunk_size: The number of XNAMEs per request.
+        :returns: A dictionary of each XNAME's error, or ``None`` if its images were set.
+        """
+        self._validate_image_dict(xnames, image_dict)
+        results = {}
+        bss_jsons = {}
+        for chunk in _chunks(list(xnames), chunk_size):
+            try:
+                current = self.get_bss_bootparams_bulk(chunk, chunk_size)
+            except requests.exceptions.RequestException as error:
+                results.update({xname: error for xname in chunk})
+                continue
+            for xname in chunk:
+                if xname not in current:
+                    results[xname] = KeyError(f'ERROR BSS did not return bootparameters for {xname}')
+                    continue
+                try:
+                    bss_jsons[xname] = self._apply_images(xname, current[xname], image_dict)
+                except KeyError as error:
+                    results[xname] = error
+
+        patched = self.patch_bss_bootparams_bulk(bss_jsons, chunk_size)
+        results.update({xname: error for xname, error in patched.items() if error is not None})
+
+        # verify images in BSS
+        verify = [xname for xname, error in patched.items() if error is None]
+        for chunk in _chunks(verify, chunk_size):
+            try:
+                new_bss_jsons = self.get_bss_bootparams_bulk(chunk, chunk_size)
+            except requests.exceptions.RequestException as error:
+                results.update({xname: error for xname in chunk})
+                continue
+            for xname in chunk:
+                new_bss_json = new_bss_jsons.get(xname, {})
+                if any(new_bss_json.get(key) != bss_jsons[xname][key]
+                       for key in ('initrd', 'kernel', 'params')):
+                    results[xname] = ValueError(f'ERROR bootparameters for {xname} did not ' \
+                        f'match after patching. Recieved: {new_bss_json}')
+                    continue
+                results[xname] = None
+                self._print_images(xname, new_bss_json)
+        return {xname: results.get(xname) for xname in xnames}
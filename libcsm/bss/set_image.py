@@ -25,19 +25,124 @@
 Function to set the boot-image in BSS for a NCN node(s).
 """
 
+import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from time import time
+from typing import List
+from typing import NamedTuple
 import click
 import requests
 
-from libcsm.s3 import images, s3object
+from libcsm.api import AuthException
+from libcsm.s3 import images, s3object, verify
+from libcsm.s3.manifest_cache import ManifestCache
 from libcsm.hsm import xnames as hsm_xnames
 from libcsm.bss import api
+from libcsm.requests.breaker import GUARDS
+from libcsm.requests.retry import RETRY_POLICY
+
+
+class NodeResult(NamedTuple):
+    """
+    The outcome of setting the images for one node.
+    """
+
+    xname: str
+    error: [str, None]
+    duration: float
+
+
+def set_images(bss_api: api.API, xnames: List[str], image_dict: dict,
+               parallelism: int = 1) -> List[NodeResult]:
+    """
+    Set the images in BSS for every xname, ``parallelism`` nodes at a time.
+
+    Every node is attempted, a failure for one node (a request, connection, or
+    BSS data error, or an ``AuthException`` refreshing the token midway) is
+    recorded in its result rather than stopping the others.
+
+    :param bss_api: The BSS API to set images with.
+    :param xnames: The XNAMEs to set images for.
+    :param image_dict: The image properties to set.
+    :param parallelism: The number of nodes to update concurrently.
+    :returns: A ``NodeResult`` for each XNAME, in the order given.
+    """
+    def set_image(xname: str) -> NodeResult:
+        start_time = time()
+        try:
+            bss_api.set_bss_image(xname, image_dict)
+        except (OSError, AuthException, KeyError, ValueError) as error:
+            print(f'ERROR setting image for {xname}. {error}')
+            return NodeResult(xname, str(error) or type(error).__name__, time() - start_time)
+        return NodeResult(xname, None, time() - start_time)
+
+    with ThreadPoolExecutor(max_workers=max(parallelism, 1)) as executor:
+        return list(executor.map(set_image, xnames))
+
+
+def summarize(results: List[NodeResult]) -> dict:
+    """
+    Summarize the successes, failures, and latencies of ``set_images``.
+
+    :param results: The results from ``set_images``.
+    :returns: A dictionary summarizing the results.
+    """
+    durations = [result.duration for result in results]
+    return {
+        'succeeded': [result.xname for result in results if result.error is None],
+        'failed': {result.xname: result.error for result in results if result.error is not None},
+        'latency': {
+            'min': min(durations, default=0.0),
+            'mean': sum(durations) / len(durations) if durations else 0.0,
+            'max': max(durations, default=0.0),
+        },
+        'durations': {result.xname: result.duration for result in results},
+    }
+
+
+def _print_summary(summary: dict, summary_format: str) -> None:
+    """
+    Print the summary from ``summarize``.
+
+    :param summary: The summary to print.
+    :param summary_format: Either ``text`` or ``json``.
+    """
+    if summary_format == 'json':
+        print(json.dumps(summary))
+        return
+    latency = summary['latency']
+    print(f"Set images for {len(summary['succeeded'])} node(s), "
+          f"{len(summary['failed'])} failed.")
+    print(f"Latency (sec): min {latency['min']:.3f}, mean {latency['mean']:.3f}, "
+          f"max {latency['max']:.3f}")
+    for xname, error in summary['failed'].items():
+        print(f'  FAILED {xname}: {error}')
+    for call_class, counts in summary.get('retries', {}).items():
+        print(f"Retries ({call_class}): {counts['retries']} retries, "
+              f"{counts['refreshes']} token refreshes over {counts['requests']} requests")
+    for service, state in summary.get('services', {}).items():
+        if state['state'] != 'closed':
+            print(f"Circuit for {service} is {state['state']} after {state['failures']} failures")
+
+
+def _print_artifact_checks(checks: List[verify.ArtifactCheck]) -> None:
+    """
+    Print the outcome of ``verify.verify_artifacts``.
+
+    :param checks: The artifact checks to print.
+    """
+    for check in checks:
+        status = 'OK' if check.ok else 'FAILED'
+        print(f'  {status} {check.image_type} {check.path} ({check.duration:.3f} sec)')
+        for error in check.errors:
+            print(f'    {error}')
 
 
 @click.command()
 @click.option('--hsm-role-subrole', required=False, type=str, default=None,
-               help='HSM role and subrole of nodes to set BSS image \
-               (e.g. Management_Master, Management_Storage).')
+               help='HSM role and subrole of nodes to set BSS image, several can be given in \
+               a comma separated list (e.g. Management_Master,Management_Storage).')
 @click.option('--xnames', required=False, type=str, default=None,
                 help='Xnames of nodes to set BSS image of in comma separated list.')
 @click.option('--image-id', type=str, required=True,
@@ -48,6 +153,15 @@ from libcsm.bss import api
                help='API gateway address. Default is \'api-gw-service-nmn.local\'.')
 @click.option('--endpoint-url', required=False, type=str, default='http://rgw-vip',
                help='Address of the Rados-gateway endpoint.')
+@click.option('--manifest-cache/--no-manifest-cache', default=True,
+               help='Reuse image manifests cached on disk while their ETag is unchanged. Enabled by default.')
+@click.option('--verify-artifacts', is_flag=True, default=False,
+               help='Verify the rootfs, kernel, and initrd exist in S3 and match the image manifest '
+               'before changing BSS.')
+@click.option('--parallelism', required=False, type=click.IntRange(min=1), default=1,
+               help='Number of nodes to update in BSS concurrently. Defaults to 1.')
+@click.option('--summary-format', required=False, type=click.Choice(['text', 'json']),
+               default='text', help='Format of the summary printed once every node was attempted.')
 def main(**kwargs) -> None:
     """Set the kernel, rootfs, and initrd images in BSS for specified node(s) given an image-id."""
     hsm_role_subrole = kwargs['hsm_role_subrole']
@@ -56,6 +170,7 @@ def main(**kwargs) -> None:
     image_id = kwargs['image_id']
     endpoint_url = kwargs['endpoint_url']
     api_gateway_address = kwargs['api_gateway_address']
+    parallelism = kwargs['parallelism']
 
     # check inputs
     if hsm_role_subrole is None and xnames is None:
@@ -78,15 +193,28 @@ def main(**kwargs) -> None:
 
     # get the image-id info
     try:
-        image_dict = images.get_s3_image_info(bucket, image_id, endpoint_url)
+        cache = ManifestCache() if kwargs['manifest_cache'] else None
+        if kwargs['verify_artifacts']:
+            manifest = images.get_s3_image_manifest(bucket, image_id, endpoint_url, cache)
+            image_dict = manifest.image_dict()
+            print("Using images: ", image_dict)
+        else:
+            image_dict = images.get_s3_image_info(bucket, image_id, endpoint_url, cache)
     except (images.ImageFormatException, s3object.RGWAdminException) as error:
         print(f'ERROR was unable to get image info for {bucket} {image_id}. {error}')
         sys.exit(1)
+    if kwargs['verify_artifacts']:
+        print("Verifying image artifacts in S3:")
+        checks = verify.verify_artifacts(manifest, endpoint_url)
+        _print_artifact_checks(checks)
+        if not all(check.ok for check in checks):
+            print(f'ERROR image {image_id} failed verification, BSS was not changed.')
+            sys.exit(1)
     bss_api=api.API(api_gateway_address)
     print("Editing BSS data for components: ", comp_xnames)
-    for component in comp_xnames:
-        try:
-            bss_api.set_bss_image(component, image_dict)
-        except (requests.exceptions.RequestException, KeyError, ValueError) as error:
-            print(f'ERROR setting image for {component}. {error}')
-            sys.exit(1)
+    summary = summarize(set_images(bss_api, comp_xnames, image_dict, parallelism))
+    summary['retries'] = RETRY_POLICY.stats()
+    summary['services'] = GUARDS.stats()
+    _print_summary(summary, kwargs['summary_format'])
+    if summary['failed']:
+        sys.exit(1)
@@ -0,0 +1,86 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+An ``asyncio`` client for components from HSM, see ``libcsm.requests.aio``.
+"""
+
+import asyncio
+import http
+from typing import Dict
+from typing import List
+from typing import Union
+from urllib.parse import urlencode
+import requests
+from libcsm.hsm.components import ROLE_SUBROLES
+from libcsm.hsm.components import component_query
+from libcsm.requests.aio import AsyncClient
+
+
+class AsyncAPI(AsyncClient):
+    """
+    Class for providing an ``asyncio`` API to query components from HSM.
+    """
+
+    service = 'hsm'
+
+    def __init__(self, api_gateway_address: str = "api-gw-service-nmn.local", **kwargs) -> None:
+        """
+        :param api_gateway_address: The hostname of the API gateway.
+        :param kwargs: Passed to ``AsyncClient``, e.g. ``concurrency``.
+        """
+        super().__init__(api_gateway_address, **kwargs)
+        self.hsm_components_url = f'https://{self.api_gateway_address}/'\
+            f'apis/smd/hsm/v2/State/Components'
+
+    async def get_components(self, role_subrole: Union[str, List[str]], states: List[str] = None,
+                             fields: str = None, filters: dict = None) -> dict:
+        """
+        Get management components from HSM based on their role and subrole.
+
+        :param role_subrole: The subrole in HSM to query under, or a list of them.
+        :param states: Component states to select, e.g. ``['Ready', 'On']``.
+        :param fields: One of ``FIELD_FILTERS`` to only return those fields, e.g. ``stateonly``.
+        :param filters: Other State/Components parameters, a list value is repeated.
+        :returns: The decoded response from HSM.
+        """
+        params = component_query(role_subrole, states, fields, filters)
+        components_response = await self.request('GET', self.hsm_components_url + \
+            f'?{urlencode(params)}')
+        if components_response.status_code != http.HTTPStatus.OK:
+            raise requests.exceptions.RequestException(f'ERROR Failed' \
+                f'to get components with role_subrole {role_subrole}')
+        return components_response.json()
+
+    async def get_components_many(self, role_subroles: List[str] = None) -> Dict[str, dict]:
+        """
+        Get management components for several roles and subroles concurrently.
+
+        :param role_subroles: The subroles to query (default: every one of ``ROLE_SUBROLES``).
+        :raises requests.exceptions.RequestException: When any request fails.
+        :returns: A dictionary of each role and subrole's decoded response.
+        """
+        role_subroles = list(role_subroles or ROLE_SUBROLES)
+        responses = await asyncio.gather(*(self.get_components(role_subrole)
+                                           for role_subrole in role_subroles))
+        return dict(zip(role_subroles, responses))
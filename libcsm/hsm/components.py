@@ -26,39 +26,89 @@ Submodule for interacting with components from HSM.
 """
 
 import http
+from typing import List
+from typing import Union
 import requests
 from libcsm import api
+from libcsm.requests.retry import RETRY_POLICY
 from libcsm.requests.session import get_session
 
 ROLE_SUBROLES = ["Management_Master", "Management_Worker", "Management_Storage"]
+# State/Components parameters that trim each component down to a few fields.
+FIELD_FILTERS = ('stateonly', 'flagonly', 'roleonly', 'nidonly')
 
 
-def get_components(role_subrole: str, api_gateway_address: str = "api-gw-service-nmn.local") \
-    -> requests.Response:
+def component_query(role_subrole: Union[str, List[str]], states: List[str] = None,
+                    fields: str = None, filters: dict = None) -> List[tuple]:
+    """
+    Build the State/Components query parameters selecting components in one request.
+
+    HSM matches any of the values given for a repeated parameter, so every
+    role, subrole, and state is selected at once. Every one of
+    ``ROLE_SUBROLES`` has the ``Management`` role, so matching any of the
+    roles and any of the subroles selects exactly the requested pairs.
+
+    :param role_subrole: One or more of ``ROLE_SUBROLES``.
+    :param states: Component states to select, e.g. ``['Ready', 'On']``.
+    :param fields: One of ``FIELD_FILTERS`` to only return those fields, e.g. ``stateonly``.
+    :param filters: Other State/Components parameters, a list value is repeated.
+    :raises KeyError: When a role_subrole or field filter is not valid.
+    :returns: The query parameters, as ``(name, value)`` pairs.
+    """
+    role_subroles = [role_subrole] if isinstance(role_subrole, str) else list(role_subrole)
+    if not role_subroles:
+        raise KeyError('ERROR at least one role_subrole is required')
+    for value in role_subroles:
+        if value not in ROLE_SUBROLES:
+            raise KeyError(f'ERROR {value} is not a valid role_subrole')
+    roles = dict.fromkeys(value.split("_")[0] for value in role_subroles)
+    subroles = dict.fromkeys(value.split("_")[1] for value in role_subroles)
+    params = [('role', role) for role in roles] + [('subrole', subrole) for subrole in subroles]
+    params += [('state', state) for state in states or []]
+    if fields is not None:
+        if fields not in FIELD_FILTERS:
+            raise KeyError(f'ERROR {fields} is not one of {FIELD_FILTERS}')
+        params.append((fields, 'true'))
+    for name, value in (filters or {}).items():
+        for item in value if isinstance(value, (list, tuple)) else [value]:
+            params.append((name, str(item).lower() if isinstance(item, bool) else item))
+    return params
+
+
+def get_components(role_subrole: Union[str, List[str]],
+                   api_gateway_address: str = "api-gw-service-nmn.local",
+                   states: List[str] = None, fields: str = None,
+                   filters: dict = None) -> requests.Response:
     """
     Get management components from HSM based on their role and subrole.
 
-    :param role_subrole: The subrole in HSM to query under.
+    Several role_subroles, states, and other filters are queried in a single
+    request, see ``component_query``. The body is read when it is used, either
+    in full with ``json()`` or incrementally with ``libcsm.requests.stream``.
+
+    :param role_subrole: The subrole in HSM to query under, or a list of them.
     :param api_gateway_address: The hostname of the API gateway.
+    :param states: Component states to select, e.g. ``['Ready', 'On']``.
+    :param fields: One of ``FIELD_FILTERS`` to only return those fields, e.g. ``stateonly``.
+    :param filters: Other State/Components parameters, a list value is repeated.
     :returns: The HTTP response from the API gateway.
     """
+    params = component_query(role_subrole, states, fields, filters)
     auth = api.Auth()
     auth.refresh_token()
-    session = get_session()
+    session = get_session(host=api_gateway_address)
     hsm_components_url = f'https://{api_gateway_address}/'\
         f'apis/smd/hsm/v2/State/Components'
     # get components
-    if role_subrole not in ROLE_SUBROLES:
-        raise KeyError(f'ERROR {role_subrole} is not a valid role_subrole')
-    subrole = role_subrole.split("_")[1]
     try:
-        components_response = session.get(hsm_components_url + \
-            f'?role=Management&subrole={subrole}',
-            headers={'Authorization': f'Bearer {auth.token}'})
+        components_response = RETRY_POLICY.call('hsm', 'GET', lambda: session.get(
+            hsm_components_url, params=params, stream=True,
+            headers={'Authorization': f'Bearer {auth.token}'}), auth=auth)
     except requests.exceptions.RequestException as ex:
         raise requests.exceptions.RequestException(f'ERROR exception:' \
             f'{type(ex).__name__} when trying to get components')
     if components_response.status_code != http.HTTPStatus.OK:
+        components_response.close()
         raise requests.exceptions.RequestException(f'ERROR Failed' \
-            f'to get components with subrole {subrole}')
+            f'to get components with role_subrole {role_subrole}')
     return components_response
@@ -25,20 +25,31 @@
 Function to get xnames from HSM.
 """
 from typing import List
+from typing import Union
 from libcsm.hsm import components
+from libcsm.requests.stream import iter_response
 
 
-def get_by_role_subrole(role_subrole: str) -> List[str]:
+def get_by_role_subrole(role_subrole: Union[str, List[str]]) -> List[str]:
     """
     Get xnames by subrole from HSM.
 
-    :param: role_subrole: The subrole to fetch components for.
+    Every role_subrole is queried in one request that only returns each
+    component's state fields, since only its ``ID`` is kept. The response is
+    parsed as it arrives, one component at a time.
+
+    :param: role_subrole: The subrole to fetch components for, a comma separated list of
+                          subroles, or a list of them. Whitespace around each subrole
+                          and empty items are ignored.
     :returns: A list of all components for the given ``role_subrole``.
     """
-    components_response = components.get_components(role_subrole)
+    if isinstance(role_subrole, str):
+        role_subrole = role_subrole.split(',')
+    role_subrole = [value.strip() for value in role_subrole if value.strip()]
+    components_response = components.get_components(role_subrole, fields='stateonly')
     xnames = []
     if components_response is not None:
-        for component in components_response.json()['Components']:
+        for component in iter_response(components_response, 'Components', ['ID']):
             xnames.append(component['ID'])
     else:
         print(
@@ -23,13 +23,297 @@
 #
 """
 Logging module.
+
+Every ``Logger`` shares one ``QueueHandler``; records are put on a bounded
+queue and written to ``LOG_PATH`` by a single ``QueueListener`` thread per
+process, so logging never waits on disk. When the queue is full records are
+dropped, or the caller waits if ``LOG_QUEUE_BLOCK`` is set. The queue is
+flushed at exit, or on demand with ``flush_logs``.
+
+The log is rolled over once it reaches ``LOG_MAX_BYTES`` or ``LOG_MAX_AGE``
+seconds, keeping ``LOG_BACKUP_COUNT`` gzipped backups (``libcsm.log.1.gz`` is
+the newest). Rollover holds an ``flock`` on ``libcsm.log.lock`` so processes
+sharing the log rotate it once between them; the others reopen the new file.
 """
+import atexit
+import gzip
 import os.path
+import queue
+import re
+import shutil
+import threading
+import time
 
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import BaseRotatingHandler
+from logging.handlers import QueueHandler
+from logging.handlers import QueueListener
 
 LOG_PATH = '/var/log/libcsm.log'
+LOG_QUEUE_SIZE = 10000
+LOG_QUEUE_BLOCK = False
+LOG_STOP_TIMEOUT = 5.0
+LOG_MAX_BYTES = 50 * 1024 * 1024
+LOG_MAX_AGE = 7 * 24 * 60 * 60
+LOG_BACKUP_COUNT = 5
+LOG_COMPRESS = True
+
+
+class _RotatingHandler(BaseRotatingHandler):
+    """
+    A file handler rotating by size and age, safely across processes.
+
+    The lock file's modification time records the last rollover, so every
+    process sharing the log agrees on its age.
+    """
+
+    def __init__(self, filename: str) -> None:
+        """
+        Open ``filename`` for appending.
+
+        :param filename: Path of the log file.
+        """
+        super().__init__(filename, 'a', encoding='utf-8')
+        self.lock_path = f'{self.baseFilename}.lock'
+        self._compressor = None
+        if not os.path.exists(self.lock_path):
+            with open(self.lock_path, 'a', encoding='utf-8'):
+                pass
+        self._rollover_at = os.stat(self.lock_path).st_mtime + LOG_MAX_AGE
+
+    def _moved(self) -> bool:
+        """
+        Whether the open file is no longer the file at ``baseFilename``.
+        """
+        try:
+            current = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            return True
+        opened = os.fstat(self.stream.fileno())
+        return (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino)
+
+    def _reopen(self) -> None:
+        """
+        Reopen ``baseFilename``, and reread when it was last rolled over.
+        """
+        if self.stream:
+            self.stream.close()
+        self.stream = self._open()
+        self._rollover_at = os.stat(self.lock_path).st_mtime + LOG_MAX_AGE
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        """
+        Whether the log is too big or too old to write ``record`` to.
+
+        A log rotated by another process is reopened here instead.
+
+        :param record: The record about to be written.
+        """
+        if self.stream is None:
+            self.stream = self._open()
+        if self._moved():
+            self._reopen()
+        if time.time() >= self._rollover_at:
+            return True
+        size = os.fstat(self.stream.fileno()).st_size
+        return size > 0 and size + len(self.format(record)) + 1 > LOG_MAX_BYTES
+
+    def doRollover(self) -> None:
+        """
+        Rotate the log under the lock, unless another process just did.
+        """
+        from libcsm.os import file_lock
+        with file_lock(self.lock_path):
+            if not self._moved():
+                self._rotate()
+                os.utime(self.lock_path)
+            self._reopen()
+        if LOG_COMPRESS and LOG_BACKUP_COUNT > 0:
+            if self._compressor is not None:
+                self._compressor.join()
+            self._compressor = threading.Thread(target=self._compress)
+            self._compressor.start()
+
+    def _backup(self, index: int, compressed: bool) -> str:
+        """
+        Return the path of a backup.
+
+        :param index: Its place, ``1`` being the newest.
+        :param compressed: Whether it has been gzipped.
+        """
+        return f'{self.baseFilename}.{index}' + ('.gz' if compressed else '')
+
+    def _rotate(self) -> None:
+        """
+        Shift each backup along by one, dropping the oldest, and move the log to the first.
+        """
+        for index in range(LOG_BACKUP_COUNT, 0, -1):
+            for compressed in (True, False):
+                source = self._backup(index, compressed)
+                if not os.path.exists(source):
+                    continue
+                if index == LOG_BACKUP_COUNT:
+                    os.remove(source)
+                else:
+                    os.replace(source, self._backup(index + 1, compressed))
+        if LOG_BACKUP_COUNT > 0:
+            os.replace(self.baseFilename, self._backup(1, False))
+        else:
+            os.remove(self.baseFilename)
+
+    def _compress(self) -> None:
+        """
+        Gzip every backup not yet compressed, under the lock so it can not be rotated meanwhile.
+        """
+        from libcsm.os import file_lock
+        directory, name = os.path.split(self.baseFilename)
+        pattern = re.compile(re.escape(name) + r'\.(\d+)')
+        with file_lock(self.lock_path):
+            for entry in os.listdir(directory):
+                match = pattern.fullmatch(entry)
+                if not match:
+                    continue
+                source = self._backup(int(match.group(1)), False)
+                temporary = f'{source}.gz.tmp'
+                try:
+                    with open(source, 'rb') as plain, gzip.open(temporary, 'wb') as packed:
+                        shutil.copyfileobj(plain, packed)
+                    os.replace(temporary, f'{source}.gz')
+                    os.remove(source)
+                except OSError as error:
+                    print(f'Failed to compress {source}\n{error}')
+
+    def close(self) -> None:
+        """
+        Close the log, waiting for any compression to finish.
+        """
+        if self._compressor is not None:
+            self._compressor.join()
+        super().close()
+
+
+def _file_handler() -> logging.Handler:
+    """
+    Create the handler that writes records to ``LOG_PATH``.
+    """
+    formatter = logging.Formatter(
+        '%(asctime)s %(levelname)-8s | %(name)-20s | %(message)s'
+    )
+    formatter.datefmt = '%b %d %H:%M:%S'
+    try:
+        os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
+        handler = _RotatingHandler(LOG_PATH)
+    except OSError as error:
+        print(
+            f'Failed to make {os.path.dirname(LOG_PATH)}\n{error}\n'
+            f'writing logs to present working directory.'
+        )
+        handler = _RotatingHandler(os.path.basename(LOG_PATH))
+    handler.setFormatter(formatter)
+    return handler
+
+
+class _Listener(QueueListener):
+    """
+    A ``QueueListener`` whose stop waits for room on a full queue.
+    """
+
+    def enqueue_sentinel(self) -> None:
+        """
+        Put the stop sentinel on the queue, behind every record already there.
+
+        Gives up after ``LOG_STOP_TIMEOUT`` seconds, so a stalled writer can not
+        hang the process at exit.
+        """
+        try:
+            self.queue.put(self._sentinel, timeout=LOG_STOP_TIMEOUT)
+        except queue.Full:
+            pass
+
+
+class _AsyncHandler(QueueHandler):
+    """
+    A ``QueueHandler`` feeding a background ``QueueListener``.
+
+    The queue and listener are created on the first record, and again in a
+    forked child, so each process has its own writer thread.
+    """
+
+    def __init__(self) -> None:
+        """
+        Create the handler, without starting its listener.
+        """
+        super().__init__(None)
+        self._listener = None
+        self._start_lock = threading.Lock()
+        self.dropped = 0
+
+    def _start(self) -> None:
+        """
+        Start the listener thread and the file handler it writes with.
+        """
+        with self._start_lock:
+            if self._listener is None:
+                self.queue = queue.Queue(LOG_QUEUE_SIZE)
+                self._listener = _Listener(self.queue, _file_handler())
+                self._listener.start()
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """
+        Put a record on the queue, dropping it if the queue is full.
+
+        :param record: The prepared record.
+        """
+        if self._listener is None:
+            self._start()
+        try:
+            self.queue.put(record, block=LOG_QUEUE_BLOCK)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        """
+        Wait for every queued record to be written.
+        """
+        if self._listener is None:
+            return
+        self.queue.join()
+        for handler in self._listener.handlers:
+            handler.flush()
+
+    def close(self) -> None:
+        """
+        Write the queued records, then stop the listener and close the file.
+
+        A later record starts a new listener.
+        """
+        with self._start_lock:
+            listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+
+    def _after_fork(self) -> None:
+        """
+        Forget the parent's queue and listener, which do not exist in a forked child.
+        """
+        self._listener = None
+        self._start_lock = threading.Lock()
+        self.dropped = 0
+
+
+_HANDLER = _AsyncHandler()
+atexit.register(_HANDLER.close)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_HANDLER._after_fork)
+
+
+def flush_logs() -> None:
+    """
+    Block until every record logged so far has been written to ``LOG_PATH``.
+    """
+    _HANDLER.flush()
 
 
 class Logger(logging.Logger):
@@ -53,18 +337,4 @@ class Logger(logging.Logger):
         :param log_level: Level of logging (default: INFO).
         """
         super().__init__(module_name, log_level)
-        formatter = logging.Formatter(
-            '%(asctime)s %(levelname)-8s | %(name)-20s | %(message)s'
-        )
-        formatter.datefmt = '%b %d %H:%M:%S'
-        try:
-            os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
-            handler = RotatingFileHandler(LOG_PATH)
-        except OSError as error:
-            print(
-                f'Failed to make {os.path.dirname(LOG_PATH)}\n{error}\n'
-                f'writing logs to present working directory.'
-            )
-            handler = RotatingFileHandler(os.path.basename(LOG_PATH))
-        handler.setFormatter(formatter)
-        self.addHandler(handler)
+        self.addHandler(_HANDLER)
@@ -26,19 +26,36 @@ Module for handling command line calls.
 
 .. note::
    The ``_CLI`` object is private, the intended usage is to use
-   ``run_command``.
+   ``run_command``, ``run_commands``, ``run_command_async``, or
+   ``stream_command``.
 
 """
+import asyncio
+import codecs
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
 from contextlib import contextmanager
 from time import time
+from typing import Iterable
+from typing import Iterator
 from subprocess import PIPE
 from subprocess import Popen
+from subprocess import TimeoutExpired
+from threading import Thread
+import fcntl
 import os
+import shutil
+import signal
+import tempfile
 
 from libcsm.logger import Logger
 
 LOG = Logger(__file__)
 
+RUN_COMMANDS_CONCURRENCY = 8
+TERMINATE_GRACE_PERIOD = 5.0
+OUTPUT_MAX_MEMORY = 8 * 1024 * 1024
+
 
 class _CLI:
     """
@@ -49,8 +66,13 @@ class _CLI:
     _stderr = b''
     _return_code = None
     _duration = None
+    _timed_out = False
+    _stdout_file = None
+    _stderr_file = None
+    _charset = None
+    _max_memory = OUTPUT_MAX_MEMORY
 
-    def __init__(self, args: [str, list], shell: bool = False) -> None:
+    def __init__(self, args: [str, list], shell: bool = False, run: bool = True) -> None:
         """
         Create a ``Popen`` object.
 
@@ -61,13 +83,15 @@ class _CLI:
 
         :param args: The arguments (as a list or string) to run with Popen.
         :param shell: Whether to run Popen in a shell (default: False)
+        :param run: Whether to run the command now, otherwise ``_run_async`` runs it.
         """
         if shell and isinstance(args, list):
             self.args = ' '.join(args)
         else:
             self.args = args
         self.shell = shell
-        self._run()
+        if run:
+            self._run()
 
     def _run(self) -> None:
         """
@@ -99,6 +123,182 @@ class _CLI:
                 self._return_code = 1
                 LOG.error('Could not decode stdout or stderr recieved from given args: %s. \
 stdout: %s, stderr %s', self.args, stdout, stderr)
+        self._finish(start_time)
+
+    def __iter__(self) -> Iterator[bytes]:
+        """
+        Run the command, yielding each line of ``stdout`` as it arrives.
+
+        The lines are decoded if a ``charset`` was given, see ``stream_command``.
+        """
+        return self._stream()
+
+    def _stream(self) -> Iterator[bytes]:
+        """
+        Invoke the loaded command with ``Popen``, yielding ``stdout`` line by line.
+
+        ``stdout`` and ``stderr`` are also captured in temporary files that
+        stay in memory up to ``self._max_memory`` bytes each and spill to disk
+        beyond that. ``stderr`` is drained by a thread so the command can not
+        block on either pipe. The command runs in its own session, and if the
+        caller stops iterating early its process group is stopped with
+        ``_stop_group``, so processes it started no longer hold the pipes open.
+        """
+        start_time = time()
+        self._stdout_file = tempfile.SpooledTemporaryFile(max_size=self._max_memory)
+        self._stderr_file = tempfile.SpooledTemporaryFile(max_size=self._max_memory)
+        try:
+            command = Popen(self.args, stdout=PIPE, stderr=PIPE, shell=self.shell,
+                            start_new_session=True)
+        except IOError as error:
+            self._stdout_file = self._stderr_file = None
+            self._stderr = error.strerror
+            self._return_code = error.errno
+            LOG.error('Could not find command for given args: %s', self.args)
+            self._finish(start_time)
+            return
+        drain = Thread(target=shutil.copyfileobj, args=(command.stderr, self._stderr_file),
+                       daemon=True)
+        drain.start()
+        decoder = codecs.getincrementaldecoder(self._charset)() if self._charset else None
+        finished = False
+        try:
+            with command:
+                try:
+                    for line in command.stdout:
+                        self._stdout_file.write(line)
+                        yield decoder.decode(line) if decoder else line
+                    finished = True
+                finally:
+                    if not finished:
+                        self._stop_group(command)
+                    drain.join()
+        finally:
+            self._return_code = command.returncode
+            self._finish(start_time)
+        if decoder:
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                yield tail
+
+    def _read(self, spool, default: [str, bytes]) -> [str, bytes]:
+        """
+        Read captured output back from its temporary file, decoding it if requested.
+
+        :param spool: The temporary file, or ``None`` if the output is held in memory.
+        :param default: The output held in memory.
+        """
+        if spool is None:
+            return default
+        spool.seek(0)
+        data = spool.read()
+        if self._charset:
+            try:
+                return data.decode(self._charset)
+            except ValueError as error:
+                LOG.error("Command output was requested to be decoded as"
+                          " %s but failed: %s", self._charset, error)
+                raise error
+        return data
+
+    def stdout_lines(self) -> Iterator[bytes]:
+        """
+        Iterate over the lines of ``stdout``, without reading captured output into memory at once.
+
+        Lines are decoded incrementally if a ``charset`` was given.
+        """
+        if self._stdout_file is None:
+            yield from self.stdout.splitlines(keepends=True)
+            return
+        self._stdout_file.seek(0)
+        if self._charset:
+            yield from codecs.iterdecode(self._stdout_file, self._charset)
+        else:
+            yield from self._stdout_file
+
+    async def _run_async(self, timeout: float = None) -> None:
+        """
+        Invoke the loaded command as an ``asyncio`` subprocess.
+
+        A command still running after ``timeout`` seconds, or whose task is
+        cancelled, is stopped with ``_stop``; a cancellation is re-raised once
+        the command has exited. The command runs in its own session, so any
+        processes it starts are stopped with it.
+
+        :param timeout: Seconds to let the command run, or ``None`` to wait forever.
+        """
+        start_time = time()
+        try:
+            if self.shell:
+                command = await asyncio.create_subprocess_shell(
+                    self.args, stdout=PIPE, stderr=PIPE, start_new_session=True)
+            else:
+                command = await asyncio.create_subprocess_exec(
+                    *self.args, stdout=PIPE, stderr=PIPE, start_new_session=True)
+        except IOError as error:
+            self._stderr = error.strerror
+            self._return_code = error.errno
+            LOG.error('Could not find command for given args: %s', self.args)
+        else:
+            try:
+                self._stdout, self._stderr = await asyncio.wait_for(command.communicate(), timeout)
+            except asyncio.TimeoutError:
+                LOG.error('%s did not finish within %f (sec), stopping it', self.args, timeout)
+                self._timed_out = True
+                self._stderr = f'Command timed out after {timeout} seconds'.encode()
+                await self._stop(command)
+            except asyncio.CancelledError:
+                await self._stop(command)
+                raise
+            self._return_code = command.returncode
+        self._finish(start_time)
+
+    @staticmethod
+    async def _stop(command) -> None:
+        """
+        Terminate a command's process group, then kill what is left of the
+        group, waiting up to ``TERMINATE_GRACE_PERIOD`` for the command to exit
+        in between.
+
+        :param command: The ``asyncio.subprocess.Process`` to stop.
+        """
+        try:
+            os.killpg(command.pid, signal.SIGTERM)
+            try:
+                await asyncio.wait_for(command.wait(), TERMINATE_GRACE_PERIOD)
+            except asyncio.TimeoutError:
+                LOG.error('Command did not exit after SIGTERM, sending SIGKILL')
+            os.killpg(command.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        await command.wait()
+
+    @staticmethod
+    def _stop_group(command: Popen) -> None:
+        """
+        Terminate a command's process group, then kill what is left of the
+        group, waiting up to ``TERMINATE_GRACE_PERIOD`` for the command to exit
+        in between; the blocking counterpart of ``_stop``.
+
+        :param command: The ``Popen`` to stop.
+        """
+        try:
+            os.killpg(command.pid, signal.SIGTERM)
+            try:
+                command.wait(TERMINATE_GRACE_PERIOD)
+            except TimeoutExpired:
+                LOG.error('Command did not exit after SIGTERM, sending SIGKILL')
+            os.killpg(command.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        command.wait()
+
+    def _finish(self, start_time: float) -> None:
+        """
+        Record and log the duration of the command.
+
+        :param start_time: When the command was started.
+        """
         self._duration = time() - start_time
         if self._return_code and self._duration:
             LOG.info(
@@ -113,14 +313,14 @@ stdout: %s, stderr %s', self.args, stdout, stderr)
         """
         ``stdout`` from the command.
         """
-        return self._stdout
+        return self._read(self._stdout_file, self._stdout)
 
     @property
     def stderr(self) -> [str, bytes]:
         """
         ``stderr`` from the command.
         """
-        return self._stderr
+        return self._read(self._stderr_file, self._stderr)
 
     @property
     def return_code(self) -> int:
@@ -136,13 +336,24 @@ stdout: %s, stderr %s', self.args, stdout, stderr)
         """
         return self._duration
 
+    @property
+    def timed_out(self) -> bool:
+        """
+        Whether the command was stopped for running past its timeout.
+        """
+        return self._timed_out
+
     def decode(self, charset: str) -> None:
         """
         Decode ``self.stdout`` and ``self.stderr``.
 
         Decodes ``self._stdout`` and ``self._stderr`` with the given ``charset``.
+        Output captured in temporary files is decoded as it is read.
         :param charset: The character set to decode with.
         """
+        if self._stdout_file is not None:
+            self._charset = charset
+            return
         if not isinstance(self._stdout, str):
             try:
                 self._stdout = self._stdout.decode(charset)
@@ -196,11 +407,67 @@ def chdir(directory: str, create: bool = False) -> None:
         os.chdir(original)
 
 
+@contextmanager
+def file_lock(path: str, shared: bool = False) -> None:
+    """
+    Hold an advisory ``flock`` on ``path`` for the duration of the context.
+
+    The lock file is created (mode 0600) if it does not exist. Use a lock file
+    beside the data file rather than the data file itself, since the data
+    file may be replaced by ``atomic_write`` while the lock is held.
+
+    .. code-block:: python
+
+        from libcsm.os import file_lock
+
+        with file_lock('/run/user/0/libcsm/token.json.lock'):
+            # exclusive access to token.json
+            ...
+
+    :param path: Path of the lock file.
+    :param shared: Take a shared (read) lock instead of an exclusive one.
+    """
+    descriptor = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(descriptor, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(descriptor)
+
+
+def atomic_write(path: str, data: bytes, mode: int = 0o600) -> None:
+    """
+    Atomically replace ``path`` with ``data``.
+
+    The data is written and synced to a temporary file in the same directory,
+    which is then renamed over ``path``, so readers only ever see the old or
+    the new contents. Missing parent directories are created with mode 0700.
+
+    :param path: The file to write.
+    :param data: The contents to write.
+    :param mode: Permissions for the written file (default: 0600).
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(descriptor, 'wb') as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.chmod(temporary, mode)
+        os.replace(temporary, path)
+    except OSError:
+        os.unlink(temporary)
+        raise
+
+
 def run_command(
     args: [list, str],
     in_shell: bool = False,
     silence: bool = False,
     charset: str = None,
+    max_memory: int = None,
 ) -> _CLI:
     """
     Run a given command or list of commands by instantiating a ``CLI`` object.
@@ -218,6 +485,59 @@ def run_command(
     :param charset: Returns the command ``stdout`` and ``stderr`` as a
                     string instead of bytes, and decoded with the given
                     ``charset``.
+    :param max_memory: Capture ``stdout`` and ``stderr`` in temporary files that
+                       spill to disk beyond this many bytes each, instead of
+                       holding all of the output in memory.
+    """
+    args_string = [str(x) for x in args]
+    if not silence:
+        LOG.info(
+            'Running sub-command: %s (in shell: %s)',
+            ' '.join(args_string),
+            in_shell
+        )
+    if max_memory is None:
+        result = _CLI(args_string, shell=in_shell)
+    else:
+        result = _CLI(args_string, shell=in_shell, run=False)
+        result._max_memory = max_memory
+        for _ in result:
+            pass
+    if charset:
+        result.decode(charset)
+    return result
+
+
+async def run_command_async(
+    args: [list, str],
+    in_shell: bool = False,
+    silence: bool = False,
+    charset: str = None,
+    timeout: float = None,
+) -> _CLI:
+    """
+    Run a command from a coroutine, like ``run_command`` but without blocking a thread.
+
+    A command still running after ``timeout`` seconds is sent ``SIGTERM``, then
+    ``SIGKILL`` if it has not exited after ``TERMINATE_GRACE_PERIOD`` seconds;
+    the result's ``timed_out`` is set. Cancelling the calling task stops the
+    command the same way before the cancellation propagates.
+
+    .. code-block:: python
+
+        import asyncio
+        from libcsm.os import run_command_async
+
+        result = asyncio.run(run_command_async(['kubectl', 'get', 'nodes'], timeout=30))
+        print(result.return_code, result.timed_out)
+
+    :param args: List of arguments to run, can also be a string.
+    :param in_shell: Whether to use a shell when invoking the command.
+    :param silence: Tells this not to output the command to console.
+    :param charset: Returns the command ``stdout`` and ``stderr`` as a
+                    string instead of bytes, and decoded with the given
+                    ``charset``.
+    :param timeout: Seconds to let the command run, or ``None`` to wait forever.
     """
     args_string = [str(x) for x in args]
     if not silence:
@@ -226,7 +546,97 @@ def run_command(
             ' '.join(args_string),
             in_shell
         )
-    result = _CLI(args_string, shell=in_shell)
+    result = _CLI(args_string, shell=in_shell, run=False)
+    await result._run_async(timeout)
     if charset:
         result.decode(charset)
     return result
+
+
+def run_commands(
+    commands: Iterable[list],
+    concurrency: int = RUN_COMMANDS_CONCURRENCY,
+    ordered: bool = True,
+    **kwargs,
+) -> Iterator[_CLI]:
+    """
+    Run many commands, at most ``concurrency`` at a time.
+
+    Every command is started by ``run_command`` on a pool of
+    ``concurrency`` threads as soon as this is called, so the commands take
+    about as long as the slowest of them rather than the sum of them. The
+    results are the same ``_CLI`` objects, with each command's ``args`` and
+    ``duration``.
+
+    .. code-block:: python
+
+        from libcsm.os import run_commands
+
+        commands = [['ssh', host, 'uptime'] for host in ['ncn-m001', 'ncn-m002']]
+        for result in run_commands(commands, concurrency=4, ordered=False):
+            print(result.args, result.return_code, result.duration)
+
+    :param commands: The arguments of each command, see ``run_command``.
+    :param concurrency: The most commands running at once.
+    :param ordered: Yield the results in the order of ``commands`` (default), or
+                    otherwise as each command finishes.
+    :param kwargs: Passed to ``run_command``, e.g. ``in_shell`` or ``charset``.
+    :returns: An iterator of the results.
+    """
+    if concurrency < 1:
+        raise ValueError(f'ERROR concurrency must be at least 1, recieved {concurrency}')
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    futures = [executor.submit(run_command, command, **kwargs) for command in commands]
+    executor.shutdown(wait=False)
+
+    def results() -> Iterator[_CLI]:
+        for future in futures if ordered else as_completed(futures):
+            yield future.result()
+
+    return results()
+
+
+def stream_command(
+    args: [list, str],
+    in_shell: bool = False,
+    silence: bool = False,
+    charset: str = None,
+    max_memory: int = OUTPUT_MAX_MEMORY,
+) -> _CLI:
+    """
+    Prepare a command whose ``stdout`` is yielded line by line as it is produced.
+
+    The command runs when the result is iterated. Each line is bytes, or a
+    string decoded incrementally with ``charset`` so multi-byte characters
+    split across reads are kept whole. All of the output is also captured,
+    spilling to temporary files beyond ``max_memory`` bytes, so ``stdout``,
+    ``stderr``, and ``return_code`` are available once iteration finishes.
+    Breaking out of the loop early terminates the command.
+
+    .. code-block:: python
+
+        from libcsm.os import stream_command
+
+        result = stream_command(['journalctl', '-u', 'kubelet'], charset='utf-8')
+        for line in result:
+            print(line, end='')
+        print(result.return_code)
+
+    :param args: List of arguments to run, can also be a string.
+    :param in_shell: Whether to use a shell when invoking the command.
+    :param silence: Tells this not to output the command to console.
+    :param charset: Decode each line, and the captured output, with this ``charset``.
+    :param max_memory: Bytes of each of ``stdout`` and ``stderr`` to hold in memory
+                       before spilling to a temporary file.
+    """
+    args_string = [str(x) for x in args]
+    if not silence:
+        LOG.info(
+            'Streaming sub-command: %s (in shell: %s)',
+            ' '.join(args_string),
+            in_shell
+        )
+    result = _CLI(args_string, shell=in_shell, run=False)
+    result._max_memory = max_memory
+    result._charset = charset
+    return result
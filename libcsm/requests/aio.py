@@ -0,0 +1,218 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+An ``asyncio`` client for the CSM API gateway, built on ``aiohttp``.
+
+``aiohttp`` is an optional dependency, installed with the ``async`` extra
+(``pip install libcsm[async]``), and only imported once a client sends its
+first request.
+
+The async clients behave like their blocking counterparts: they share the
+process-wide token cache with ``libcsm.api.Auth`` and the retry policy in
+``libcsm.requests.retry``, and raise ``requests.exceptions.RequestException``
+for failed requests, so callers can handle errors the same way on either
+path. Up to ``concurrency`` requests are in flight at once per client; the
+service's adaptive limiter in ``libcsm.requests.breaker`` is widened to allow
+that many when the client sends its first request, and only lowers it while
+the service is failing or slow.
+"""
+import asyncio
+import json
+import ssl
+from os import getenv
+from typing import NamedTuple
+import certifi
+import requests
+from libcsm import api
+from libcsm.requests.retry import RETRY_POLICY
+
+ASYNC_CONCURRENCY = 100
+ASYNC_TIMEOUT = 60
+
+
+class AsyncResponse(NamedTuple):
+    """
+    A response read in full from the API gateway.
+    """
+
+    status_code: int
+    headers: dict
+    content: bytes
+
+    def json(self):
+        """
+        Decode the body as JSON.
+
+        :raises ValueError: When the body is not valid JSON.
+        """
+        return json.loads(self.content)
+
+
+class AsyncClient:
+    """
+    Base class for ``asyncio`` clients of services behind the API gateway.
+
+    Clients are async context managers; the underlying ``aiohttp`` session is
+    created inside the running event loop on first use and closed on exit.
+    """
+
+    service = 'api'
+    """The call class requests are retried under, e.g. ``bss``."""
+
+    def __init__(self, api_gateway_address: str = "api-gw-service-nmn.local",
+                 concurrency: int = ASYNC_CONCURRENCY, auth: api.Auth = None,
+                 crt_variable: str = "REQUESTS_CA_BUNDLE") -> None:
+        """
+        :param api_gateway_address: The hostname of the API gateway.
+        :param concurrency: The most requests in flight at once.
+        :param auth: The ``Auth`` to get tokens from (default: a new ``Auth``).
+        :param crt_variable: Variable holding the certificate.
+        """
+        if concurrency < 1:
+            raise ValueError(f'ERROR concurrency must be at least 1, recieved {concurrency}')
+        self.api_gateway_address = api_gateway_address
+        self.concurrency = concurrency
+        self.crt_path = getenv(crt_variable, certifi.where())
+        self._auth = auth
+        self._auth_lock = None
+        self._semaphore = None
+        self._session = None
+
+    async def __aenter__(self):
+        """
+        Use the client in an ``async with`` block.
+        """
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        """
+        Close the client at the end of an ``async with`` block.
+        """
+        await self.close()
+
+    async def close(self) -> None:
+        """
+        Close the ``aiohttp`` session and its connections.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self):
+        """
+        Get the ``aiohttp`` session, creating it in the running event loop if needed.
+
+        Creating it also widens the service's limiter to this client's concurrency.
+        """
+        if self._session is None:
+            try:
+                import aiohttp
+            except ImportError as error:
+                raise ImportError('The async clients need aiohttp, install libcsm[async].') from error
+            connector = aiohttp.TCPConnector(limit=self.concurrency,
+                                             ssl=ssl.create_default_context(cafile=self.crt_path))
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=ASYNC_TIMEOUT),
+            )
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            RETRY_POLICY.guards.get(self.service).limiter.widen(self.concurrency)
+        return self._session
+
+    async def token(self, rejected: str = None) -> str:
+        """
+        Get the authentication token, fetching or refreshing it in a worker thread if needed.
+
+        :param rejected: A token the API gateway rejected. It is replaced with a new token,
+                         unless another request already replaced it.
+        :raises AuthException: if the Kubernetes configuration is invalid.
+        """
+        if self._auth_lock is None:
+            self._auth_lock = asyncio.Lock()
+        async with self._auth_lock:
+            # Only ``current_token`` is read here, reading ``token`` could
+            # refresh it and block the event loop.
+            if self._auth is None:
+                auth = api.Auth()
+                await asyncio.to_thread(auth.refresh_token)
+                self._auth = auth
+            elif rejected is not None and self._auth.current_token == rejected:
+                await asyncio.to_thread(self._auth.refresh_token, force=True, rejected=rejected)
+            elif self._auth.expiring or self._auth.current_token is None:
+                await asyncio.to_thread(self._auth.refresh_token)
+            return self._auth.current_token
+
+    async def _send(self, method: str, url: str, headers: dict, data: str = None) -> AsyncResponse:
+        """
+        Send one request, reading the whole response.
+
+        :param method: The HTTP method.
+        :param url: The URL.
+        :param headers: The request headers.
+        :param data: The request body.
+        :raises requests.exceptions.RequestException: When the request could not be sent.
+        """
+        import aiohttp
+
+        session = self._get_session()
+        async with self._semaphore:
+            try:
+                async with session.request(method, url, headers=headers, data=data) as response:
+                    content = await response.read()
+                    return AsyncResponse(response.status, dict(response.headers), content)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+                # Raise the exception requests would, so the retry policy treats both alike.
+                if isinstance(ex, aiohttp.ClientConnectorError):
+                    error = requests.exceptions.ConnectionError
+                elif isinstance(ex, asyncio.TimeoutError):
+                    error = requests.exceptions.Timeout
+                else:
+                    error = requests.exceptions.RequestException
+                raise error(f'ERROR exception: ' \
+                    f'{type(ex).__name__} when trying to {method} {url}') from ex
+
+    async def request(self, method: str, url: str, headers: dict = None,
+                      data: str = None) -> AsyncResponse:
+        """
+        Send an authenticated request to the API gateway, retrying transient failures.
+
+        :param method: The HTTP method.
+        :param url: The URL.
+        :param headers: Extra request headers.
+        :param data: The request body.
+        :raises requests.exceptions.RequestException: When the request could not be sent.
+        :returns: The last response.
+        """
+        sent = []
+
+        async def send() -> AsyncResponse:
+            token = await self.token()
+            sent.append(token)
+            return await self._send(method, url,
+                                    {'Authorization': f'Bearer {token}', **(headers or {})}, data)
+
+        async def refresh() -> None:
+            await self.token(rejected=sent[-1])
+
+        return await RETRY_POLICY.call_async(self.service, method, send, refresh)
@@ -0,0 +1,454 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Circuit breakers and adaptive concurrency limits for API gateway services.
+
+Every request made through ``libcsm.requests.retry`` passes through the
+``ServiceGuard`` of its service (``sls``, ``hsm``, ``bss``):
+
+* A ``CircuitBreaker`` opens after ``failure_threshold`` consecutive failures
+  and rejects requests with ``CircuitOpenException`` for ``reset_timeout``
+  seconds. It then lets one trial request through (half-open), closing again
+  if it succeeds and re-opening if it fails. Once the circuit has opened,
+  late outcomes of requests sent before it opened are ignored.
+* An ``AdaptiveLimiter`` caps the requests in flight. The cap grows by one
+  for every ``limit`` requests that succeed within ``latency_target`` seconds,
+  and halves on a failure or a slower response (AIMD), so bulk operations
+  slow down when the gateway degrades instead of piling on. It halves at most
+  once per round trip: requests already in flight when it halved do not
+  halve it again. The cap starts at ``LIMIT_INITIAL`` and never exceeds
+  ``LIMIT_MAX``, unless an async client asks for more concurrency, see
+  ``AdaptiveLimiter.widen``.
+
+Connection errors, timeouts, ``429``, and ``5xx`` responses are failures,
+other responses are successes. ``GUARDS.stats()`` reports the state of
+every service.
+"""
+import asyncio
+from collections import deque
+from typing import NamedTuple
+import http
+from threading import Condition
+from threading import Lock
+from time import monotonic
+import requests
+
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 30.0
+LIMIT_INITIAL = 32
+LIMIT_MIN = 1
+LIMIT_MAX = 512
+LIMIT_LATENCY_TARGET = 2.0
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitOpenException(requests.exceptions.RequestException):
+    """
+    An exception for requests rejected because their service's circuit is open.
+    """
+
+
+def is_failure(status_code: int = None, error: Exception = None) -> bool:
+    """
+    Whether a response or error means the service is struggling.
+
+    :param status_code: The response status, if a response was received.
+    :param error: The exception raised instead of a response.
+    """
+    if error is not None:
+        return True
+    return status_code == http.HTTPStatus.TOO_MANY_REQUESTS \
+        or status_code >= http.HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+class CircuitBreaker:
+    """
+    A circuit breaker with closed, open, and half-open states.
+    """
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = BREAKER_RESET_TIMEOUT) -> None:
+        """
+        :param failure_threshold: Consecutive failures that open the circuit.
+        :param reset_timeout: Seconds the circuit stays open before a trial request.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._trial = None
+        self._lock = Lock()
+
+    @property
+    def state(self) -> str:
+        """
+        The state of the circuit, one of ``closed``, ``open``, or ``half-open``.
+        """
+        with self._lock:
+            if self._state == OPEN and monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = HALF_OPEN
+            return self._state
+
+    def allow(self) -> [object, bool]:
+        """
+        Whether a request may be sent now; in the half-open state only one trial request is.
+
+        :returns: A ticket to pass to ``record``, true if the request may be sent.
+        """
+        state = self.state
+        with self._lock:
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._trial is None:
+                self._trial = object()
+                return self._trial
+            return False
+
+    def record(self, failed: bool = None, ticket: [object, bool] = True) -> None:
+        """
+        Record the outcome of a request.
+
+        Only the trial request's outcome counts while the circuit is not
+        closed; others were sent before it opened.
+
+        :param failed: Whether the request failed, or ``None`` if it was abandoned.
+        :param ticket: The ticket ``allow`` returned for the request.
+        """
+        with self._lock:
+            if self._trial is not None and ticket is self._trial:
+                self._trial = None
+            elif self._state != CLOSED:
+                return
+            if failed is None:
+                return
+            if not failed:
+                self._state = CLOSED
+                self._failures = 0
+                return
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = monotonic()
+
+    def stats(self) -> dict:
+        """
+        Return the state and consecutive failures of the circuit.
+        """
+        state = self.state
+        with self._lock:
+            return {'state': state, 'failures': self._failures}
+
+
+class AdaptiveLimiter:
+    """
+    An AIMD limit on the requests in flight, driven by latency and errors.
+
+    Threads wait on a condition, coroutines wait in a FIFO queue and are
+    handed a slot as one is released.
+    """
+
+    def __init__(self, initial: int = LIMIT_INITIAL, minimum: int = LIMIT_MIN,
+                 maximum: int = LIMIT_MAX, latency_target: float = LIMIT_LATENCY_TARGET) -> None:
+        """
+        :param initial: The starting limit.
+        :param minimum: The lowest the limit can fall to.
+        :param maximum: The highest the limit can grow to.
+        :param latency_target: Seconds a response may take before the limit is reduced.
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self._limit = float(initial)
+        self._inflight = 0
+        self._decreased_at = None
+        self._condition = Condition()
+        self._waiters = deque()
+
+    @property
+    def limit(self) -> int:
+        """
+        The number of requests currently allowed in flight.
+        """
+        return max(self.minimum, int(self._limit))
+
+    def try_acquire(self) -> bool:
+        """
+        Take a slot for a request if one is free.
+
+        :returns: Whether a slot was taken.
+        """
+        with self._condition:
+            if self._inflight >= self.limit or self._waiters:
+                return False
+            self._inflight += 1
+            return True
+
+    def acquire(self) -> None:
+        """
+        Take a slot for a request, waiting for one to be free.
+        """
+        with self._condition:
+            while self._inflight >= self.limit or self._waiters:
+                self._condition.wait()
+            self._inflight += 1
+
+    async def acquire_async(self) -> None:
+        """
+        Take a slot for a request, waiting in turn without blocking the event loop.
+        """
+        with self._condition:
+            if self._inflight < self.limit and not self._waiters:
+                self._inflight += 1
+                return
+            waiter = (asyncio.get_running_loop(), asyncio.get_running_loop().create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._condition:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    self._condition.notify_all()
+                    granted = False
+                else:
+                    granted = waiter[1].done() and not waiter[1].cancelled()
+            if granted:
+                self.release()
+            raise
+
+    def _grant(self, future: asyncio.Future) -> None:
+        """
+        Wake a coroutine handed a slot, or give the slot back if it was cancelled.
+
+        :param future: The coroutine's future.
+        """
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+    def _wake(self) -> None:
+        """
+        Hand free slots to waiting coroutines in order, then wake waiting threads.
+
+        Must be called holding ``self._condition``.
+        """
+        while self._waiters and self._inflight < self.limit:
+            loop, future = self._waiters.popleft()
+            self._inflight += 1
+            try:
+                loop.call_soon_threadsafe(self._grant, future)
+            except RuntimeError:
+                # The waiter's event loop is closed, nobody will take the slot.
+                self._inflight -= 1
+        self._condition.notify_all()
+
+    def widen(self, concurrency: int) -> None:
+        """
+        Let the limit reach ``concurrency``, starting there unless it has already been reduced.
+
+        Async clients call this with their own concurrency so the limiter does
+        not cap it below what the caller asked for; the limit still halves if
+        the service degrades.
+
+        :param concurrency: The requests in flight the caller wants.
+        """
+        with self._condition:
+            self.maximum = max(self.maximum, concurrency)
+            if self._decreased_at is None and self._limit < concurrency:
+                self._limit = float(concurrency)
+                self._wake()
+
+    def release(self, latency: float = None, failed: bool = False) -> None:
+        """
+        Free a slot and adjust the limit from the request's outcome.
+
+        A failure or slow response halves the limit only if the request was
+        sent after the limit last halved, so one burst of slow responses
+        halves it once.
+
+        :param latency: Seconds the request took, or ``None`` to leave the limit unchanged.
+        :param failed: Whether the request failed.
+        """
+        with self._condition:
+            self._inflight -= 1
+            now = monotonic()
+            if latency is None:
+                pass
+            elif failed or latency > self.latency_target:
+                if self._decreased_at is None or now - latency >= self._decreased_at:
+                    self._limit = max(float(self.minimum), self._limit / 2)
+                    self._decreased_at = now
+            else:
+                self._limit = min(float(self.maximum), self._limit + 1 / self._limit)
+            self._wake()
+
+    def stats(self) -> dict:
+        """
+        Return the limit and the requests in flight.
+        """
+        with self._condition:
+            return {'limit': self.limit, 'inflight': self._inflight}
+
+
+class Permit(NamedTuple):
+    """
+    A request admitted by ``ServiceGuard.acquire``.
+    """
+
+    started: float
+    ticket: [object, bool]
+
+
+class ServiceGuard:
+    """
+    The circuit breaker and concurrency limiter of one service.
+    """
+
+    def __init__(self, breaker: CircuitBreaker = None, limiter: AdaptiveLimiter = None) -> None:
+        """
+        :param breaker: The circuit breaker (default: a new ``CircuitBreaker``).
+        :param limiter: The concurrency limiter (default: a new ``AdaptiveLimiter``).
+        """
+        self.breaker = breaker or CircuitBreaker()
+        self.limiter = limiter or AdaptiveLimiter()
+
+    def _check(self, service: str) -> Permit:
+        """
+        Raise if the circuit rejects the request.
+
+        :param service: The service name, for the error message.
+        :raises CircuitOpenException: When the circuit is open.
+        :returns: The permit to pass to ``release``.
+        """
+        ticket = self.breaker.allow()
+        if not ticket:
+            raise CircuitOpenException(f'ERROR the circuit for {service} is open after ' \
+                f'repeated failures, not sending the request.')
+        return Permit(monotonic(), ticket)
+
+    def acquire(self, service: str) -> Permit:
+        """
+        Wait for a slot and check the circuit before sending a request.
+
+        :param service: The service name, for the error message.
+        :raises CircuitOpenException: When the circuit is open.
+        :returns: The permit to pass to ``release``.
+        """
+        self.limiter.acquire()
+        try:
+            return self._check(service)
+        except CircuitOpenException:
+            self.limiter.release()
+            raise
+
+    async def acquire_async(self, service: str) -> Permit:
+        """
+        Wait for a slot and check the circuit, from a coroutine.
+
+        :param service: The service name, for the error message.
+        :raises CircuitOpenException: When the circuit is open.
+        :returns: The permit to pass to ``release``.
+        """
+        await self.limiter.acquire_async()
+        try:
+            return self._check(service)
+        except CircuitOpenException:
+            self.limiter.release()
+            raise
+
+    def release(self, permit: Permit, status_code: int = None, error: Exception = None) -> None:
+        """
+        Record the outcome of a request started with ``acquire``.
+
+        :param permit: The permit returned by ``acquire``.
+        :param status_code: The response status, if a response was received.
+        :param error: The exception raised instead of a response.
+        """
+        failed = is_failure(status_code, error)
+        self.breaker.record(failed, permit.ticket)
+        self.limiter.release(monotonic() - permit.started, failed)
+
+    def abandon(self, permit: Permit) -> None:
+        """
+        Free the slot of a request that ended without an outcome, e.g. it was cancelled.
+
+        :param permit: The permit returned by ``acquire``.
+        """
+        self.breaker.record(None, permit.ticket)
+        self.limiter.release()
+
+    def stats(self) -> dict:
+        """
+        Return the state of the circuit breaker and limiter.
+        """
+        return {**self.breaker.stats(), **self.limiter.stats()}
+
+
+class Guards:
+    """
+    The ``ServiceGuard`` of every service, created on first use.
+    """
+
+    def __init__(self) -> None:
+        self._guards = {}
+        self._lock = Lock()
+
+    def get(self, service: str) -> ServiceGuard:
+        """
+        Get the guard of a service.
+
+        :param service: The service, e.g. ``bss``.
+        """
+        with self._lock:
+            guard = self._guards.get(service)
+            if guard is None:
+                guard = ServiceGuard()
+                self._guards[service] = guard
+            return guard
+
+    def stats(self) -> dict:
+        """
+        Return the state of every service.
+
+        :returns: A dictionary of ``{service: {'state': str, 'failures': int, 'limit': int,
+                  'inflight': int}}``.
+        """
+        with self._lock:
+            guards = dict(self._guards)
+        return {service: guard.stats() for service, guard in guards.items()}
+
+    def reset(self) -> None:
+        """
+        Forget every guard, closing every circuit.
+        """
+        with self._lock:
+            self._guards.clear()
+
+
+GUARDS = Guards()
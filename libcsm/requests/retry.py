@@ -0,0 +1,367 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+A retry policy shared by the SLS, HSM, and BSS clients.
+
+Transient failures are retried with exponential backoff and full jitter:
+
+* Idempotent requests (``GET``, ``HEAD``, ...) are retried after connection
+  errors, timeouts, and ``429``, ``502``, ``503``, or ``504`` responses.
+* Other requests (``PATCH``, ``POST``) are only retried when the request can
+  not have been applied: a connection that timed out before it was
+  established, or a ``429`` or ``503`` response.
+* A ``401`` response forces one token refresh, then the request is resent.
+  Concurrent refreshes share one token request through the token cache.
+
+Retries for each call class (e.g. ``bss``) are limited by a ``RetryBudget``,
+so an outage does not multiply the load on the API gateway. Every attempt
+also passes through the call class's circuit breaker and concurrency limiter
+from ``libcsm.requests.breaker``.
+"""
+import asyncio
+import http
+import random
+from collections import deque
+from threading import Lock
+from time import monotonic
+from time import sleep
+import requests
+from libcsm.requests.breaker import GUARDS
+
+RETRY_MAX_ATTEMPTS = 4
+RETRY_BACKOFF = 0.5
+RETRY_MAX_BACKOFF = 10.0
+RETRY_BUDGET_RATIO = 0.2
+RETRY_BUDGET_MINIMUM = 10
+RETRY_BUDGET_WINDOW = 10.0
+
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+RETRY_STATUSES = frozenset([
+    http.HTTPStatus.TOO_MANY_REQUESTS,
+    http.HTTPStatus.BAD_GATEWAY,
+    http.HTTPStatus.SERVICE_UNAVAILABLE,
+    http.HTTPStatus.GATEWAY_TIMEOUT,
+])
+# Responses sent before a request is processed, safe to retry for any method.
+REJECTED_STATUSES = frozenset([
+    http.HTTPStatus.TOO_MANY_REQUESTS,
+    http.HTTPStatus.SERVICE_UNAVAILABLE,
+])
+
+
+def _bearer(response: requests.Response) -> [str, None]:
+    """
+    Return the token a response's request was sent with, if it is known.
+
+    :param response: The response.
+    """
+    request = getattr(response, 'request', None)
+    header = request.headers.get('Authorization', '') if request is not None else ''
+    return header[len('Bearer '):] if header.startswith('Bearer ') else None
+
+
+def _discard(response) -> None:
+    """
+    Close a response that will not be used, returning a streamed connection to its pool.
+
+    :param response: The response.
+    """
+    close = getattr(response, 'close', None)
+    if close is not None:
+        close()
+
+
+class RetryBudget:
+    """
+    Limits retries to ``ratio`` of the requests made in the last ``window``
+    seconds, plus ``minimum`` retries so quiet callers can still retry.
+    """
+
+    def __init__(self, ratio: float = RETRY_BUDGET_RATIO, minimum: int = RETRY_BUDGET_MINIMUM,
+                 window: float = RETRY_BUDGET_WINDOW) -> None:
+        """
+        :param ratio: Retries allowed per request.
+        :param minimum: Retries always allowed per window.
+        :param window: Seconds requests and retries are counted over.
+        """
+        self.ratio = ratio
+        self.minimum = minimum
+        self.window = window
+        self._requests = deque()
+        self._retries = deque()
+        self._lock = Lock()
+
+    def _expire(self, now: float) -> None:
+        """
+        Forget requests and retries older than ``window``.
+
+        :param now: The current monotonic time.
+        """
+        for events in (self._requests, self._retries):
+            while events and now - events[0] >= self.window:
+                events.popleft()
+
+    def deposit(self) -> None:
+        """
+        Record a request.
+        """
+        with self._lock:
+            now = monotonic()
+            self._expire(now)
+            self._requests.append(now)
+
+    def withdraw(self) -> bool:
+        """
+        Record a retry if the budget allows one.
+
+        :returns: Whether the retry is allowed.
+        """
+        with self._lock:
+            now = monotonic()
+            self._expire(now)
+            if len(self._retries) >= self.minimum + self.ratio * len(self._requests):
+                return False
+            self._retries.append(now)
+            return True
+
+
+class RetryPolicy:
+    """
+    Decides whether and when to retry a request, and counts what it did.
+
+    ``stats()`` reports, for each call class, the ``requests`` made,
+    ``retries`` taken, forced token ``refreshes``, and requests that failed
+    once retries were ``exhausted`` by ``max_attempts`` or the budget.
+    """
+
+    def __init__(self, max_attempts: int = RETRY_MAX_ATTEMPTS, backoff: float = RETRY_BACKOFF,
+                 max_backoff: float = RETRY_MAX_BACKOFF, budget_ratio: float = RETRY_BUDGET_RATIO,
+                 budget_minimum: int = RETRY_BUDGET_MINIMUM) -> None:
+        """
+        :param max_attempts: The most times a request is sent, including the first.
+        :param backoff: Seconds the first backoff is drawn from, doubled for each retry.
+        :param max_backoff: The longest backoff in seconds.
+        :param budget_ratio: Retries allowed per request, per call class.
+        :param budget_minimum: Retries always allowed per budget window, per call class.
+        """
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.budget_ratio = budget_ratio
+        self.budget_minimum = budget_minimum
+        self.budget_window = RETRY_BUDGET_WINDOW
+        self.guards = GUARDS
+        self._budgets = {}
+        self._stats = {}
+        self._lock = Lock()
+
+    def budget(self, call_class: str) -> RetryBudget:
+        """
+        Return the retry budget of a call class.
+
+        :param call_class: The call class, e.g. ``bss``.
+        """
+        with self._lock:
+            budget = self._budgets.get(call_class)
+            if budget is None:
+                budget = RetryBudget(self.budget_ratio, self.budget_minimum, self.budget_window)
+                self._budgets[call_class] = budget
+            return budget
+
+    def _record(self, call_class: str, event: str) -> None:
+        """
+        Count an event for a call class.
+
+        :param call_class: The call class.
+        :param event: One of ``requests``, ``retries``, ``refreshes``, or ``exhausted``.
+        """
+        with self._lock:
+            counts = self._stats.setdefault(call_class, dict.fromkeys(
+                ['requests', 'retries', 'refreshes', 'exhausted'], 0))
+            counts[event] += 1
+
+    def stats(self) -> dict:
+        """
+        Return the retry counters of every call class.
+
+        :returns: A dictionary of ``{call_class: {'requests': int, 'retries': int, ...}}``.
+        """
+        with self._lock:
+            return {call_class: dict(counts) for call_class, counts in self._stats.items()}
+
+    def reset(self) -> None:
+        """
+        Forget every budget and counter.
+        """
+        with self._lock:
+            self._budgets.clear()
+            self._stats.clear()
+
+    @staticmethod
+    def retryable(method: str, status: int = None, error: Exception = None) -> bool:
+        """
+        Whether a failed request may be sent again.
+
+        :param method: The HTTP method.
+        :param status: The response status, if a response was received.
+        :param error: The exception raised instead of a response.
+        """
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        if error is not None:
+            if isinstance(error, requests.exceptions.ConnectTimeout):
+                return True
+            return idempotent and isinstance(
+                error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+        return status in (RETRY_STATUSES if idempotent else REJECTED_STATUSES)
+
+    def delay(self, attempt: int, headers: dict = None) -> float:
+        """
+        Return the backoff before sending a request again.
+
+        :param attempt: The number of times the request was sent.
+        :param headers: The failed response's headers, a ``Retry-After`` in seconds is honoured.
+        """
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+        try:
+            retry_after = float((headers or {}).get('Retry-After'))
+        except (TypeError, ValueError):
+            return delay
+        return max(delay, min(retry_after, self.max_backoff))
+
+    def _next_delay(self, call_class: str, method: str, attempt: int, response=None,
+                    error: Exception = None) -> [float, None]:
+        """
+        Decide whether to retry a request.
+
+        :param call_class: The call class.
+        :param method: The HTTP method.
+        :param attempt: The number of times the request was sent.
+        :param response: The response, if one was received.
+        :param error: The exception raised instead of a response.
+        :returns: The backoff before retrying, or ``None`` to give up.
+        """
+        status = getattr(response, 'status_code', None)
+        if not self.retryable(method, status, error):
+            return None
+        if attempt >= self.max_attempts or not self.budget(call_class).withdraw():
+            self._record(call_class, 'exhausted')
+            return None
+        self._record(call_class, 'retries')
+        return self.delay(attempt, getattr(response, 'headers', None))
+
+    def call(self, call_class: str, method: str, send, auth=None) -> requests.Response:
+        """
+        Send a request, retrying it as the policy allows.
+
+        ``send`` is called for each attempt and must read the token from
+        ``auth`` each time, so a resent request uses the refreshed token.
+
+        :param call_class: The call class, e.g. ``bss``.
+        :param method: The HTTP method ``send`` uses.
+        :param send: A callable sending the request and returning the response.
+        :param auth: The ``libcsm.api.Auth`` to refresh on a ``401`` response.
+        :raises requests.exceptions.RequestException: When the last attempt raised.
+        :returns: The last response.
+        """
+        self._record(call_class, 'requests')
+        self.budget(call_class).deposit()
+        guard = self.guards.get(call_class)
+        refreshed = False
+        attempt = 0
+        while True:
+            attempt += 1
+            permit = guard.acquire(call_class)
+            try:
+                response = send()
+            except requests.exceptions.RequestException as error:
+                guard.release(permit, error=error)
+                delay = self._next_delay(call_class, method, attempt, error=error)
+                if delay is None:
+                    raise
+                sleep(delay)
+                continue
+            except BaseException:
+                guard.abandon(permit)
+                raise
+            guard.release(permit, status_code=response.status_code)
+            if response.status_code == http.HTTPStatus.UNAUTHORIZED and auth is not None \
+                    and not refreshed:
+                refreshed = True
+                self._record(call_class, 'refreshes')
+                _discard(response)
+                auth.refresh_token(force=True, rejected=_bearer(response))
+                continue
+            delay = self._next_delay(call_class, method, attempt, response=response)
+            if delay is None:
+                return response
+            _discard(response)
+            sleep(delay)
+
+    async def call_async(self, call_class: str, method: str, send, refresh=None):
+        """
+        Send a request from a coroutine, retrying it as the policy allows.
+
+        The ``asyncio`` counterpart of ``call``, sharing its budgets and counters.
+
+        :param call_class: The call class, e.g. ``bss``.
+        :param method: The HTTP method ``send`` uses.
+        :param send: A coroutine function sending the request and returning the response.
+        :param refresh: A coroutine function forcing a token refresh on a ``401`` response.
+        :raises requests.exceptions.RequestException: When the last attempt raised.
+        :returns: The last response.
+        """
+        self._record(call_class, 'requests')
+        self.budget(call_class).deposit()
+        guard = self.guards.get(call_class)
+        refreshed = False
+        attempt = 0
+        while True:
+            attempt += 1
+            permit = await guard.acquire_async(call_class)
+            try:
+                response = await send()
+            except requests.exceptions.RequestException as error:
+                guard.release(permit, error=error)
+                delay = self._next_delay(call_class, method, attempt, error=error)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                guard.abandon(permit)
+                raise
+            guard.release(permit, status_code=response.status_code)
+            if response.status_code == http.HTTPStatus.UNAUTHORIZED and refresh is not None \
+                    and not refreshed:
+                refreshed = True
+                self._record(call_class, 'refreshes')
+                await refresh()
+                continue
+            delay = self._next_delay(call_class, method, attempt, response=response)
+            if delay is None:
+                return response
+            await asyncio.sleep(delay)
+
+
+RETRY_POLICY = RetryPolicy()
@@ -23,21 +23,153 @@
 #
 """
 Common functions for working with ``requests.session`` in libCSM.
+
+Sessions are pooled per process: every call to ``get_session`` for the same
+host and certificate bundle returns the same ``requests.Session``, so repeated
+calls to SLS, HSM, and BSS reuse kept-alive connections instead of paying for
+a new TCP and TLS handshake each time.
 """
 
 from os import getenv
+from threading import Lock
 import requests
+from requests.adapters import HTTPAdapter
 import certifi
 
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 16
+
+
+class _CountingAdapter(HTTPAdapter):
+    """
+    An ``HTTPAdapter`` that tracks how many connections it opened and how
+    many requests were served over them.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        self._retired_connections = 0
+        self._retired_requests = 0
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        """
+        Create the pool manager, keeping the counts of pools it evicts.
+        """
+        super().init_poolmanager(*args, **kwargs)
+        pools = self.poolmanager.pools
+        dispose = pools.dispose_func
+
+        def retire(pool) -> None:
+            self._retired_connections += pool.num_connections
+            self._retired_requests += pool.num_requests
+            if dispose is not None:
+                dispose(pool)
+
+        pools.dispose_func = retire
+
+    def stats(self) -> dict:
+        """
+        Return the connection counters for this adapter.
+
+        :returns: A dictionary with the ``opened`` and ``reused`` counts.
+        """
+        opened = self._retired_connections
+        served = self._retired_requests
+        pools = self.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                opened += pool.num_connections
+                served += pool.num_requests
+        return {'opened': opened, 'reused': max(served - opened, 0)}
+
+
+class SessionManager:
+    """
+    A thread-safe pool of ``requests.Session`` objects keyed by host and
+    certificate bundle.
+    """
+
+    def __init__(self, pool_connections: int = POOL_CONNECTIONS,
+                 pool_maxsize: int = POOL_MAXSIZE) -> None:
+        """
+        :param pool_connections: Number of hosts to keep connection pools for per session.
+        :param pool_maxsize: Maximum connections kept alive per host.
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self._sessions = {}
+        self._lock = Lock()
+
+    def configure(self, pool_connections: int = None, pool_maxsize: int = None) -> None:
+        """
+        Change the pool sizes; existing sessions are closed and recreated on
+        their next use.
+
+        :param pool_connections: Number of hosts to keep connection pools for per session.
+        :param pool_maxsize: Maximum connections kept alive per host.
+        """
+        with self._lock:
+            if pool_connections is not None:
+                self.pool_connections = pool_connections
+            if pool_maxsize is not None:
+                self.pool_maxsize = pool_maxsize
+        self.close()
+
+    def get(self, host: str = None, crt_variable: str = "REQUESTS_CA_BUNDLE") -> requests.Session:
+        """
+        Get the pooled session for ``host``, creating it if needed.
+
+        :param host: The host the session will talk to.
+        :param crt_variable: Variable holding the certificate.
+        :returns: A ``requests.Session`` with the specified certificate.
+        """
+        crt_path = getenv(crt_variable, certifi.where())
+        key = (host, crt_path)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                session.verify = crt_path
+                adapter = _CountingAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                )
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._sessions[key] = session
+        return session
+
+    def stats(self) -> dict:
+        """
+        Return the connection counters for every pooled session.
+
+        :returns: A dictionary of ``{(host, ca_bundle): {'opened': int, 'reused': int}}``.
+        """
+        with self._lock:
+            sessions = dict(self._sessions)
+        return {key: session.get_adapter('https://').stats() for key, session in sessions.items()}
+
+    def close(self) -> None:
+        """
+        Close and forget every pooled session.
+        """
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+SESSIONS = SessionManager()
+
 
-def get_session(crt_variable: str = "REQUESTS_CA_BUNDLE") -> requests.Session:
+def get_session(crt_variable: str = "REQUESTS_CA_BUNDLE", host: str = None) -> requests.Session:
     """
-    Get a ``requests.session`` and set verify with ``crt_variable``.
+    Get a pooled ``requests.session`` and set verify with ``crt_variable``.
 
     :param crt_variable: Variable holding the certificate.
+    :param host: The host the session will talk to, sessions are shared per host.
     :returns: A ``requests.Session`` with the specified certificate.
     """
-    crt_path = getenv(crt_variable, certifi.where())
-    session = requests.Session()
-    session.verify = crt_path
-    return session
+    return SESSIONS.get(host, crt_variable)
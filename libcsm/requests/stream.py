@@ -0,0 +1,199 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Incremental parsing of large JSON responses.
+
+``iter_json`` yields the elements of a JSON array as the response body
+arrives, instead of decoding the whole document first. Each element is
+decoded on its own and can be projected down to a few fields, so memory use
+stays proportional to one element rather than to the response.
+"""
+import codecs
+import json
+from typing import Iterable
+from typing import Iterator
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+_NUMBER = frozenset('0123456789.eE+-')
+_DECODER = json.JSONDecoder()
+
+
+class _Buffer:
+    """
+    Text decoded from a stream of byte chunks, read forward as it is consumed.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """
+        Read another chunk, dropping the text already consumed.
+
+        :returns: Whether more text may be available.
+        """
+        if self.eof:
+            return False
+        self.text = self.text[self.pos:]
+        self.pos = 0
+        try:
+            self.text += self._decoder.decode(next(self._chunks))
+        except StopIteration:
+            self.text += self._decoder.decode(b'', final=True)
+            self.eof = True
+        return True
+
+    def peek(self) -> str:
+        """
+        Skip whitespace and return the next character, or ``''`` at the end of the stream.
+        """
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char: str) -> None:
+        """
+        Consume ``char``, the next character other than whitespace.
+
+        :raises ValueError: When the next character is not ``char``.
+        """
+        found = self.peek()
+        if found != char:
+            raise ValueError(f'ERROR expected {char!r} in JSON stream, found {found!r}')
+        self.pos += 1
+
+    def value(self):
+        """
+        Decode the next JSON value, reading more chunks until it is complete.
+
+        :raises ValueError: When the stream ends or is not valid JSON.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError as error:
+                if self.fill():
+                    continue
+                raise ValueError(f'ERROR invalid JSON stream: {error}') from error
+            # A number followed only by characters that could belong to it, e.g.
+            # ``12.`` or ``1e``, may continue in the next chunk.
+            if isinstance(value, (int, float)) and not isinstance(value, bool) \
+                    and not self.eof and _NUMBER.issuperset(self.text[end:]) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def project(item, fields: Iterable[str] = None):
+    """
+    Keep only ``fields`` of a decoded object.
+
+    Dotted fields select nested values and keep their nesting, e.g.
+    ``ExtraProperties.Aliases`` gives ``{'ExtraProperties': {'Aliases': [...]}}``.
+    Missing fields are left out.
+
+    :param item: The decoded object.
+    :param fields: The fields to keep, or ``None`` to keep the whole object.
+    :returns: The projected object.
+    """
+    if fields is None or not isinstance(item, dict):
+        return item
+    projected = {}
+    for field in fields:
+        source, target = item, projected
+        *parents, name = field.split('.')
+        for parent in parents:
+            source = source.get(parent) if isinstance(source, dict) else None
+            target = target.setdefault(parent, {})
+        if isinstance(source, dict) and name in source:
+            target[name] = source[name]
+    return projected
+
+
+def iter_json(chunks: Iterable[bytes], key: str = None,
+              fields: Iterable[str] = None) -> Iterator:
+    """
+    Yield the elements of a JSON array from a stream of byte chunks.
+
+    :param chunks: The JSON document, e.g. ``response.iter_content(STREAM_CHUNK_SIZE)``.
+    :param key: The key of the array in the top-level object, or ``None`` if the
+                document is the array, e.g. ``Components`` for HSM.
+    :param fields: The fields to keep from each element, see ``project``.
+    :raises ValueError: When the document is not valid JSON or does not have the array.
+    """
+    buffer = _Buffer(chunks)
+    if key is not None:
+        buffer.expect('{')
+        while True:
+            if buffer.peek() == '}':
+                raise ValueError(f'ERROR JSON stream has no {key!r} array')
+            name = buffer.value()
+            buffer.expect(':')
+            if name == key:
+                break
+            buffer.value()
+            if buffer.peek() == ',':
+                buffer.pos += 1
+    buffer.expect('[')
+    if buffer.peek() == ']':
+        return
+    while True:
+        yield project(buffer.value(), fields)
+        if buffer.peek() == ']':
+            return
+        buffer.expect(',')
+
+
+def iter_response(response, key: str = None, fields: Iterable[str] = None,
+                  chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator:
+    """
+    Yield the elements of a JSON array from a ``requests.Response`` as its body arrives.
+
+    The response should be requested with ``stream=True``; it is closed once
+    the array has been read or the generator is closed.
+
+    :param response: The response.
+    :param key: The key of the array in the top-level object, or ``None`` if the
+                body is the array.
+    :param fields: The fields to keep from each element, see ``project``.
+    :param chunk_size: Bytes read from the response at a time.
+    :raises ValueError: When the body is not valid JSON or does not have the array.
+    """
+    try:
+        yield from iter_json(response.iter_content(chunk_size), key, fields)
+    finally:
+        close = getattr(response, 'close', None)
+        if close is not None:
+            close()
@@ -25,8 +25,19 @@
 Function to return ``rootfs``, ``kernel``, and the ``initrd`` image path given an image ID.
 """
 
+import io
 import json
+from dataclasses import dataclass
+from dataclasses import field
+from types import MappingProxyType
+from typing import Mapping
+from typing import Tuple
 from libcsm.s3 import s3object
+from libcsm.s3.manifest_cache import ManifestCache
+
+IMAGE_TYPES = ('initrd', 'kernel', 'rootfs')
+MANIFEST_MAX_BYTES = 1024 * 1024
+MANIFEST_CHUNK_SIZE = 64 * 1024
 
 
 class ImageFormatException(Exception):
@@ -40,7 +51,150 @@ class ImageFormatException(Exception):
         super().__init__(self.message)
 
 
-def get_s3_image_info(bucket_name, image_id, endpoint_url) -> dict:
+@dataclass(frozen=True)
+class Artifact:
+    """
+    An artifact listed in an image manifest.
+    """
+
+    type: str
+    path: str
+    etag: str = None
+    md5: str = None
+    size: int = None
+    metadata: Mapping = field(default_factory=lambda: MappingProxyType({}))
+
+
+@dataclass(frozen=True)
+class Manifest:
+    """
+    An image manifest, with its artifacts indexed by image type.
+
+    ``images`` maps each of ``IMAGE_TYPES`` found in the manifest to the
+    first artifact whose type contains it, e.g. ``rootfs`` to the
+    ``application/vnd.cray.image.rootfs.squashfs`` artifact.
+    """
+
+    version: str
+    artifacts: Tuple[Artifact, ...]
+    images: Mapping
+
+    def image(self, image_type: str) -> Artifact:
+        """
+        Get the artifact for an image type.
+
+        :param image_type: One of ``IMAGE_TYPES``.
+        :raises ImageFormatException: When the manifest has no such image.
+        :returns: The artifact.
+        """
+        try:
+            return self.images[image_type]
+        except KeyError as exc:
+            raise ImageFormatException(f"ERROR could not find image for {image_type}") from exc
+
+    def image_dict(self) -> dict:
+        """
+        Get the path of every image type, as returned by ``get_s3_image_info``.
+
+        :raises ImageFormatException: When the manifest is missing an image.
+        :returns: Dictionary of images.
+        """
+        return {image_type: self.image(image_type).path for image_type in IMAGE_TYPES}
+
+
+def _read_manifest(body, max_bytes: int = MANIFEST_MAX_BYTES) -> bytes:
+    """
+    Read a manifest from a file-like ``body``, ``MANIFEST_CHUNK_SIZE`` bytes at a time.
+
+    :param body: The manifest, e.g. the ``Body`` of an S3 object.
+    :param max_bytes: The largest manifest accepted.
+    :raises ImageFormatException: When the manifest is too large.
+    :returns: The manifest.
+    """
+    chunks = []
+    size = 0
+    while True:
+        chunk = body.read(MANIFEST_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise ImageFormatException(f"ERROR image manifest is larger than {max_bytes} bytes")
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+
+def parse_manifest(body, max_bytes: int = MANIFEST_MAX_BYTES) -> Manifest:
+    """
+    Read and parse an image manifest from a file-like ``body``.
+
+    The body is read in chunks and reading stops as soon as it exceeds
+    ``max_bytes``, so an oversized manifest is rejected without being held
+    in memory. The artifacts are indexed by image type in a single pass.
+
+    :param body: The manifest, e.g. the ``Body`` of an S3 object.
+    :param max_bytes: The largest manifest accepted.
+    :raises ImageFormatException: When the manifest is too large or malformed.
+    :returns: The manifest.
+    """
+    data = _read_manifest(body, max_bytes)
+    try:
+        manifest = json.loads(data)
+        artifacts = []
+        images = {}
+        for artifact in manifest['artifacts']:
+            link = artifact['link']
+            entry = Artifact(
+                type=artifact['type'],
+                path=link['path'],
+                etag=link.get('etag'),
+                md5=artifact.get('md5'),
+                size=artifact.get('size'),
+                metadata=MappingProxyType(dict(artifact)),
+            )
+            artifacts.append(entry)
+            for image_type in IMAGE_TYPES:
+                if image_type in entry.type:
+                    images.setdefault(image_type, entry)
+    except (ValueError, KeyError, TypeError, AttributeError) as exc:
+        raise ImageFormatException(f"ERROR image manifest is malformed: {exc}") from exc
+    return Manifest(manifest.get('version'), tuple(artifacts), MappingProxyType(images))
+
+
+def get_s3_image_manifest(bucket_name, image_id, endpoint_url,
+                          cache: ManifestCache = None) -> Manifest:
+    """
+    Retrieve the manifest of an image from S3.
+
+    With a ``cache``, the manifest's current ETag is looked up with a
+    ``HeadObject`` request and a cached copy with that ETag is used instead
+    of downloading the manifest again.
+
+    :param bucket_name: Name of bucket.
+    :param image_id: ID of image.
+    :param endpoint_url: S3 endpoint.
+    :param cache: A ``ManifestCache`` to serve and store the manifest with.
+    :raises ImageFormatException: When the manifest is too large or malformed.
+    :returns: The manifest.
+    """
+    image_manifest = image_id + "/manifest.json"
+    image_object = s3object.S3Object(bucket_name, image_manifest, endpoint_url=endpoint_url)
+    if cache is not None:
+        etag = image_object.head_object(endpoint_url).get('ETag')
+        cached = cache.get(bucket_name, image_id, etag) if etag else None
+        if cached is not None:
+            return parse_manifest(io.BytesIO(cached))
+    s3_object = image_object.get_object(endpoint_url)
+    if s3_object.get('ContentLength', 0) > MANIFEST_MAX_BYTES:
+        raise ImageFormatException(f"ERROR image manifest is larger than {MANIFEST_MAX_BYTES} bytes")
+    data = _read_manifest(s3_object['Body'])
+    manifest = parse_manifest(io.BytesIO(data))
+    if cache is not None and s3_object.get('ETag'):
+        cache.put(bucket_name, image_id, s3_object['ETag'], data)
+    return manifest
+
+
+def get_s3_image_info(bucket_name, image_id, endpoint_url, cache: ManifestCache = None) -> dict:
     """
     Retrieve the initrd, rootfs, and kernel image for an S3 bucket and image ID.
 
@@ -57,26 +211,10 @@ def get_s3_image_info(bucket_name, image_id, endpoint_url) -> dict:
     :param bucket_name: Name of bucket.
     :param image_id: ID of image.
     :param endpoint_url: S3 endpoint.
+    :param cache: A ``ManifestCache`` to serve and store the manifest with.
     :raises ImageFormatException: When an image is not found.
     :returns: Dictionary of images.
     """
-    image_manifest = image_id + "/manifest.json"
-    image_object = s3object.S3Object(bucket_name, image_manifest)
-    s3_object = image_object.get_object(endpoint_url)
-    object_json = json.loads(s3_object['Body'].read())
-    images_json = object_json['artifacts']
-
-    image_dict = {}
-    for image_type in ["initrd", "kernel", "rootfs"]:
-        for image in images_json:
-            if image_type in image['type']:
-                image_dict[image_type] = image['link']['path']
-                break
-        try:
-            if image_dict[image_type] is None:
-                raise ImageFormatException(f"ERROR could not find image for {image_type}")
-        except Exception as exc:
-            raise ImageFormatException(f"ERROR could not find image for {image_type}") from exc
-
+    image_dict = get_s3_image_manifest(bucket_name, image_id, endpoint_url, cache).image_dict()
     print("Using images: ", image_dict)
     return image_dict
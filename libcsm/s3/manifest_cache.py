@@ -0,0 +1,134 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Local, size-bounded cache of image manifests.
+"""
+import hashlib
+import os
+
+from libcsm.os import atomic_write
+from libcsm.os import file_lock
+
+MANIFEST_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+
+def default_directory() -> str:
+    """
+    Get the default manifest cache directory.
+
+    Manifests are kept under ``$XDG_CACHE_HOME/libcsm/manifests``
+    (``~/.cache/libcsm/manifests`` if ``XDG_CACHE_HOME`` is unset).
+
+    :returns: The cache directory.
+    """
+    cache_home = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'libcsm', 'manifests')
+
+
+class ManifestCache:
+    """
+    Image manifests cached on disk, keyed by bucket, image ID, and ETag.
+
+    A published manifest never changes without its ETag changing, so a cached
+    copy is valid for as long as the object's current ETag matches. The cache
+    is bounded to ``max_bytes``, evicting the least recently used manifests
+    first. Nothing is written to disk until the first manifest is stored.
+    """
+
+    def __init__(self, directory: str = None, max_bytes: int = MANIFEST_CACHE_MAX_BYTES) -> None:
+        """
+        :param directory: The cache directory (default: ``default_directory()``).
+        :param max_bytes: The most bytes of manifests to keep.
+        """
+        self.directory = directory or default_directory()
+        self.max_bytes = max_bytes
+
+    def _path(self, bucket: str, image_id: str, etag: str) -> str:
+        """
+        Get the file a manifest is cached in.
+
+        :param bucket: The bucket of the image.
+        :param image_id: The image ID.
+        :param etag: The ETag of the manifest object.
+        """
+        digest = hashlib.sha256('\0'.join([bucket, image_id, etag]).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f'{digest}.json')
+
+    def get(self, bucket: str, image_id: str, etag: str) -> [bytes, None]:
+        """
+        Get a cached manifest, marking it as recently used.
+
+        :param bucket: The bucket of the image.
+        :param image_id: The image ID.
+        :param etag: The current ETag of the manifest object.
+        :returns: The manifest, or ``None`` if it is not cached.
+        """
+        path = self._path(bucket, image_id, etag)
+        try:
+            with open(path, 'rb') as handle:
+                data = handle.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def put(self, bucket: str, image_id: str, etag: str, data: bytes) -> None:
+        """
+        Cache a manifest, then evict manifests until the cache fits ``max_bytes``.
+
+        Failing to write the cache is not fatal.
+
+        :param bucket: The bucket of the image.
+        :param image_id: The image ID.
+        :param etag: The ETag of the manifest object.
+        :param data: The manifest.
+        """
+        if len(data) > self.max_bytes:
+            return
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            with file_lock(os.path.join(self.directory, '.lock')):
+                atomic_write(self._path(bucket, image_id, etag), data)
+                self._evict()
+        except OSError as error:
+            print(f'Failed to write manifest cache [{self.directory}]: {error}')
+
+    def _evict(self) -> None:
+        """
+        Remove the least recently used manifests until the cache fits ``max_bytes``.
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.json') and entry.is_file():
+                status = entry.stat()
+                entries.append((status.st_mtime, status.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
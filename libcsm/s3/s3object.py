@@ -25,13 +25,123 @@
 Submodule for interacting with s3 objects.
 """
 import json
-import boto3
+from threading import Lock
+from time import monotonic
 
-from botocore.config import Config
 from libcsm.os import run_command
 
 S3_CONNECT_TIMEOUT=60
 S3_READ_TIMEOUT=1
+S3_MAX_POOL_CONNECTIONS=10
+RGW_CACHE_TTL=300
+
+# How ``S3Object.verify_bucket_exists`` checks a bucket exists:
+#   stats - ``radosgw-admin bucket stats``, reads the bucket's metadata only.
+#   head  - an S3 ``HeadBucket`` with the object owner's credentials.
+#   list  - ``radosgw-admin bucket list``, enumerates every object (slow on large buckets).
+BUCKET_CHECK_METHODS = ('stats', 'head', 'list')
+BUCKET_CHECK_METHOD='stats'
+
+_CLIENTS = {}
+_CLIENTS_LOCK = Lock()
+
+
+def get_client(endpoint_url: str, access_key: str, secret_key: str,
+               max_pool_connections: int = S3_MAX_POOL_CONNECTIONS):
+    """
+    Get a shared ``boto3`` S3 client for an endpoint and access key.
+
+    Clients are cached per process, keyed by endpoint URL and access key, so
+    repeated reads reuse one client and its connection pool instead of loading
+    the service model and opening new connections every time. Unlike
+    ``boto3`` resources, clients are safe to share between threads.
+
+    :param endpoint_url: The endpoint URL of the S3 service.
+    :param access_key: The S3 access key.
+    :param secret_key: The S3 secret key.
+    :param max_pool_connections: Maximum connections kept in the client's pool.
+    :returns: A ``botocore`` S3 client.
+    """
+    key = (endpoint_url, access_key)
+    settings = (secret_key, max_pool_connections)
+    with _CLIENTS_LOCK:
+        cached = _CLIENTS.get(key)
+        if cached is not None and cached[0] == settings:
+            return cached[1]
+        # Imported here, boto3 is slow to import and only needed to talk to S3.
+        import boto3
+        from botocore.config import Config
+
+        s3_config = Config(connect_timeout=S3_CONNECT_TIMEOUT,
+                           read_timeout=S3_READ_TIMEOUT,
+                           max_pool_connections=max_pool_connections)
+        s3_client = boto3.session.Session().client('s3',
+                            endpoint_url=endpoint_url,
+                            aws_access_key_id=access_key,
+                            aws_secret_access_key=secret_key,
+                            config=s3_config)
+        _CLIENTS[key] = (settings, s3_client)
+        return s3_client
+
+
+def clear_clients() -> None:
+    """
+    Forget every cached S3 client.
+    """
+    with _CLIENTS_LOCK:
+        _CLIENTS.clear()
+
+
+class _RGWCache:
+    """
+    A process-wide cache of ``radosgw-admin`` lookups that expire after ``ttl`` seconds.
+
+    Bucket existence, object owners, and owners' S3 keys are cached, so many
+    ``S3Object`` instances in the same bucket only run the admin tools once.
+    Failed lookups are never cached.
+    """
+
+    def __init__(self, ttl: float = RGW_CACHE_TTL) -> None:
+        """
+        :param ttl: Seconds a lookup is reused for.
+        """
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = Lock()
+
+    def get(self, key: tuple):
+        """
+        Get a cached lookup.
+
+        :param key: The lookup, e.g. ``('owner', bucket, object_name)``.
+        :returns: The cached value, or ``None`` if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or monotonic() - entry[0] >= self.ttl:
+                self._entries.pop(key, None)
+                return None
+            return entry[1]
+
+    def set(self, key: tuple, value) -> None:
+        """
+        Cache a lookup.
+
+        :param key: The lookup.
+        :param value: The value to cache, must not be ``None``.
+        """
+        with self._lock:
+            self._entries[key] = (monotonic(), value)
+
+    def clear(self) -> None:
+        """
+        Forget every cached lookup.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+RGW_CACHE = _RGWCache()
 
 
 class RGWAdminException(Exception):
@@ -49,26 +159,59 @@ class S3Object:
     Class for getting s3 object information given a bucket and bisect name.
     """
 
-    def __init__(self, bucket: str, object_name: str):
+    def __init__(self, bucket: str, object_name: str, bucket_check: str = None,
+                 endpoint_url: str = "http://rgw-vip"):
         """
         :param bucket: The bucket to represent from S3.
         :param object_name: The bisect name of the bucket.
+        :param bucket_check: How to check the bucket exists, one of ``BUCKET_CHECK_METHODS``
+                             (default: ``BUCKET_CHECK_METHOD``).
+        :param endpoint_url: The endpoint URL used by the ``head`` bucket check.
         """
         self.bucket = bucket
         self.object_name = object_name
         self.owner = None
         self._a_key = None
         self._s_key = None
+        self.bucket_check = bucket_check or BUCKET_CHECK_METHOD
+        if self.bucket_check not in BUCKET_CHECK_METHODS:
+            raise ValueError(f'ERROR bucket_check must be one of {BUCKET_CHECK_METHODS}, ' \
+                f'recieved {self.bucket_check}')
+        self.endpoint_url = endpoint_url
         self.verify_bucket_exists()
 
     def verify_bucket_exists(self) -> None:
         """
         Verify the bucket provided exists in s3.
+
+        The ``stats`` and ``head`` checks cost the same regardless of how many
+        objects the bucket holds, ``list`` enumerates the bucket.
+
         :raises RGWAdminException: When the command fails.
         """
-        result = run_command(['radosgw-admin', 'bucket', 'list', '--bucket', self.bucket])
-        if result.return_code != 0:
-            raise RGWAdminException(f"Error when executing radosgw-admin command: {result.stderr}")
+        if RGW_CACHE.get(('bucket', self.bucket)):
+            return
+        if self.bucket_check == 'head':
+            self._head_bucket()
+        else:
+            result = run_command(['radosgw-admin', 'bucket', self.bucket_check, '--bucket', self.bucket])
+            if result.return_code != 0:
+                raise RGWAdminException(f"Error when executing radosgw-admin command: {result.stderr}")
+        RGW_CACHE.set(('bucket', self.bucket), True)
+
+    def _head_bucket(self) -> None:
+        """
+        Verify the bucket exists with an S3 ``HeadBucket`` request.
+
+        :raises RGWAdminException: When the bucket does not exist or can not be reached.
+        """
+        from botocore.exceptions import BotoCoreError
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client(self.endpoint_url).head_bucket(Bucket=self.bucket)
+        except (BotoCoreError, ClientError) as error:
+            raise RGWAdminException(f"Error checking bucket {self.bucket} exists: {error}") from error
 
     def get_object_owner(self) -> None:
         """
@@ -76,6 +219,10 @@ class S3Object:
 
         :raises RGWAdminException: When the command fails.
         """
+        owner = RGW_CACHE.get(('owner', self.bucket, self.object_name))
+        if owner is not None:
+            self.owner = owner
+            return
         result = run_command(['radosgw-admin', 'object', 'stat', '--object', self.object_name, \
             '--bucket', self.bucket])
         if result.return_code != 0:
@@ -83,6 +230,7 @@ class S3Object:
         info = json.loads(result.stdout)
         owner = info['policy']['owner']['id']
         self.owner = owner
+        RGW_CACHE.set(('owner', self.bucket, self.object_name), owner)
 
     def get_creds(self) -> None:
         """
@@ -92,28 +240,42 @@ class S3Object:
         """
         if self.owner is None:
             self.get_object_owner()
-        result = run_command(['radosgw-admin', 'user', 'info', '--uid', self.owner])
-        if result.return_code != 0:
-            raise RGWAdminException(f"Error when executing radosgw-admin command: {result.stderr}")
-        info = json.loads(result.stdout)
-        self._a_key = info['keys'][0]['access_key']
-        self._s_key = info['keys'][0]['secret_key']
+        keys = RGW_CACHE.get(('keys', self.owner))
+        if keys is None:
+            result = run_command(['radosgw-admin', 'user', 'info', '--uid', self.owner])
+            if result.return_code != 0:
+                raise RGWAdminException(f"Error when executing radosgw-admin command: {result.stderr}")
+            info = json.loads(result.stdout)
+            keys = (info['keys'][0]['access_key'], info['keys'][0]['secret_key'])
+            RGW_CACHE.set(('keys', self.owner), keys)
+        self._a_key, self._s_key = keys
 
-    def get_object(self, endpoint_url: str = "http://rgw-vip") -> boto3.session.Session:
+    def client(self, endpoint_url: str = "http://rgw-vip"):
         """
-        Get the object from s3. Returns a ``boto3.resource.Object``.
+        Get the shared S3 client for this object's owner.
 
         :param endpoint_url: The endpoint URL to get objects from.
-        :returns: The S3 object.
+        :returns: A ``botocore`` S3 client.
         """
         if self._a_key is None or self._s_key is None:
             self.get_creds()
-        s3_config = Config(connect_timeout=S3_CONNECT_TIMEOUT,
-                            read_timeout=S3_READ_TIMEOUT)
-        s3_resource = boto3.resource('s3',
-                            endpoint_url=endpoint_url,
-                            aws_access_key_id=self._a_key,
-                            aws_secret_access_key=self._s_key,
-                            config=s3_config)
+        return get_client(endpoint_url, self._a_key, self._s_key)
+
+    def get_object(self, endpoint_url: str = "http://rgw-vip") -> dict:
+        """
+        Get the object from s3. Returns the ``GetObject`` response, with the
+        object's contents in ``Body``.
 
-        return s3_resource.Object(self.bucket, self.object_name).get()
+        :param endpoint_url: The endpoint URL to get objects from.
+        :returns: The S3 object.
+        """
+        return self.client(endpoint_url).get_object(Bucket=self.bucket, Key=self.object_name)
+
+    def head_object(self, endpoint_url: str = "http://rgw-vip") -> dict:
+        """
+        Get the object's metadata from s3, e.g. its ``ETag`` and ``ContentLength``.
+
+        :param endpoint_url: The endpoint URL to get objects from.
+        :returns: The ``HeadObject`` response.
+        """
+        return self.client(endpoint_url).head_object(Bucket=self.bucket, Key=self.object_name)
@@ -0,0 +1,138 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Verify the artifacts of an image manifest exist in S3 and match the manifest.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from time import time
+from typing import List
+from typing import NamedTuple
+from urllib.parse import urlparse
+
+from libcsm.s3 import s3object
+from libcsm.s3.images import IMAGE_TYPES
+from libcsm.s3.images import Artifact
+from libcsm.s3.images import ImageFormatException
+from libcsm.s3.images import Manifest
+
+VERIFY_PARALLELISM = 8
+
+
+class ArtifactCheck(NamedTuple):
+    """
+    The outcome of verifying one artifact.
+    """
+
+    image_type: str
+    path: str
+    errors: tuple
+    duration: float
+
+    @property
+    def ok(self) -> bool:
+        """
+        Whether the artifact exists and matches the manifest.
+        """
+        return not self.errors
+
+
+def parse_s3_path(path: str) -> tuple:
+    """
+    Split an artifact path, e.g. ``s3://boot-images/<image-id>/rootfs``, into bucket and key.
+
+    :param path: The artifact's ``link.path``.
+    :raises ImageFormatException: When the path is not an ``s3://`` URL.
+    :returns: The bucket and key.
+    """
+    url = urlparse(path)
+    if url.scheme != 's3' or not url.netloc or not url.path.strip('/'):
+        raise ImageFormatException(f"ERROR artifact path is not an s3://bucket/key URL: {path}")
+    return url.netloc, url.path.lstrip('/')
+
+
+def check_artifact(artifact: Artifact, head: dict) -> List[str]:
+    """
+    Compare an artifact from a manifest with the ``HeadObject`` response of its S3 object.
+
+    The ETag of an object uploaded in a single part is the MD5 of its contents,
+    so it is compared with the manifest's ``md5``. A multipart ETag contains a
+    ``-`` and can only be compared with the manifest's ``etag``.
+
+    :param artifact: The artifact from the manifest.
+    :param head: The ``HeadObject`` response.
+    :returns: A description of each mismatch.
+    """
+    errors = []
+    size = head.get('ContentLength')
+    if artifact.size is not None and size != artifact.size:
+        errors.append(f'size is {size}, manifest says {artifact.size}')
+    etag = (head.get('ETag') or '').strip('"')
+    if artifact.etag and etag != artifact.etag.strip('"'):
+        errors.append(f'ETag is {etag}, manifest says {artifact.etag}')
+    if artifact.md5 and etag and '-' not in etag and etag != artifact.md5:
+        errors.append(f'MD5 is {etag}, manifest says {artifact.md5}')
+    return errors
+
+
+def verify_artifact(image_type: str, artifact: Artifact, endpoint_url: str) -> ArtifactCheck:
+    """
+    Verify an artifact exists in S3 and matches its size and checksums in the manifest.
+
+    :param image_type: The image type of the artifact.
+    :param artifact: The artifact from the manifest.
+    :param endpoint_url: S3 endpoint.
+    :returns: The outcome, a failure is recorded in its ``errors`` rather than raised.
+    """
+    # Imported here, botocore is slow to import and only needed to talk to S3.
+    from botocore.exceptions import BotoCoreError
+    from botocore.exceptions import ClientError
+
+    start_time = time()
+    try:
+        bucket, key = parse_s3_path(artifact.path)
+        head = s3object.S3Object(bucket, key, endpoint_url=endpoint_url).head_object(endpoint_url)
+    except (ImageFormatException, s3object.RGWAdminException, BotoCoreError, ClientError) as error:
+        return ArtifactCheck(image_type, artifact.path, (str(error),), time() - start_time)
+    errors = check_artifact(artifact, head)
+    return ArtifactCheck(image_type, artifact.path, tuple(errors), time() - start_time)
+
+
+def verify_artifacts(manifest: Manifest, endpoint_url: str, image_types: tuple = IMAGE_TYPES,
+                     parallelism: int = VERIFY_PARALLELISM) -> List[ArtifactCheck]:
+    """
+    Verify the artifacts for ``image_types`` concurrently, with one ``HeadObject`` request each.
+
+    The requests share the pooled S3 client of each artifact's owner.
+
+    :param manifest: The image manifest.
+    :param endpoint_url: S3 endpoint.
+    :param image_types: The image types to verify.
+    :param parallelism: The number of artifacts to verify concurrently.
+    :raises ImageFormatException: When the manifest is missing an image type.
+    :returns: An ``ArtifactCheck`` for each image type, in the order given.
+    """
+    artifacts = [(image_type, manifest.image(image_type)) for image_type in image_types]
+    with ThreadPoolExecutor(max_workers=max(parallelism, 1)) as executor:
+        return list(executor.map(lambda item: verify_artifact(item[0], item[1], endpoint_url),
+                                 artifacts))
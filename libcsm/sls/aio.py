@@ -0,0 +1,63 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+An ``asyncio`` client for CSM SLS, see ``libcsm.requests.aio``.
+"""
+
+import http
+import requests
+from libcsm.requests.aio import AsyncClient
+
+
+class AsyncAPI(AsyncClient):
+    """
+    Class for providing an ``asyncio`` API to interact with SLS.
+    """
+
+    service = 'sls'
+
+    def __init__(self, api_gateway_address: str = "api-gw-service-nmn.local", **kwargs) -> None:
+        """
+        :param api_gateway_address: The hostname of the API gateway.
+        :param kwargs: Passed to ``AsyncClient``, e.g. ``concurrency``.
+        """
+        super().__init__(api_gateway_address, **kwargs)
+        self.sls_url = f'https://{self.api_gateway_address}/apis/sls/v1/'
+
+    async def get_management_components(self) -> list:
+        """
+        Retrieve all management components from SLS.
+
+        :returns: The list of management components.
+        """
+        components_response = await self.request('GET', self.sls_url + \
+            'search/hardware?extra_properties.Role=Management')
+        if components_response.status_code != http.HTTPStatus.OK:
+            raise requests.exceptions.RequestException(f'ERROR Bad response' \
+                f'recieved from SLS. Recived: {components_response.status_code}')
+        try:
+            return components_response.json()
+        except ValueError as error:
+            raise ValueError(f'ERROR did not get valid json for management components' \
+                f'from sls. {error}') from error
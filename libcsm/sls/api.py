@@ -26,9 +26,24 @@ Submodule for interacting with CSM SLS.
 """
 
 import http
+from typing import Iterable
+from typing import Iterator
 import requests
 from libcsm import api
+from libcsm.requests.retry import RETRY_POLICY
 from libcsm.requests.session import get_session
+from libcsm.requests.stream import iter_response
+from libcsm.sls.inventory import INVENTORY_TTL
+from libcsm.sls.inventory import Inventory
+from libcsm.sls.snapshot import Snapshot
+
+# The fields of a management component needed to map between xnames, hostnames, and roles.
+COMPONENT_FIELDS = (
+    'Xname',
+    'ExtraProperties.Aliases',
+    'ExtraProperties.Role',
+    'ExtraProperties.SubRole',
+)
 
 
 class API:
@@ -36,56 +51,135 @@ class API:
     Class for providing API to interact with SLS.
     """
 
-    def __init__(self, api_gateway_address: str = "api-gw-service-nmn.local"):
+    def __init__(self, api_gateway_address: str = "api-gw-service-nmn.local",
+                 inventory_ttl: float = INVENTORY_TTL, snapshot: Snapshot = None):
         """
 
         :param api_gateway_address: The hostname of the API gateway.
+        :param inventory_ttl: Seconds management components are reused for by lookups.
+        :param snapshot: An on-disk ``Snapshot`` to serve management components from.
         """
         self.api_gateway_address = api_gateway_address
         self.sls_url = f'https://{self.api_gateway_address}/apis/sls/v1/'
-        self._auth = api.Auth()
-        self._auth.refresh_token()
+        self.snapshot = snapshot
+        self._auth = None
+        self.inventory = Inventory(self, inventory_ttl)
+
+    def _get_auth(self) -> api.Auth:
+        """
+        Get the ``Auth``, fetching a token on first use.
+
+        Deferred until a request is sent, so serving a fresh snapshot needs no token.
+
+        :raises AuthException: if the Kubernetes configuration is invalid.
+        """
+        if self._auth is None:
+            auth = api.Auth()
+            auth.refresh_token()
+            self._auth = auth
+        return self._auth
 
-    def get_management_components_from_sls(self) -> requests.Response:
+    def get_management_components_from_sls(self, headers: dict = None) -> requests.Response:
         """
         Retrieve all management components from SLS.
+
+        The body is read when it is used, either in full with ``json()`` or
+        incrementally with ``libcsm.requests.stream``.
+
+        :param headers: Extra request headers, e.g. conditional request validators. When
+                        given, a ``304 Not Modified`` response is also accepted.
         """
-        session = get_session()
+        auth = self._get_auth()
+        session = get_session(host=self.api_gateway_address)
+        expected = [http.HTTPStatus.OK]
+        if headers:
+            expected.append(http.HTTPStatus.NOT_MODIFIED)
         try:
-            components_response = session.get(self.sls_url + \
-                'search/hardware?extra_properties.Role=Management',
-                headers={'Authorization': f'Bearer {self._auth.token}'})
+            components_response = RETRY_POLICY.call('sls', 'GET', lambda: session.get(
+                self.sls_url + 'search/hardware?extra_properties.Role=Management', stream=True,
+                headers={'Authorization': f'Bearer {auth.token}', **(headers or {})}),
+                auth=auth)
         except requests.exceptions.RequestException as ex:
             raise requests.exceptions.RequestException(f'ERROR exception: {type(ex).__name__}' \
                 f'when trying to get management components from SLS') from ex
-        if components_response.status_code != http.HTTPStatus.OK:
+        if components_response.status_code not in expected:
+            components_response.close()
             raise requests.exceptions.RequestException(f'ERROR Bad response' \
                 f'recieved from SLS. Recived: {components_response}')
 
         return components_response
 
-    def get_xname(self, hostname: str) -> str:
+    def get_management_components(self) -> list:
         """
-        Get the xname of a node from SLS based on a provided hostname.
+        Get all management components, from the snapshot if one is configured and usable.
 
-        :param hostname: The hostname to lookup.
-        :returns: The XNAME.
+        :raises requests.exceptions.RequestException: When offline without a snapshot.
+        :returns: The list of management components.
         """
+        if self.snapshot is None:
+            components_response = self.get_management_components_from_sls()
+            try:
+                return self._parse_components(components_response)
+            finally:
+                components_response.close()
+        cached = self.snapshot.load()
+        if cached is not None and self.snapshot.is_fresh(cached):
+            return cached['components']
+        if self.snapshot.offline:
+            raise requests.exceptions.RequestException(f'ERROR running offline and no SLS ' \
+                f'snapshot was found at {self.snapshot.path}')
+        validators = self.snapshot.validators(cached) if cached is not None else {}
+        components_response = self.get_management_components_from_sls(headers=validators)
         try:
-            components_response = (self.get_management_components_from_sls()).json()
+            etag = components_response.headers.get('ETag')
+            last_modified = components_response.headers.get('Last-Modified')
+            if components_response.status_code == http.HTTPStatus.NOT_MODIFIED:
+                components = cached['components']
+                # A 304 need not repeat the validators, keep the ones it confirmed.
+                etag = etag or cached.get('etag')
+                last_modified = last_modified or cached.get('last_modified')
+            else:
+                components = self._parse_components(components_response)
+        finally:
+            components_response.close()
+        self.snapshot.save(components, etag=etag, last_modified=last_modified)
+        return components
+
+    def iter_management_components(self, fields: Iterable[str] = COMPONENT_FIELDS) -> Iterator[dict]:
+        """
+        Yield the management components from SLS as the response arrives.
+
+        Only ``fields`` of each component are kept, so memory use does not grow
+        with the size of the response. The snapshot is not used.
+
+        :param fields: The fields to keep, see ``libcsm.requests.stream.project``; ``None``
+                       keeps every field.
+        :raises ValueError: When the response is not valid JSON.
+        """
+        yield from iter_response(self.get_management_components_from_sls(), fields=fields)
+
+    @staticmethod
+    def _parse_components(components_response: requests.Response) -> list:
+        """
+        Parse the JSON of a management components response.
+
+        :param components_response: The response from SLS.
+        :returns: The list of management components.
+        """
+        try:
+            return components_response.json()
         except ValueError as error:
             raise ValueError(f'ERROR did not get valid json for management components' \
                 f'from sls. {error}') from error
 
-        for node in components_response:
-            try:
-                if hostname in node['ExtraProperties']['Aliases']:
-                    return node['Xname']
-            except KeyError as error:
-                raise KeyError(f'ERROR [ExtraProperties][Aliases] was not in the' \
-                    f'response from sls. These fields are expected in the json response.' \
-                    f'The response was {components_response}') from error
-        raise ValueError(f'ERROR hostname:{hostname} was not found in management nodes.')
+    def get_xname(self, hostname: str) -> str:
+        """
+        Get the xname of a node from SLS based on a provided hostname.
+
+        :param hostname: The hostname to lookup.
+        :returns: The XNAME.
+        """
+        return self.inventory.get_xname(hostname)
 
     def get_hostname(self, xname: str) -> str:
         """
@@ -94,19 +188,4 @@ class API:
         :param xname: The XNAME to lookup.
         :returns: The hostname.
         """
-        try:
-            components_response = (self.get_management_components_from_sls()).json()
-        except ValueError as error:
-            raise ValueError(f'ERROR did not get valid json for management components' \
-                f'from sls. {error}') from error
-
-        for node in components_response:
-            try:
-                if xname == node['Xname']:
-                    # assumes the hostname is the first entry in ['ExtraProperties']['Aliases']
-                    return node['ExtraProperties']['Aliases'][0]
-            except KeyError as error:
-                raise KeyError(f'ERROR [ExtraProperties][Aliases] was not in the' \
-                    f'response from sls. These fields are expected in the json response.' \
-                    f'The response was {components_response}') from error
-        raise ValueError(f'ERROR xname:{xname} was not found in management nodes.')
+        return self.inventory.get_hostname(xname)
@@ -0,0 +1,149 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Shared batch handling for the ``sls-get-xname`` and ``sls-get-hostname`` commands.
+"""
+import functools
+import json
+import sys
+from typing import Callable
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+
+import click
+import requests
+
+from libcsm.sls import api
+from libcsm.sls import snapshot
+
+FORMATS = ['plain', 'tsv', 'json']
+
+
+class SnapshotOptions(NamedTuple):
+    """
+    The ``--snapshot-max-age`` and ``--offline`` options of a command.
+    """
+
+    max_age: float = None
+    """Seconds a snapshot is served without revalidation, or ``None`` to not use a snapshot."""
+    offline: bool = False
+    """Only serve the snapshot, never contact SLS."""
+
+
+def snapshot_options(command: Callable) -> Callable:
+    """
+    Add the ``--snapshot-max-age`` and ``--offline`` options to a command.
+
+    The command receives them together as a ``SnapshotOptions`` named ``snapshot_options``.
+
+    :param command: The command function, below its other ``click.option`` decorators.
+    :returns: The command function taking the two options.
+    """
+    @click.option('--snapshot-max-age', required=False, type=click.FloatRange(min=0), default=None, \
+        help='Cache SLS data on disk and reuse it for this many seconds before revalidating it.')
+    @click.option('--offline', is_flag=True, default=False, \
+        help='Only use the SLS data cached on disk, never contact SLS.')
+    @functools.wraps(command)
+    def wrapper(*args, snapshot_max_age: float, offline: bool, **kwargs) -> None:
+        return command(*args, snapshot_options=SnapshotOptions(snapshot_max_age, offline), **kwargs)
+    return wrapper
+
+
+def get_api(api_gateway_address: str, options: SnapshotOptions = SnapshotOptions()) -> api.API:
+    """
+    Create the SLS API for a command, with an on-disk snapshot if requested.
+
+    :param api_gateway_address: The hostname of the API gateway.
+    :param options: Whether and how to use an on-disk snapshot.
+    :returns: The SLS API.
+    """
+    if options.max_age is None and not options.offline:
+        return api.API(api_gateway_address)
+    sls_snapshot = snapshot.Snapshot(
+        snapshot.default_path(api_gateway_address),
+        max_age=snapshot.SNAPSHOT_MAX_AGE if options.max_age is None else options.max_age,
+        offline=options.offline,
+    )
+    return api.API(api_gateway_address, snapshot=sls_snapshot)
+
+
+def read_names(names: Iterable[str], name_file) -> List[str]:
+    """
+    Collect the names given as arguments and in a file, one name per line.
+
+    Blank lines and surrounding whitespace in the file are ignored.
+
+    :param names: The names given as arguments.
+    :param name_file: An open file (``-`` for stdin with ``click.File``), or ``None``.
+    :returns: The names, arguments first.
+    """
+    collected = list(names)
+    if name_file is not None:
+        collected.extend(line.strip() for line in name_file if line.strip())
+    if not collected:
+        raise click.UsageError('At least one name, or a file of names, must be given.')
+    return collected
+
+
+def resolve(names: List[str], lookup: Callable, name_key: str, result_key: str,
+            output_format: str = 'plain') -> None:
+    """
+    Resolve every name with ``lookup`` and print each result as it is resolved.
+
+    ``plain`` prints only the result (or the error) for each name, ``tsv``
+    prints the name and result (or the error) separated by a tab, and ``json`` prints one
+    JSON object per line. Exits with 1 once every name was printed if any
+    could not be resolved, or straight away if SLS could not be queried.
+
+    :param names: The names to resolve.
+    :param lookup: A callable resolving one name, raising ``ValueError`` if it is unknown.
+    :param name_key: The JSON key for the name, e.g. ``hostname``.
+    :param result_key: The JSON key for the result, e.g. ``xname``.
+    :param output_format: One of ``FORMATS``.
+    """
+    failed = False
+    for name in names:
+        try:
+            result = lookup(name)
+        except ValueError as error:
+            failed = True
+            if output_format == 'json':
+                print(json.dumps({name_key: name, 'error': str(error)}))
+            elif output_format == 'tsv':
+                print(f'{name}\t{error}')
+            else:
+                print(f'{error}')
+            continue
+        except (requests.exceptions.RequestException, KeyError) as error:
+            print(f'{error}')
+            sys.exit(1)
+        if output_format == 'json':
+            print(json.dumps({name_key: name, result_key: result}))
+        elif output_format == 'tsv':
+            print(f'{name}\t{result}')
+        else:
+            print(result)
+    if failed:
+        sys.exit(1)
@@ -25,29 +25,35 @@
 Function for setting boot-image in BSS.
 """
 
-import sys
 import click
-import requests
-from libcsm.sls import api
+from libcsm.sls import batch
 
 
 @click.command()
-@click.option('--xname', required=True, type=str, \
-    help='xname of the node whose hostname should be returned.')
+@click.option('--xname', 'xnames', required=False, type=str, multiple=True, \
+    help='xname of the node whose hostname should be returned, may be repeated.')
+@click.option('--file', 'name_file', required=False, type=click.File('r'), default=None, \
+    help='File of xnames to lookup, one per line. Use \'-\' to read from stdin.')
+@click.option('--format', 'output_format', required=False, type=click.Choice(batch.FORMATS), \
+    default='plain', help='Output format: the hostname only (plain), xname and hostname (tsv), ' \
+    'or JSON lines (json). Default is \'plain\'.')
+@batch.snapshot_options
 @click.option('--api-gateway-address', required=False, type=str, default='api-gw-service-nmn.local',
     help='API gateway address. Default is \'api-gw-service-nmn.local\'.')
-def main(xname: str, api_gateway_address: str) -> None:
+def main(xnames: tuple, name_file, output_format: str, api_gateway_address: str,
+         snapshot_options: batch.SnapshotOptions) -> None:
     """
     Get the hostname of an NCN for a given Xname.
 
-    This queries SLS for management nodes' information.
+    This queries SLS for management nodes' information once, and looks up every
+    xname given in it.
 
-    :param xname: The XNAME to lookup.
+    :param xnames: The XNAMEs to lookup.
+    :param name_file: A file of XNAMEs to lookup.
+    :param output_format: The output format.
     :param api_gateway_address: The hostname of the API gateway.
+    :param snapshot_options: The ``--snapshot-max-age`` and ``--offline`` options.
     """
-    sls_api = api.API(api_gateway_address)
-    try:
-        print(sls_api.get_hostname(xname))
-    except (requests.exceptions.RequestException, KeyError, ValueError) as error:
-        print(f'{error}')
-        sys.exit(1)
+    names = batch.read_names(xnames, name_file)
+    sls_api = batch.get_api(api_gateway_address, snapshot_options)
+    batch.resolve(names, sls_api.inventory.get_hostname, 'xname', 'hostname', output_format)
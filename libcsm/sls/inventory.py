@@ -0,0 +1,198 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Indexed, cached inventory of management nodes from SLS.
+"""
+from threading import Lock
+from time import monotonic
+from typing import Dict
+from typing import List
+
+INVENTORY_TTL = 60
+
+
+class Inventory:
+    """
+    Management nodes from SLS, indexed for constant time lookups.
+
+    The management components are fetched once from SLS and indexed by alias,
+    xname, and role/subrole. The indexes are reused until they are older than
+    ``ttl`` seconds or ``invalidate`` is called, so resolving many names costs
+    a single request.
+
+    .. code-block:: python
+
+        from libcsm.sls import api
+
+        inventory = api.API().inventory
+        xnames = inventory.get_xnames(['ncn-m001', 'ncn-w001'])
+    """
+
+    def __init__(self, sls_api, ttl: float = INVENTORY_TTL) -> None:
+        """
+        :param sls_api: The ``sls.api.API`` to fetch management components with.
+        :param ttl: Seconds the fetched components are reused for.
+        """
+        self.sls_api = sls_api
+        self.ttl = ttl
+        self._xnames_by_alias = {}
+        self._aliases_by_xname = {}
+        self._xnames_by_role = {}
+        self._fetched_at = None
+        self._lock = Lock()
+        self._refresh_lock = Lock()
+
+    def refresh(self) -> None:
+        """
+        Fetch the management components from SLS and rebuild the indexes.
+
+        :raises KeyError: When a component is missing ``ExtraProperties`` or ``Aliases``.
+        """
+        components = self.sls_api.get_management_components()
+        xnames_by_alias = {}
+        aliases_by_xname = {}
+        xnames_by_role = {}
+        for node in components:
+            try:
+                xname = node['Xname']
+                extra_properties = node['ExtraProperties']
+                aliases = extra_properties['Aliases']
+            except KeyError as error:
+                raise KeyError(f'ERROR [ExtraProperties][Aliases] was not in the' \
+                    f'response from sls. These fields are expected in the json response.' \
+                    f'The response was {components}') from error
+            aliases_by_xname[xname] = list(aliases)
+            for alias in aliases:
+                xnames_by_alias.setdefault(alias, xname)
+            role = extra_properties.get('Role')
+            subrole = extra_properties.get('SubRole')
+            xnames_by_role.setdefault((role, None), []).append(xname)
+            if subrole is not None:
+                xnames_by_role.setdefault((role, subrole), []).append(xname)
+        with self._lock:
+            self._xnames_by_alias = xnames_by_alias
+            self._aliases_by_xname = aliases_by_xname
+            self._xnames_by_role = xnames_by_role
+            self._fetched_at = monotonic()
+
+    def invalidate(self) -> None:
+        """
+        Discard the indexes so the next lookup fetches from SLS again.
+        """
+        with self._lock:
+            self._fetched_at = None
+
+    def _is_stale(self) -> bool:
+        """
+        Whether the indexes were never built or are older than ``ttl``.
+        """
+        fetched_at = self._fetched_at
+        return fetched_at is None or monotonic() - fetched_at >= self.ttl
+
+    def _ensure_fresh(self) -> None:
+        """
+        Refresh the indexes if they were never built or are older than ``ttl``.
+
+        Threads that find them stale at the same time wait for a single refresh.
+        """
+        if not self._is_stale():
+            return
+        with self._refresh_lock:
+            if self._is_stale():
+                self.refresh()
+
+    def get_xname(self, hostname: str) -> str:
+        """
+        Get the xname of a management node from one of its aliases.
+
+        :param hostname: The hostname (alias) to lookup.
+        :returns: The XNAME.
+        """
+        self._ensure_fresh()
+        try:
+            return self._xnames_by_alias[hostname]
+        except KeyError:
+            raise ValueError(f'ERROR hostname:{hostname} was not found in management nodes.') \
+                from None
+
+    def get_hostname(self, xname: str) -> str:
+        """
+        Get the hostname of a management node from its xname.
+
+        The hostname is assumed to be the first entry in ``['ExtraProperties']['Aliases']``.
+
+        :param xname: The XNAME to lookup.
+        :returns: The hostname.
+        """
+        self._ensure_fresh()
+        try:
+            return self._aliases_by_xname[xname][0]
+        except (KeyError, IndexError):
+            raise ValueError(f'ERROR xname:{xname} was not found in management nodes.') \
+                from None
+
+    def get_aliases(self, xname: str) -> List[str]:
+        """
+        Get every alias of a management node from its xname.
+
+        :param xname: The XNAME to lookup.
+        :returns: The aliases, or an empty list if the xname is unknown.
+        """
+        self._ensure_fresh()
+        return list(self._aliases_by_xname.get(xname, []))
+
+    def get_xnames(self, hostnames: List[str]) -> Dict[str, str]:
+        """
+        Resolve many hostnames to xnames; unknown hostnames are left out.
+
+        :param hostnames: The hostnames (aliases) to lookup.
+        :returns: A dictionary of each hostname's xname.
+        """
+        self._ensure_fresh()
+        xnames_by_alias = self._xnames_by_alias
+        return {hostname: xnames_by_alias[hostname] for hostname in hostnames
+                if hostname in xnames_by_alias}
+
+    def get_hostnames(self, xnames: List[str]) -> Dict[str, str]:
+        """
+        Resolve many xnames to hostnames; unknown xnames are left out.
+
+        :param xnames: The XNAMEs to lookup.
+        :returns: A dictionary of each xname's hostname.
+        """
+        self._ensure_fresh()
+        aliases_by_xname = self._aliases_by_xname
+        return {xname: aliases_by_xname[xname][0] for xname in xnames
+                if aliases_by_xname.get(xname)}
+
+    def get_by_role(self, role: str, subrole: str = None) -> List[str]:
+        """
+        Get the xnames of management nodes with a role and, optionally, subrole.
+
+        :param role: The SLS role, e.g. ``Management``.
+        :param subrole: The SLS subrole, e.g. ``Worker``.
+        :returns: The XNAMEs.
+        """
+        self._ensure_fresh()
+        return list(self._xnames_by_role.get((role, subrole), []))
@@ -0,0 +1,136 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Persistent, revalidated snapshots of SLS responses.
+"""
+import json
+import os
+import re
+from time import time
+
+from libcsm.os import atomic_write
+from libcsm.os import file_lock
+
+SNAPSHOT_MAX_AGE = 300
+
+
+def default_path(api_gateway_address: str) -> str:
+    """
+    Get the default snapshot path for an API gateway.
+
+    Snapshots are kept under ``$XDG_CACHE_HOME/libcsm`` (``~/.cache/libcsm``
+    if ``XDG_CACHE_HOME`` is unset).
+
+    :param api_gateway_address: The hostname of the API gateway.
+    :returns: The snapshot path.
+    """
+    cache_home = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    name = re.sub(r'[^A-Za-z0-9.-]', '_', api_gateway_address)
+    return os.path.join(cache_home, 'libcsm', f'sls-{name}.json')
+
+
+class Snapshot:
+    """
+    An on-disk snapshot of the SLS management components.
+
+    A snapshot records when it was fetched and the ``ETag`` and
+    ``Last-Modified`` validators SLS returned with it. Snapshots younger than
+    ``max_age`` seconds are served without contacting SLS, older snapshots are
+    revalidated with a conditional request. In ``offline`` mode the snapshot
+    is always served, regardless of age, and SLS is never contacted.
+    """
+
+    def __init__(self, path: str, max_age: float = SNAPSHOT_MAX_AGE, offline: bool = False) -> None:
+        """
+        :param path: The snapshot file.
+        :param max_age: Seconds a snapshot is served without revalidation.
+        :param offline: Never contact SLS, only serve the snapshot.
+        """
+        self.path = path
+        self.max_age = max_age
+        self.offline = offline
+
+    def load(self) -> [dict, None]:
+        """
+        Load the snapshot.
+
+        :returns: The snapshot, or ``None`` if there is no usable snapshot.
+        """
+        try:
+            with file_lock(f'{self.path}.lock', shared=True):
+                with open(self.path, encoding='utf-8') as handle:
+                    snapshot = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(snapshot, dict) or 'components' not in snapshot:
+            return None
+        return snapshot
+
+    def is_fresh(self, snapshot: dict) -> bool:
+        """
+        Whether ``snapshot`` can be served without revalidation.
+
+        :param snapshot: A snapshot from ``load``.
+        """
+        return self.offline or time() - snapshot.get('fetched_at', 0) < self.max_age
+
+    @staticmethod
+    def validators(snapshot: dict) -> dict:
+        """
+        Get the conditional request headers for revalidating ``snapshot``.
+
+        :param snapshot: A snapshot from ``load``.
+        :returns: The ``If-None-Match`` and ``If-Modified-Since`` headers.
+        """
+        headers = {}
+        if snapshot.get('etag'):
+            headers['If-None-Match'] = snapshot['etag']
+        if snapshot.get('last_modified'):
+            headers['If-Modified-Since'] = snapshot['last_modified']
+        return headers
+
+    def save(self, components: list, etag: str = None, last_modified: str = None) -> dict:
+        """
+        Save a new snapshot, fetched now.
+
+        Failing to write the snapshot is not fatal.
+
+        :param components: The management components.
+        :param etag: The ``ETag`` returned with the components.
+        :param last_modified: The ``Last-Modified`` returned with the components.
+        :returns: The snapshot.
+        """
+        snapshot = {
+            'fetched_at': time(),
+            'etag': etag,
+            'last_modified': last_modified,
+            'components': components,
+        }
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), mode=0o700, exist_ok=True)
+            with file_lock(f'{self.path}.lock'):
+                atomic_write(self.path, json.dumps(snapshot).encode('utf-8'))
+        except OSError as error:
+            print(f'Failed to write SLS snapshot [{self.path}]: {error}')
+        return snapshot
@@ -0,0 +1,78 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Tests for the ``asyncio`` BSS client.
+"""
+import asyncio
+import json
+
+import mock
+import requests
+
+from libcsm.bss import aio
+from libcsm.requests.aio import AsyncResponse
+
+BOOTPARAMS = {
+    'hosts': ['x1'],
+    'initrd': 'old_initrd',
+    'kernel': 'old_kernel',
+    'params': 'metal.server=old_rootfs quiet',
+}
+IMAGES = {'initrd': 'new_initrd', 'kernel': 'new_kernel', 'rootfs': 'new_rootfs'}
+
+
+class TestAsyncAPI:
+    """
+    Tests for the ``AsyncAPI`` class.
+    """
+
+    def test_set_bss_image_many(self) -> None:
+        """
+        Assert every XNAME is set and a failure for one does not stop the others.
+        """
+        patched = {}
+
+        async def send(method, _, headers, data) -> AsyncResponse:
+            assert headers['Authorization'] == 'Bearer token'
+            body = json.loads(data)
+            xname = body['hosts'][0]
+            if xname == 'x2':
+                return AsyncResponse(500, {}, b'')
+            if method == 'PATCH':
+                patched[xname] = body
+                return AsyncResponse(200, {}, b'')
+            current = patched.get(xname, dict(BOOTPARAMS, hosts=[xname]))
+            return AsyncResponse(200, {}, json.dumps([current]).encode())
+
+        async def run() -> dict:
+            bss_api = aio.AsyncAPI(auth=mock.Mock(current_token='token', expiring=False))
+            with mock.patch.object(bss_api, '_send', side_effect=send):
+                return await bss_api.set_bss_image_many(['x1', 'x2', 'x3'], IMAGES)
+
+        results = asyncio.run(run())
+        assert results['x1'] is None
+        assert results['x3'] is None
+        assert isinstance(results['x2'], requests.exceptions.RequestException)
+        assert patched['x1']['params'] == 'metal.server=new_rootfs quiet'
+        assert patched['x3']['kernel'] == 'new_kernel'
@@ -25,7 +25,10 @@
 Tests for the bss api submodule.
 """
 
+import copy
 import http
+import json
+import math
 from dataclasses import dataclass
 import pytest
 import mock
@@ -120,6 +123,22 @@ class TestBssApi:
             with mock.patch.object(self.bss_api, 'patch_bss_bootparams', return_value=None):
                 self.bss_api.set_bss_image("xname", self.mock_setup.image_dict)
 
+    def test_print_images_one_write(self, *_) -> None:
+        """
+        Tests a node's images are printed in a single write, so parallel nodes do not interleave.
+        """
+        with mock.patch('builtins.print') as mock_print:
+            self.bss_api._print_images("xname", {
+                "initrd" : "new_initrd",
+                "kernel" : "new_kernel",
+                "params" : "abc metal.server=new_rootfs xyz",
+            })
+        mock_print.assert_called_once_with(
+            "New images in BSS for xname are:\n"
+            "  Metal.server image:  new_rootfs\n"
+            "  Initrd image:        new_initrd\n"
+            "  Kernel image:        new_kernel\n", end='')
+
     def test_set_bss_image_bad_inputs(self, *_) -> None:
         """
         Tests bad run of set_bss_image function because of invalid image_dict passed in.
@@ -159,3 +178,72 @@ class TestBssApi:
             return_value=bad_mock_boot_params):
             with pytest.raises(KeyError):
                 self.bss_api.set_bss_image("xname", self.mock_setup.image_dict)
+
+    def test_get_bss_bootparameters_bulk(self, *_) -> None:
+        """
+        Tests the bulk get requests ``chunk_size`` hosts at a time and maps
+        the response back to each xname.
+        """
+        xnames = ['x1', 'x2', 'x3']
+        chunk_size = 2
+
+        def bss_get(*_, data, **__) -> MockHTTPResponse:
+            hosts = json.loads(data)['hosts']
+            return MockHTTPResponse([{'hosts': hosts, 'kernel': 'k'}], http.HTTPStatus.OK)
+
+        with mock.patch.object(Session, 'get', side_effect=bss_get) as mock_get:
+            boot_params = self.bss_api.get_bss_bootparams_bulk(xnames, chunk_size=chunk_size)
+            assert mock_get.call_count == math.ceil(len(xnames) / chunk_size)
+        assert boot_params == {xname: {'hosts': [xname], 'kernel': 'k'} for xname in xnames}
+
+    def test_patch_bss_bootparameters_bulk(self, *_) -> None:
+        """
+        Tests that xnames with identical bootparameters share a patch request
+        and that a failed request is reported per xname, after one retry with
+        a refreshed token.
+        """
+        bss_jsons = {
+            'x1': {'kernel': 'a'},
+            'x2': {'kernel': 'a'},
+            'x3': {'kernel': 'b'},
+        }
+        responses = [self.mock_setup.ok_mock_http_response,
+                     self.mock_setup.unauth_mock_http_response,
+                     self.mock_setup.unauth_mock_http_response]
+        with mock.patch.object(Session, 'patch', side_effect=responses) as mock_patch:
+            results = self.bss_api.patch_bss_bootparams_bulk(bss_jsons)
+            assert mock_patch.call_count == len(responses)
+        assert results['x1'] is None
+        assert results['x2'] is None
+        assert isinstance(results['x3'], requests.exceptions.RequestException)
+
+    def test_set_bss_image_bulk(self, *_) -> None:
+        """
+        Tests the bulk set updates every xname BSS knows about and reports
+        the ones it does not.
+        """
+        store = {
+            'x1': dict(self.mock_setup.mock_boot_params, params='a metal.server=pre_rootfs x1'),
+            'x2': dict(self.mock_setup.mock_boot_params, params='a metal.server=pre_rootfs x2'),
+        }
+
+        def bss_get(*_, data, **__) -> MockHTTPResponse:
+            hosts = json.loads(data)['hosts']
+            entries = [dict(copy.deepcopy(store[host]), hosts=[host]) for host in hosts if host in store]
+            return MockHTTPResponse(entries, http.HTTPStatus.OK)
+
+        def bss_patch(*_, data, **__) -> MockHTTPResponse:
+            body = json.loads(data)
+            for host in body.pop('hosts'):
+                store[host].update(body)
+            return MockHTTPResponse([], http.HTTPStatus.OK)
+
+        with mock.patch.object(Session, 'get', side_effect=bss_get), \
+                mock.patch.object(Session, 'patch', side_effect=bss_patch):
+            results = self.bss_api.set_bss_image_bulk(['x1', 'x2', 'missing'],
+                                                      self.mock_setup.image_dict)
+        assert results['x1'] is None
+        assert results['x2'] is None
+        assert isinstance(results['missing'], KeyError)
+        assert store['x1']['params'] == 'a metal.server=rootfs_image x1'
+        assert store['x2']['kernel'] == 'kernel_image'
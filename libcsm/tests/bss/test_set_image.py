@@ -24,11 +24,18 @@
 """
 Tests for the bss set image main function.
 """
+import json
+from urllib.error import URLError
+
 import mock
+import requests
 
 from click.testing import CliRunner
+from libcsm import api
 from libcsm.bss import set_image
-from libcsm.s3 import images
+from libcsm.s3 import images, verify
+
+XNAMES = ['xname1', 'xname2', 'xname3']
 
 @mock.patch('libcsm.api.Auth', spec=True)
 @mock.patch('libcsm.bss.api.API.set_bss_image', spec=True)
@@ -88,3 +95,66 @@ class TestSetImage:
             result = cli_runner.invoke(set_image.main, ["--image-id", "image123", \
                 "--xnames", "xname1"])
             assert result.exit_code == 1
+
+    def test_set_image_parallel_collects_failures(self, *_) -> None:
+        """
+        Verify every node is attempted in parallel mode, failures are
+        summarized, and the exit code is non-zero.
+        """
+        def set_bss_image(xname, _) -> None:
+            if xname == 'xname2':
+                raise requests.exceptions.RequestException('gateway error')
+
+        cli_runner = CliRunner()
+        with mock.patch('libcsm.bss.api.API.set_bss_image', side_effect=set_bss_image) as mock_set:
+            result = cli_runner.invoke(set_image.main, ["--image-id", "image123", \
+                "--xnames", ",".join(XNAMES), "--parallelism", "3", \
+                "--summary-format", "json"])
+            assert mock_set.call_count == len(XNAMES)
+        assert result.exit_code == 1
+        summary = json.loads(result.output.strip().splitlines()[-1])
+        assert sorted(summary['succeeded']) == ['xname1', 'xname3']
+        assert summary['failed'] == {'xname2': 'gateway error'}
+
+    def test_set_image_parallel_collects_any_error(self, *_) -> None:
+        """
+        Verify errors other than request errors, e.g. from refreshing the token
+        midway, are recorded for their node without stopping the others.
+        """
+        errors = {
+            'xname1': api.AuthException('Could not resolve an API Token!'),
+            'xname2': URLError('timed out'),
+        }
+
+        def set_bss_image(xname, _) -> None:
+            if xname in errors:
+                raise errors[xname]
+
+        with mock.patch('libcsm.bss.api.API.set_bss_image', side_effect=set_bss_image) as mock_set:
+            result = CliRunner().invoke(set_image.main, ["--image-id", "image123", \
+                "--xnames", ",".join(XNAMES), "--parallelism", "2", \
+                "--summary-format", "json"])
+            assert mock_set.call_count == len(XNAMES)
+        assert result.exit_code == 1
+        summary = json.loads(result.output.strip().splitlines()[-1])
+        assert summary['succeeded'] == ['xname3']
+        assert summary['failed'] == {xname: str(error) for xname, error in errors.items()}
+
+    @mock.patch('libcsm.s3.verify.verify_artifacts', spec=True)
+    @mock.patch('libcsm.s3.images.get_s3_image_manifest', spec=True)
+    def test_set_image_verify_artifacts_failure(self, _, mock_verify, mock_get_info,
+                                                 mock_set_bss_image, *__) -> None:
+        """
+        Verify a failed artifact verification exits before BSS is changed.
+        """
+        mock_verify.return_value = [
+            verify.ArtifactCheck('kernel', 's3://boot-images/image123/kernel', (), 0.1),
+            verify.ArtifactCheck('rootfs', 's3://boot-images/image123/rootfs', ('missing',), 0.1),
+        ]
+        cli_runner = CliRunner()
+        result = cli_runner.invoke(set_image.main, ["--image-id", "image123", \
+            "--xnames", "xname1", "--verify-artifacts"])
+        assert result.exit_code == 1
+        assert 'FAILED rootfs' in result.output
+        mock_get_info.assert_not_called()
+        mock_set_bss_image.assert_not_called()
@@ -0,0 +1,66 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Tests for the ``asyncio`` HSM client.
+"""
+import asyncio
+import json
+
+import mock
+import pytest
+
+from libcsm.hsm import aio
+from libcsm.hsm.components import ROLE_SUBROLES
+from libcsm.requests.aio import AsyncResponse
+
+
+class TestAsyncAPI:
+    """
+    Tests for the ``AsyncAPI`` class.
+    """
+
+    def test_get_components_many(self) -> None:
+        """
+        Assert every role and subrole is queried.
+        """
+        async def send(_, url, *__) -> AsyncResponse:
+            subrole = url.rsplit('subrole=', 1)[1]
+            return AsyncResponse(200, {}, json.dumps({'Components': [{'ID': subrole}]}).encode())
+
+        async def run() -> dict:
+            hsm_api = aio.AsyncAPI(auth=mock.Mock(current_token='token', expiring=False))
+            with mock.patch.object(hsm_api, '_send', side_effect=send):
+                return await hsm_api.get_components_many()
+
+        components = asyncio.run(run())
+        assert list(components) == ROLE_SUBROLES
+        assert components['Management_Storage'] == {'Components': [{'ID': 'Storage'}]}
+
+    def test_bad_role_subrole(self) -> None:
+        """
+        Assert an unknown role and subrole raises a ``KeyError``.
+        """
+        hsm_api = aio.AsyncAPI(auth=mock.Mock(current_token='token', expiring=False))
+        with pytest.raises(KeyError):
+            asyncio.run(hsm_api.get_components('Management_BAD'))
@@ -72,9 +72,38 @@ class TestHsmApi:
 
     def test_get_components_bad_response(self, *_) -> None:
         """
-        Tests error is raised when a bad response is recieved from session.get() function.
+        Tests error is raised when a bad response is recieved from session.get() function,
+        and the response is closed.
         """
-        with mock.patch.object(Session, 'get', \
-            return_value=self.mock_setup.unauth_mock_http_response):
+        unauthorized = MockHTTPResponse(None, http.HTTPStatus.UNAUTHORIZED)
+        with mock.patch.object(Session, 'get', return_value=unauthorized):
             with pytest.raises(requests.exceptions.RequestException):
                 components.get_components('Management_Worker')
+        assert unauthorized.closed
+
+    def test_get_components_multiple(self, *_) -> None:
+        """
+        Tests several role_subroles, states, and field filters are queried in one request.
+        """
+        with mock.patch.object(Session, 'get', \
+            return_value=self.mock_setup.ok_mock_http_response) as mock_get:
+            components.get_components(['Management_Master', 'Management_Worker'],
+                                      states=['Ready'], fields='stateonly',
+                                      filters={'enabled': True, 'type': ['Node']})
+        mock_get.assert_called_once()
+        assert mock_get.call_args.kwargs['params'] == [
+            ('role', 'Management'),
+            ('subrole', 'Master'),
+            ('subrole', 'Worker'),
+            ('state', 'Ready'),
+            ('stateonly', 'true'),
+            ('enabled', 'true'),
+            ('type', 'Node'),
+        ]
+
+    def test_component_query_bad_fields(self, *_) -> None:
+        """
+        Tests error is raised when an unknown field filter is provided.
+        """
+        with pytest.raises(KeyError):
+            components.component_query('Management_Master', fields='everything')
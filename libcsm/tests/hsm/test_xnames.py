@@ -77,3 +77,31 @@ class TestXnames:
             xnames_arr = xnames.get_by_role_subrole(hsm_role_subrole)
             # check that xnames_arr is empty
             assert not xnames_arr
+
+
+    def test_xnames_multiple_role_subroles(self, *_) -> None:
+        """
+        Tests a comma separated list of role_subroles is fetched in one
+        request for state fields only.
+        """
+        mock_components = {"Components": [{"ID": "1"}, {"ID": "2"}]}
+        with mock.patch.object(components, 'get_components', \
+            return_value=MockHTTPResponse(mock_components, 200)) as mock_get_components:
+            xnames_arr = xnames.get_by_role_subrole("Management_Master,Management_Worker")
+        mock_get_components.assert_called_once_with(
+            ['Management_Master', 'Management_Worker'], fields='stateonly')
+        assert xnames_arr == ['1', '2']
+
+    def test_xnames_role_subroles_whitespace(self, *_) -> None:
+        """
+        Tests whitespace around role_subroles and empty items are ignored.
+        """
+        mock_components = {"Components": [{"ID": "1"}]}
+        with mock.patch.object(components, 'get_components', \
+            return_value=MockHTTPResponse(mock_components, 200)) as mock_get_components:
+            xnames.get_by_role_subrole(" Management_Master, Management_Worker ,")
+            xnames.get_by_role_subrole(["Management_Storage "])
+        assert mock_get_components.call_args_list == [
+            mock.call(['Management_Master', 'Management_Worker'], fields='stateonly'),
+            mock.call(['Management_Storage'], fields='stateonly'),
+        ]
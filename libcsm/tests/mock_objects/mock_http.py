@@ -25,16 +25,28 @@
 Reusable mocks for HTTP requests.
 """
 from dataclasses import dataclass
+import json
 
 
 @dataclass
 class MockHTTPResponse:
     """Class for a mocked HTTP response."""
 
-    def __init__(self, data, status_code):
+    def __init__(self, data, status_code, headers=None):
         self.json_data = data
         self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
 
     def json(self):
         """Return json data from the exception."""
         return self.json_data
+
+    def close(self):
+        """Mark the response closed."""
+        self.closed = True
+
+    def iter_content(self, chunk_size=1):
+        """Return the json data encoded, ``chunk_size`` bytes at a time."""
+        content = json.dumps(self.json_data).encode()
+        return (content[index:index + chunk_size] for index in range(0, len(content), chunk_size))
@@ -38,10 +38,14 @@ class MockSLSResponse:
     mock_components = [
         {
             'Parent': 'par1', 'Xname': 'xname1',
-            'ExtraProperties': {'Aliases': ['ncn-w001'], 'A': 100}
+            'ExtraProperties': {
+                'Aliases': ['ncn-w001'], 'A': 100, 'Role': 'Management', 'SubRole': 'Worker'
+            }
         }, {
             'Parent': 'par2', 'Xname': 'xname2',
-            'ExtraProperties': {'Aliases': ['ncn-s002'], 'A': 101}
+            'ExtraProperties': {
+                'Aliases': ['ncn-s002'], 'A': 101, 'Role': 'Management', 'SubRole': 'Storage'
+            }
         },
     ]
     mock_http_response = MockHTTPResponse(mock_components, http.HTTPStatus.OK)
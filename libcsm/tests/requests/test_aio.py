@@ -0,0 +1,152 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Tests for the ``requests.aio`` submodule.
+"""
+import asyncio
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+import threading
+import time
+
+import mock
+import pytest
+import requests
+
+from libcsm.requests import aio
+from libcsm.requests import breaker
+from libcsm.requests.retry import RETRY_POLICY
+
+pytest.importorskip('aiohttp')
+
+
+class _SlowHandler(BaseHTTPRequestHandler):
+    """
+    An HTTP/1.1 handler that records how many requests it serves at once.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+    authorization = []
+
+    def do_GET(self) -> None:  # noqa: N802
+        """
+        Respond with an empty JSON list after a short delay.
+        """
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+            cls.authorization.append(self.headers.get('Authorization'))
+        time.sleep(0.05)
+        with cls.lock:
+            cls.active -= 1
+        body = b'[]'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_) -> None:
+        """
+        Silence request logging.
+        """
+
+
+class TestAsyncClient:
+    """
+    Tests for the ``AsyncClient`` class.
+    """
+
+    def test_concurrency_limit(self) -> None:
+        """
+        Assert requests share the auth token and never exceed ``concurrency`` in flight,
+        and the limiter is widened once for the client rather than per request.
+        """
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _SlowHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        url = f'http://127.0.0.1:{server.server_address[1]}/'
+        concurrency = 2
+        auth = mock.Mock(current_token='token', expiring=False)
+
+        async def run() -> list:
+            async with aio.AsyncClient(concurrency=concurrency, auth=auth) as client:
+                return await asyncio.gather(*(client.request('GET', url) for _ in range(6)))
+
+        try:
+            with mock.patch.object(breaker.AdaptiveLimiter, 'widen', autospec=True) as widen:
+                responses = asyncio.run(run())
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert [response.json() for response in responses] == [[]] * len(responses)
+        assert _SlowHandler.peak == concurrency
+        assert set(_SlowHandler.authorization) == {'Bearer token'}
+        widen.assert_called_once_with(mock.ANY, concurrency)
+
+    def test_refreshes_expiring_token(self) -> None:
+        """
+        Assert an expiring token is refreshed before it is used.
+        """
+        auth = mock.Mock(current_token='token', expiring=True)
+        client = aio.AsyncClient(auth=auth)
+        assert asyncio.run(client.token()) == 'token'
+        auth.refresh_token.assert_called_once_with()
+
+    def test_refreshes_rejected_token(self) -> None:
+        """
+        Assert a rejected token is refreshed in a worker thread, without reading
+        ``Auth.token`` on the event loop.
+        """
+        auth = mock.Mock(current_token='old', expiring=False)
+        type(auth).token = mock.PropertyMock(side_effect=AssertionError('read on the loop'))
+        client = aio.AsyncClient(auth=auth)
+        asyncio.run(client.token(rejected='old'))
+        auth.refresh_token.assert_called_once_with(force=True, rejected='old')
+        asyncio.run(client.token(rejected='older'))
+        auth.refresh_token.assert_called_once()
+
+    @mock.patch.object(RETRY_POLICY, 'max_attempts', 1)
+    def test_connection_error(self) -> None:
+        """
+        Assert connection failures raise ``requests.exceptions.RequestException``.
+        """
+        auth = mock.Mock(current_token='token', expiring=False)
+
+        async def run() -> None:
+            async with aio.AsyncClient(auth=auth) as client:
+                await client.request('GET', 'http://127.0.0.1:1/')
+
+        with pytest.raises(requests.exceptions.RequestException):
+            asyncio.run(run())
+
+    def test_bad_concurrency(self) -> None:
+        """
+        Assert concurrency must be positive.
+        """
+        with pytest.raises(ValueError):
+            aio.AsyncClient(concurrency=0)
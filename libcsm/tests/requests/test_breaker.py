@@ -0,0 +1,245 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Tests for the ``requests.breaker`` submodule.
+"""
+import asyncio
+import http
+import threading
+
+import mock
+import pytest
+
+from libcsm.requests import breaker
+
+LIMIT = 4
+# 4 + 1/4 + 1/4.25 + ... passes 5 after five fast successes.
+SUCCESSES_TO_GROW = 5
+
+
+class TestCircuitBreaker:
+    """
+    Tests for the ``CircuitBreaker`` class.
+    """
+
+    def test_opens_and_recovers(self) -> None:
+        """
+        Assert the circuit opens after consecutive failures, then half-opens for one trial.
+        """
+        circuit = breaker.CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        circuit.record(failed=True)
+        assert circuit.allow()
+        circuit.record(failed=True)
+        assert circuit.state == breaker.OPEN
+        assert not circuit.allow()
+        with mock.patch('libcsm.requests.breaker.monotonic', return_value=circuit._opened_at + 30):
+            assert circuit.state == breaker.HALF_OPEN
+            trial = circuit.allow()
+            assert trial
+            assert not circuit.allow()
+            circuit.record(failed=False, ticket=trial)
+        assert circuit.state == breaker.CLOSED
+        assert circuit.stats() == {'state': breaker.CLOSED, 'failures': 0}
+
+    def test_failed_trial_reopens(self) -> None:
+        """
+        Assert a failed trial request opens the circuit again.
+        """
+        circuit = breaker.CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        circuit.record(failed=True)
+        trial = circuit.allow()
+        assert trial
+        circuit.record(failed=True, ticket=trial)
+        assert circuit._state == breaker.OPEN
+
+    def test_stale_outcome_keeps_trial(self) -> None:
+        """
+        Assert a late outcome of a request sent before the circuit opened
+        neither frees the trial slot nor changes the state.
+        """
+        circuit = breaker.CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        stale = circuit.allow()
+        circuit.record(failed=True)
+        trial = circuit.allow()
+        assert trial
+        circuit.record(failed=False, ticket=stale)
+        assert circuit.state == breaker.HALF_OPEN
+        assert not circuit.allow()
+        circuit.record(failed=False, ticket=trial)
+        assert circuit.state == breaker.CLOSED
+
+    def test_success_resets_failures(self) -> None:
+        """
+        Assert only consecutive failures open the circuit.
+        """
+        circuit = breaker.CircuitBreaker(failure_threshold=2)
+        for failed in (True, False, True, False):
+            circuit.record(failed=failed)
+        assert circuit.state == breaker.CLOSED
+
+
+class TestAdaptiveLimiter:
+    """
+    Tests for the ``AdaptiveLimiter`` class.
+    """
+
+    def test_aimd(self) -> None:
+        """
+        Assert the limit grows additively on fast successes and halves on failure or slowness.
+        """
+        limiter = breaker.AdaptiveLimiter(initial=LIMIT, latency_target=1)
+        for _ in range(SUCCESSES_TO_GROW):
+            assert limiter.try_acquire()
+            limiter.release(0.1, failed=False)
+        assert limiter.limit == LIMIT + 1
+        limiter.acquire()
+        limiter.release(5, failed=False)
+        assert limiter.limit == (LIMIT + 1) // 2
+        # Sent before the limit halved, part of the same slow round trip.
+        limiter.acquire()
+        limiter.release(0.1, failed=True)
+        assert limiter.limit == (LIMIT + 1) // 2
+        limiter.acquire()
+        limiter.release(0.0, failed=True)
+        assert limiter.limit == limiter.minimum
+
+    def test_halves_once_per_burst(self) -> None:
+        """
+        Assert a burst of slow responses to requests sent together halves the limit once.
+        """
+        initial = 32
+        limiter = breaker.AdaptiveLimiter(initial=initial, latency_target=1)
+        for _ in range(initial):
+            limiter.acquire()
+        for _ in range(initial):
+            limiter.release(5, failed=False)
+        assert limiter.limit == initial // 2
+
+    def test_widen(self) -> None:
+        """
+        Assert widening raises the limit and its maximum, unless the limit was already reduced.
+        """
+        concurrency = 1000
+        limiter = breaker.AdaptiveLimiter()
+        limiter.widen(concurrency)
+        assert limiter.limit == limiter.maximum == concurrency
+        limiter.acquire()
+        limiter.release(0.0, failed=True)
+        limiter.widen(concurrency)
+        assert limiter.limit == concurrency // 2
+
+    def test_limits_inflight(self) -> None:
+        """
+        Assert requests beyond the limit wait for a slot to be released.
+        """
+        limiter = breaker.AdaptiveLimiter(initial=1)
+        limiter.acquire()
+        assert not limiter.try_acquire()
+        acquired = threading.Event()
+
+        def acquire() -> None:
+            limiter.acquire()
+            acquired.set()
+
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        assert not acquired.wait(0.05)
+        limiter.release()
+        assert acquired.wait(1)
+        thread.join()
+        assert limiter.stats() == {'limit': 1, 'inflight': 1}
+
+    def test_acquire_async(self) -> None:
+        """
+        Assert coroutines wait for a slot without blocking the event loop.
+        """
+        limiter = breaker.AdaptiveLimiter(initial=1)
+
+        async def run() -> None:
+            await limiter.acquire_async()
+            waiter = asyncio.ensure_future(limiter.acquire_async())
+            await asyncio.sleep(0.05)
+            assert not waiter.done()
+            limiter.release()
+            await asyncio.wait_for(waiter, 1)
+
+        asyncio.run(run())
+        assert limiter.stats()['inflight'] == 1
+
+    def test_acquire_async_fifo(self) -> None:
+        """
+        Assert waiting coroutines get slots in the order they asked, and a
+        cancelled waiter does not keep a slot.
+        """
+        limiter = breaker.AdaptiveLimiter(initial=1)
+        order = []
+
+        async def take(name: str) -> None:
+            await limiter.acquire_async()
+            order.append(name)
+
+        async def run() -> None:
+            await limiter.acquire_async()
+            waiters = [asyncio.ensure_future(take(name)) for name in 'abc']
+            await asyncio.sleep(0)
+            waiters[1].cancel()
+            for _ in 'ac':
+                limiter.release()
+                await asyncio.sleep(0.01)
+            await asyncio.gather(*waiters, return_exceptions=True)
+
+        asyncio.run(run())
+        assert order == ['a', 'c']
+        assert limiter.stats() == {'limit': 1, 'inflight': 1}
+
+
+class TestServiceGuard:
+    """
+    Tests for the ``ServiceGuard`` and ``Guards`` classes.
+    """
+
+    def test_guard(self) -> None:
+        """
+        Assert outcomes drive the breaker and limiter, and an open circuit rejects requests.
+        """
+        guards = breaker.Guards()
+        guard = guards.get('bss')
+        guard.breaker.failure_threshold = 1
+        permit = guard.acquire('bss')
+        guard.release(permit, status_code=http.HTTPStatus.SERVICE_UNAVAILABLE)
+        with pytest.raises(breaker.CircuitOpenException):
+            guard.acquire('bss')
+        stats = guards.stats()['bss']
+        assert stats['state'] == breaker.OPEN
+        assert stats['inflight'] == 0
+        assert stats['limit'] == breaker.LIMIT_INITIAL // 2
+
+    def test_is_failure(self) -> None:
+        """
+        Assert throttling and server errors are failures, client errors are not.
+        """
+        assert breaker.is_failure(http.HTTPStatus.TOO_MANY_REQUESTS)
+        assert breaker.is_failure(http.HTTPStatus.BAD_GATEWAY)
+        assert not breaker.is_failure(http.HTTPStatus.NOT_FOUND)
+        assert breaker.is_failure(error=OSError())
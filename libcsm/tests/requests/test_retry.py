@@ -0,0 +1,162 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Tests for the ``requests.retry`` submodule.
+"""
+import asyncio
+import http
+
+import mock
+import pytest
+import requests
+
+from libcsm.requests import breaker, retry
+from libcsm.tests.mock_objects.mock_http import MockHTTPResponse
+
+OK = MockHTTPResponse([], http.HTTPStatus.OK)
+UNAVAILABLE = MockHTTPResponse(None, http.HTTPStatus.SERVICE_UNAVAILABLE)
+BAD_GATEWAY = MockHTTPResponse(None, http.HTTPStatus.BAD_GATEWAY)
+UNAUTHORIZED = MockHTTPResponse(None, http.HTTPStatus.UNAUTHORIZED)
+# A first attempt and one resend, after a retry or a token refresh.
+ATTEMPTS = 2
+RETRY_AFTER = 3
+
+
+@mock.patch('libcsm.requests.retry.sleep')
+class TestRetryPolicy:
+    """
+    Tests for the ``RetryPolicy`` class.
+    """
+
+    def setup_method(self) -> None:
+        """
+        Use a fresh policy for every test.
+        """
+        self.policy = retry.RetryPolicy()
+        self.policy.guards = breaker.Guards()
+
+    def test_retryable(self, _) -> None:
+        """
+        Assert only requests that can not have been applied are retried for ``PATCH``.
+        """
+        assert self.policy.retryable('GET', status=http.HTTPStatus.BAD_GATEWAY)
+        assert not self.policy.retryable('PATCH', status=http.HTTPStatus.BAD_GATEWAY)
+        assert self.policy.retryable('PATCH', status=http.HTTPStatus.SERVICE_UNAVAILABLE)
+        assert not self.policy.retryable('GET', status=http.HTTPStatus.NOT_FOUND)
+        assert self.policy.retryable('GET', error=requests.exceptions.ReadTimeout())
+        assert not self.policy.retryable('PATCH', error=requests.exceptions.ReadTimeout())
+        assert self.policy.retryable('PATCH', error=requests.exceptions.ConnectTimeout())
+
+    def test_retry_then_succeed(self, mock_sleep) -> None:
+        """
+        Assert a transient failure is retried after a backoff and counted.
+        """
+        responses = [UNAVAILABLE, OK]
+        send = mock.Mock(side_effect=responses)
+        assert self.policy.call('bss', 'GET', send) is OK
+        assert send.call_count == len(responses)
+        mock_sleep.assert_called_once()
+        assert self.policy.stats()['bss'] == {
+            'requests': 1, 'retries': 1, 'refreshes': 0, 'exhausted': 0,
+        }
+
+    def test_patch_not_retried(self, mock_sleep) -> None:
+        """
+        Assert a ``PATCH`` the gateway may have applied is not resent.
+        """
+        send = mock.Mock(return_value=BAD_GATEWAY)
+        assert self.policy.call('bss', 'PATCH', send) is BAD_GATEWAY
+        send.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    def test_max_attempts(self, _) -> None:
+        """
+        Assert the last error is raised once every attempt fails.
+        """
+        send = mock.Mock(side_effect=requests.exceptions.ConnectionError('refused'))
+        with pytest.raises(requests.exceptions.ConnectionError):
+            self.policy.call('sls', 'GET', send)
+        assert send.call_count == self.policy.max_attempts
+        assert self.policy.stats()['sls']['exhausted'] == 1
+
+    def test_unauthorized_refreshes_token(self, mock_sleep) -> None:
+        """
+        Assert a ``401`` forces one token refresh and resends without a backoff.
+        """
+        auth = mock.Mock()
+        send = mock.Mock(side_effect=[UNAUTHORIZED, OK])
+        assert self.policy.call('hsm', 'GET', send, auth=auth) is OK
+        auth.refresh_token.assert_called_once_with(force=True, rejected=None)
+        mock_sleep.assert_not_called()
+        send = mock.Mock(return_value=UNAUTHORIZED)
+        assert self.policy.call('hsm', 'GET', send, auth=auth) is UNAUTHORIZED
+        assert send.call_count == ATTEMPTS
+        stats = self.policy.stats()['hsm']
+        assert stats['refreshes'] == stats['requests']
+
+    def test_budget(self, _) -> None:
+        """
+        Assert retries stop once the call class's budget is spent.
+        """
+        policy = retry.RetryPolicy(budget_ratio=0, budget_minimum=1)
+        policy.guards = breaker.Guards()
+        send = mock.Mock(return_value=UNAVAILABLE)
+        policy.call('bss', 'GET', send)
+        assert send.call_count == ATTEMPTS
+        assert policy.stats()['bss'] == {
+            'requests': 1, 'retries': 1, 'refreshes': 0, 'exhausted': 1,
+        }
+
+    def test_delay(self, _) -> None:
+        """
+        Assert backoff is jittered, bounded, and honours ``Retry-After``.
+        """
+        policy = retry.RetryPolicy(backoff=1, max_backoff=5)
+        assert 0 <= policy.delay(1) <= policy.backoff
+        assert 0 <= policy.delay(10) <= policy.max_backoff
+        assert policy.delay(1, {'Retry-After': str(RETRY_AFTER)}) == RETRY_AFTER
+        assert policy.delay(1, {'Retry-After': '60'}) == policy.max_backoff
+
+    def test_call_async(self, _) -> None:
+        """
+        Assert the ``asyncio`` path refreshes tokens and retries like the blocking one.
+        """
+        send = mock.AsyncMock(side_effect=[UNAUTHORIZED, UNAVAILABLE, OK])
+        refresh = mock.AsyncMock()
+        with mock.patch('asyncio.sleep', mock.AsyncMock()):
+            response = asyncio.run(self.policy.call_async('sls', 'GET', send, refresh))
+        assert response is OK
+        refresh.assert_awaited_once()
+        assert self.policy.stats()['sls']['retries'] == 1
+
+    def test_open_circuit(self, _) -> None:
+        """
+        Assert requests fail fast, without a retry, once the service's circuit opens.
+        """
+        self.policy.guards.get('bss').breaker.failure_threshold = 1
+        send = mock.Mock(return_value=UNAVAILABLE)
+        with pytest.raises(breaker.CircuitOpenException):
+            self.policy.call('bss', 'GET', send)
+        send.assert_called_once()
+        assert self.policy.guards.stats()['bss']['state'] == breaker.OPEN
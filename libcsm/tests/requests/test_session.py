@@ -0,0 +1,99 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Tests for the ``requests.session`` submodule.
+"""
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+import threading
+
+from libcsm.requests import session
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    """
+    A minimal HTTP/1.1 handler that keeps connections alive.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self) -> None:  # noqa: N802
+        """
+        Respond with an empty JSON list.
+        """
+        body = b'[]'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_) -> None:
+        """
+        Silence request logging.
+        """
+
+
+class TestSession:
+    """
+    Tests for the session pool.
+    """
+
+    def test_sessions_are_pooled(self) -> None:
+        """
+        Verify sessions are shared per host and distinct between hosts.
+        """
+        manager = session.SessionManager()
+        first = manager.get('host-a')
+        assert manager.get('host-a') is first
+        assert manager.get('host-b') is not first
+        manager.close()
+        assert manager.get('host-a') is not first
+
+    def test_get_session(self) -> None:
+        """
+        Verify ``get_session`` returns the process-wide session for a host.
+        """
+        assert session.get_session(host='example') is session.get_session(host='example')
+        assert session.get_session(host='example') is session.SESSIONS.get('example')
+
+    def test_connections_are_reused(self) -> None:
+        """
+        Verify repeated requests through a pooled session reuse one connection.
+        """
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _KeepAliveHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        requests_sent = 5
+        try:
+            manager = session.SessionManager(pool_maxsize=2)
+            url = f'http://127.0.0.1:{server.server_port}/'
+            for _ in range(requests_sent):
+                manager.get('127.0.0.1').get(url, timeout=5)
+            stats = manager.stats()
+            manager.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+        counters = next(iter(stats.values()))
+        assert counters == {'opened': 1, 'reused': requests_sent - 1}
@@ -0,0 +1,143 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Tests for the ``requests.stream`` submodule.
+"""
+import json
+
+import mock
+import pytest
+
+from libcsm.requests import stream
+
+COMPONENTS = [
+    {'ID': f'x3000c0s{index}b0n0', 'State': 'Ready', 'NID': 100000 + index, 'Name': 'ncn-ü'}
+    for index in range(50)
+]
+
+
+def chunked(document, chunk_size: int) -> list:
+    """
+    Encode ``document`` as JSON split into ``chunk_size`` byte chunks.
+    """
+    content = json.dumps(document, ensure_ascii=False).encode()
+    return [content[index:index + chunk_size] for index in range(0, len(content), chunk_size)]
+
+
+class TestIterJson:
+    """
+    Tests for ``iter_json``.
+    """
+
+    @pytest.mark.parametrize('chunk_size', [1, 7, 4096])
+    def test_keyed_array(self, chunk_size) -> None:
+        """
+        Assert every element is yielded, however the body is split into chunks.
+        """
+        document = {'Meta': {'Skipped': [1, 2]}, 'Components': COMPONENTS, 'Trailer': None}
+        elements = list(stream.iter_json(chunked(document, chunk_size), 'Components', ['ID', 'NID']))
+        assert elements == [{'ID': item['ID'], 'NID': item['NID']} for item in COMPONENTS]
+
+    def test_top_level_array(self) -> None:
+        """
+        Assert a document that is an array is streamed, including multi-byte characters.
+        """
+        assert list(stream.iter_json(chunked(COMPONENTS, 3))) == COMPONENTS
+        assert not list(stream.iter_json([b' [ ] ']))
+
+    @pytest.mark.parametrize('chunks', [
+        [b'[12.', b'5, 3]'],
+        [b'[1', b'2.5, 3]'],
+        [b'[1.25e', b'1, 3]'],
+        [b'[1.25E', b'+1, 3]'],
+        [b'[1.25e-', b'1, 3]'],
+        [b'[1.25e+1', b', 3]'],
+        [b'[-', b'1', b'2.5', b', 3]'],
+    ])
+    def test_number_split_across_chunks(self, chunks) -> None:
+        """
+        Assert a number split inside its fraction or exponent is decoded whole.
+        """
+        document = json.loads(b''.join(chunks))
+        assert list(stream.iter_json(chunks)) == document
+
+    @pytest.mark.parametrize('chunk_size', [1, 2, 3])
+    def test_numbers_any_split(self, chunk_size) -> None:
+        """
+        Assert numbers of every form survive being split at any offset.
+        """
+        document = [0, -7, 12.5, 1e-07, -3.25e+21, 6.02E23, 10, True, None]
+        assert list(stream.iter_json(chunked(document, chunk_size))) == document
+
+    def test_first_element_before_end(self) -> None:
+        """
+        Assert an element is yielded before the rest of the body is read.
+        """
+        chunks = iter(chunked(COMPONENTS, 16))
+        elements = stream.iter_json(chunks)
+        assert next(elements) == COMPONENTS[0]
+        assert next(chunks, None) is not None
+
+    def test_malformed(self) -> None:
+        """
+        Assert truncated, malformed, or missing arrays raise a ``ValueError``.
+        """
+        with pytest.raises(ValueError):
+            list(stream.iter_json([b'[{"ID": 1}, {"ID"']))
+        with pytest.raises(ValueError):
+            list(stream.iter_json([b'[1 2]']))
+        with pytest.raises(ValueError):
+            list(stream.iter_json([b'{"Other": []}'], 'Components'))
+
+
+class TestProject:
+    """
+    Tests for ``project``.
+    """
+
+    def test_nested_fields(self) -> None:
+        """
+        Assert dotted fields keep their nesting and missing fields are left out.
+        """
+        item = {'Xname': 'x1', 'ExtraProperties': {'Aliases': ['ncn-m001'], 'Big': 'x' * 100}}
+        assert stream.project(item, ['Xname', 'ExtraProperties.Aliases', 'Missing']) == {
+            'Xname': 'x1', 'ExtraProperties': {'Aliases': ['ncn-m001']},
+        }
+        assert stream.project(item, None) is item
+
+
+class TestIterResponse:
+    """
+    Tests for ``iter_response``.
+    """
+
+    def test_closes_response(self) -> None:
+        """
+        Assert the response is closed once the array is read.
+        """
+        response = mock.Mock()
+        response.iter_content.return_value = chunked({'Components': COMPONENTS}, 64)
+        ids = [item['ID'] for item in stream.iter_response(response, 'Components', ['ID'])]
+        assert ids == [item['ID'] for item in COMPONENTS]
+        response.close.assert_called_once()
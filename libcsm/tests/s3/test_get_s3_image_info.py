@@ -25,6 +25,7 @@
 Testing geting image information from an image in s3.
 """
 
+import dataclasses
 import json
 import io
 import pytest
@@ -96,3 +97,53 @@ class TestGetS3ImageInfo:
             ):
             with pytest.raises(ImageFormatException):
                 images.get_s3_image_info("bucket", "image", "info")
+
+
+class TestParseManifest:
+    """
+    Tests for the parse_manifest function.
+    """
+
+    def test_manifest_index(self) -> None:
+        """
+        Verify artifacts are indexed by image type with their metadata, and
+        that the manifest can not be modified.
+        """
+        mocked_images = [
+            {"type": "application/vnd.cray.image.rootfs.squashfs", "md5": "abc",
+             "link": {"path": "s3://boot-images/image/rootfs", "etag": "abc"}},
+            {"type": "application/vnd.cray.image.kernel", "link": {"path": "kernel_path"}},
+            {"type": "application/vnd.cray.image.initrd", "link": {"path": "initrd_path"}},
+        ]
+        manifest = images.parse_manifest(mock_s3_object(mocked_images)['Body'])
+        rootfs = manifest.image('rootfs')
+        assert rootfs.path == "s3://boot-images/image/rootfs"
+        assert rootfs.md5 == rootfs.etag == "abc"
+        assert rootfs.metadata['type'] == "application/vnd.cray.image.rootfs.squashfs"
+        assert manifest.image_dict() == {
+            'initrd': 'initrd_path', 'kernel': 'kernel_path', 'rootfs': 's3://boot-images/image/rootfs'
+        }
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            manifest.version = '2'
+        with pytest.raises(TypeError):
+            manifest.images['rootfs'] = None
+
+    def test_manifest_too_large(self) -> None:
+        """
+        Verify reading stops once a manifest exceeds the size limit.
+        """
+        chunk_size = 256
+        body = io.BytesIO(b'{"artifacts": [' + b' ' * 16 * chunk_size + b']}')
+        with mock.patch.object(images, 'MANIFEST_CHUNK_SIZE', chunk_size):
+            with pytest.raises(ImageFormatException):
+                images.parse_manifest(body, max_bytes=2 * chunk_size)
+        # Reading stops with the first chunk past the limit.
+        assert body.tell() == 3 * chunk_size
+
+    def test_manifest_malformed(self) -> None:
+        """
+        Verify malformed manifests raise ``ImageFormatException``.
+        """
+        for body in [b'not json', b'{"no_artifacts": []}', b'{"artifacts": [{"type": "kernel"}]}']:
+            with pytest.raises(ImageFormatException):
+                images.parse_manifest(io.BytesIO(body))
@@ -0,0 +1,127 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Tests for the ``ManifestCache`` and cached manifest lookups.
+"""
+import io
+import json
+import os
+
+import mock
+
+from libcsm.s3 import images, s3object
+from libcsm.s3.manifest_cache import ManifestCache
+from libcsm.s3.manifest_cache import default_directory
+
+MANIFEST = json.dumps({
+    'artifacts': [
+        {'type': 'initrd', 'link': {'path': 'initrd_path'}},
+        {'type': 'kernel', 'link': {'path': 'kernel_path'}},
+        {'type': 'rootfs', 'link': {'path': 'rootfs_path'}},
+    ]
+}).encode()
+
+
+class TestManifestCache:
+    """
+    Tests for the ``ManifestCache`` class.
+    """
+
+    def test_default_directory(self) -> None:
+        """
+        Assert the cache lives under ``XDG_CACHE_HOME``, and is not created until used.
+        """
+        with mock.patch.dict(os.environ, {'XDG_CACHE_HOME': '/nonexistent'}):
+            assert default_directory() == '/nonexistent/libcsm/manifests'
+            assert ManifestCache().directory == '/nonexistent/libcsm/manifests'
+
+    def test_get_put(self, tmp_path) -> None:
+        """
+        Assert manifests are keyed by bucket, image ID, and ETag.
+        """
+        cache = ManifestCache(str(tmp_path / 'manifests'))
+        assert cache.get('bucket', 'image', 'etag') is None
+        cache.put('bucket', 'image', 'etag', MANIFEST)
+        assert cache.get('bucket', 'image', 'etag') == MANIFEST
+        assert cache.get('bucket', 'image', 'other-etag') is None
+        assert cache.get('other-bucket', 'image', 'etag') is None
+
+    def test_lru_eviction(self, tmp_path) -> None:
+        """
+        Assert the least recently used manifests are evicted to stay under ``max_bytes``.
+        """
+        data = b'x' * 10
+        cache = ManifestCache(str(tmp_path), max_bytes=len(data) * 2)
+        cache.put('bucket', 'first', 'etag', data)
+        cache.put('bucket', 'second', 'etag', data)
+        os.utime(cache._path('bucket', 'second', 'etag'), (0, 0))
+        cache.get('bucket', 'first', 'etag')
+        cache.put('bucket', 'third', 'etag', data)
+        assert cache.get('bucket', 'first', 'etag') == data
+        assert cache.get('bucket', 'second', 'etag') is None
+        assert cache.get('bucket', 'third', 'etag') == data
+
+    def test_put_too_large(self, tmp_path) -> None:
+        """
+        Assert a manifest larger than the whole cache is not stored.
+        """
+        cache = ManifestCache(str(tmp_path), max_bytes=1)
+        cache.put('bucket', 'image', 'etag', MANIFEST)
+        assert cache.get('bucket', 'image', 'etag') is None
+
+
+@mock.patch('libcsm.s3.s3object.S3Object.verify_bucket_exists')
+@mock.patch.object(s3object.S3Object, 'head_object', return_value={'ETag': '"abc"'})
+class TestCachedManifest:
+    """
+    Tests for ``get_s3_image_manifest`` with a ``ManifestCache``.
+    """
+
+    def test_miss_then_hit(self, mock_head_object, _, tmp_path) -> None:
+        """
+        Assert the manifest is downloaded once and then served from the cache.
+        """
+        cache = ManifestCache(str(tmp_path))
+        reads = 2
+        with mock.patch.object(s3object.S3Object, 'get_object') as mock_get_object:
+            mock_get_object.side_effect = lambda *_: {'Body': io.BytesIO(MANIFEST), 'ETag': '"abc"'}
+            infos = [images.get_s3_image_info('bucket', 'image', 'endpoint', cache)
+                     for _ in range(reads)]
+        assert all(info == infos[0] for info in infos)
+        assert infos[0]['kernel'] == 'kernel_path'
+        mock_get_object.assert_called_once()
+        assert mock_head_object.call_count == reads
+
+    def test_changed_etag(self, mock_head_object, _, tmp_path) -> None:
+        """
+        Assert the manifest is downloaded again once its ETag changes.
+        """
+        cache = ManifestCache(str(tmp_path))
+        cache.put('bucket', 'image', '"abc"', MANIFEST)
+        mock_head_object.return_value = {'ETag': '"def"'}
+        with mock.patch.object(s3object.S3Object, 'get_object') as mock_get_object:
+            mock_get_object.return_value = {'Body': io.BytesIO(MANIFEST), 'ETag': '"def"'}
+            images.get_s3_image_manifest('bucket', 'image', 'endpoint', cache)
+        mock_get_object.assert_called_once()
+        assert cache.get('bucket', 'image', '"def"') == MANIFEST
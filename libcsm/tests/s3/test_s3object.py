@@ -27,16 +27,26 @@ Testing s3object functions.
 """
 import pytest
 import mock
+from botocore.exceptions import ClientError
 
 from libcsm.s3 import s3object
 from libcsm.s3.s3object import RGWAdminException
 
+# radosgw-admin calls to look up an object: bucket stats, object stat, user info.
+RGW_LOOKUPS = 3
+
 
 class TestS3Object:
     """
     Tests for the s3object submodule.
     """
 
+    def setup_method(self) -> None:
+        """
+        Start every test without cached ``radosgw-admin`` lookups.
+        """
+        s3object.RGW_CACHE.clear()
+
     @mock.patch('libcsm.s3.s3object.S3Object.verify_bucket_exists')
     def test_object(self, *_) -> None:
         """
@@ -120,3 +130,84 @@ class TestS3Object:
         mock_run_command.return_value.return_code = 3
         with pytest.raises(RGWAdminException):
             obj.get_creds()
+
+    @mock.patch('libcsm.s3.s3object.S3Object.verify_bucket_exists')
+    @mock.patch('boto3.session.Session')
+    def test_get_object_reuses_client(self, mock_session, *_) -> None:
+        """
+        Verify S3 objects with the same endpoint and credentials share one client.
+        """
+        s3object.clear_clients()
+        mock_client = mock_session.return_value.client.return_value
+        mock_client.get_object.return_value = {'Body': None}
+        for object_name in ['a_object', 'b_object']:
+            obj = s3object.S3Object("a_bucket", object_name)
+            obj._a_key = "test_access"
+            obj._s_key = "test_secret"
+            assert obj.get_object("http://rgw") == {'Body': None}
+        mock_session.return_value.client.assert_called_once()
+        mock_client.get_object.assert_called_with(Bucket="a_bucket", Key="b_object")
+
+        others = [("http://rgw", "test_access", "new_secret"),
+                  ("http://other", "test_access", "test_secret")]
+        for endpoint_url, access_key, secret_key in others:
+            s3object.get_client(endpoint_url, access_key, secret_key)
+        assert mock_session.return_value.client.call_count == 1 + len(others)
+        s3object.clear_clients()
+
+    @mock.patch('libcsm.s3.s3object.run_command', autospec=True)
+    def test_rgw_lookups_are_cached(self, mock_run_command) -> None:
+        """
+        Verify objects in the same bucket share cached bucket, owner, and key lookups.
+        """
+        def run_command(args) -> mock.Mock:
+            result = mock.Mock(return_code=0)
+            if args[1] == 'object':
+                result.stdout = '{"policy": {"owner": {"id": "owner_id"}}}'
+            else:
+                result.stdout = '{"keys":[{"access_key":"test_access", "secret_key":"test_secret"}]}'
+            return result
+
+        mock_run_command.side_effect = run_command
+        for _ in range(10):
+            obj = s3object.S3Object("a_bucket", "b_object")
+            obj.get_creds()
+            assert obj.owner == "owner_id"
+            assert obj._a_key == "test_access"
+        assert mock_run_command.call_count == RGW_LOOKUPS
+
+        s3object.RGW_CACHE.ttl = 0
+        try:
+            s3object.S3Object("a_bucket", "b_object")
+            # Only the bucket check runs again, the owner and keys are read lazily.
+            assert mock_run_command.call_count == RGW_LOOKUPS + 1
+        finally:
+            s3object.RGW_CACHE.ttl = s3object.RGW_CACHE_TTL
+
+    @mock.patch('libcsm.s3.s3object.run_command', autospec=True)
+    def test_bucket_check_uses_stats(self, mock_run_command) -> None:
+        """
+        Verify the default bucket check reads the bucket's stats instead of listing it.
+        """
+        mock_run_command.return_value.return_code = 0
+        s3object.S3Object("a_bucket", "b_object")
+        mock_run_command.assert_called_once_with(
+            ['radosgw-admin', 'bucket', 'stats', '--bucket', 'a_bucket']
+        )
+        with pytest.raises(ValueError):
+            s3object.S3Object("a_bucket", "b_object", bucket_check='bad')
+
+    @mock.patch('libcsm.s3.s3object.S3Object.client')
+    def test_bucket_check_head(self, mock_client) -> None:
+        """
+        Verify the ``head`` bucket check uses an S3 HeadBucket request.
+        """
+        s3object.S3Object("a_bucket", "b_object", bucket_check='head')
+        mock_client.return_value.head_bucket.assert_called_once_with(Bucket="a_bucket")
+
+        s3object.RGW_CACHE.clear()
+        mock_client.return_value.head_bucket.side_effect = ClientError(
+            {'Error': {'Code': '404'}}, 'HeadBucket'
+        )
+        with pytest.raises(RGWAdminException):
+            s3object.S3Object("a_bucket", "b_object", bucket_check='head')
@@ -0,0 +1,117 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Tests for verifying image artifacts in S3.
+"""
+import io
+
+import mock
+import pytest
+from botocore.exceptions import ClientError
+
+from libcsm.s3 import s3object, verify
+from libcsm.s3.images import Artifact
+from libcsm.s3.images import ImageFormatException
+from libcsm.s3.images import parse_manifest
+
+MD5 = 'd41d8cd98f00b204e9800998ecf8427e'
+
+
+class TestCheckArtifact:
+    """
+    Tests for comparing an artifact with its ``HeadObject`` response.
+    """
+
+    def test_match(self) -> None:
+        """
+        Assert a matching size and single-part ETag pass.
+        """
+        artifact = Artifact('rootfs', 's3://b/k', md5=MD5, size=10)
+        assert not verify.check_artifact(artifact, {'ContentLength': 10, 'ETag': f'"{MD5}"'})
+
+    def test_mismatch(self) -> None:
+        """
+        Assert size and checksum mismatches are reported.
+        """
+        artifact = Artifact('rootfs', 's3://b/k', md5=MD5, size=10)
+        errors = verify.check_artifact(artifact, {'ContentLength': 9, 'ETag': '"0123"'})
+        assert [error.split()[0] for error in errors] == ['size', 'MD5']
+
+    def test_multipart_etag(self) -> None:
+        """
+        Assert a multipart ETag is compared with the manifest's ETag, not its MD5.
+        """
+        artifact = Artifact('rootfs', 's3://b/k', etag='abc-2', md5=MD5)
+        assert not verify.check_artifact(artifact, {'ETag': '"abc-2"'})
+        assert verify.check_artifact(artifact, {'ETag': '"abc-3"'})
+
+
+class TestParseS3Path:
+    """
+    Tests for ``parse_s3_path``.
+    """
+
+    def test_parse(self) -> None:
+        """
+        Assert the bucket and key are split from the path.
+        """
+        assert verify.parse_s3_path('s3://boot-images/id/rootfs') == ('boot-images', 'id/rootfs')
+
+    def test_bad_path(self) -> None:
+        """
+        Assert paths that are not s3 URLs are rejected.
+        """
+        with pytest.raises(ImageFormatException):
+            verify.parse_s3_path('/boot-images/id/rootfs')
+
+
+@mock.patch('libcsm.s3.s3object.S3Object.verify_bucket_exists')
+class TestVerifyArtifacts:
+    """
+    Tests for ``verify_artifacts``.
+    """
+
+    manifest = parse_manifest(io.BytesIO(b'''{"artifacts": [
+        {"type": "application/vnd.cray.image.initrd", "link": {"path": "s3://b/id/initrd"}},
+        {"type": "application/vnd.cray.image.kernel", "link": {"path": "s3://b/id/kernel"}},
+        {"type": "application/vnd.cray.image.rootfs.squashfs", "link": {"path": "s3://b/id/rootfs"},
+         "md5": "d41d8cd98f00b204e9800998ecf8427e"}
+    ]}'''))
+
+    def test_verify_artifacts(self, *_) -> None:
+        """
+        Assert every image type is checked and failures are recorded per artifact.
+        """
+        def head_object(s3_object, _) -> dict:
+            if s3_object.object_name == 'id/kernel':
+                raise ClientError({'Error': {'Code': '404'}}, 'HeadObject')
+            return {'ETag': f'"{MD5}"'}
+
+        with mock.patch.object(s3object.S3Object, 'head_object', autospec=True,
+                               side_effect=head_object) as mock_head_object:
+            checks = verify.verify_artifacts(self.manifest, 'endpoint')
+        assert mock_head_object.call_count == len(checks)
+        assert [check.image_type for check in checks] == ['initrd', 'kernel', 'rootfs']
+        assert [check.ok for check in checks] == [True, False, True]
+        assert all(check.duration >= 0 for check in checks)
@@ -0,0 +1,62 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Tests for the ``asyncio`` SLS client.
+"""
+import asyncio
+import json
+
+import mock
+import pytest
+import requests
+
+from libcsm.requests.aio import AsyncResponse
+from libcsm.requests.retry import RETRY_POLICY
+from libcsm.sls import aio
+from libcsm.tests.mock_objects.mock_sls import MockSLSResponse
+
+
+class TestAsyncAPI:
+    """
+    Tests for the ``AsyncAPI`` class.
+    """
+
+    def test_get_management_components(self) -> None:
+        """
+        Assert the management components are decoded from the response.
+        """
+        sls_api = aio.AsyncAPI(auth=mock.Mock(current_token='token', expiring=False))
+        response = AsyncResponse(200, {}, json.dumps(MockSLSResponse.mock_components).encode())
+        with mock.patch.object(sls_api, '_send', return_value=response):
+            assert asyncio.run(sls_api.get_management_components()) == MockSLSResponse.mock_components
+
+    @mock.patch.object(RETRY_POLICY, 'max_attempts', 1)
+    def test_bad_response(self) -> None:
+        """
+        Assert a failed response raises ``requests.exceptions.RequestException``.
+        """
+        sls_api = aio.AsyncAPI(auth=mock.Mock(current_token='token', expiring=False))
+        with mock.patch.object(sls_api, '_send', return_value=AsyncResponse(503, {}, b'')):
+            with pytest.raises(requests.exceptions.RequestException):
+                asyncio.run(sls_api.get_management_components())
@@ -25,12 +25,14 @@
 Tests for the SLS API submodule.
 """
 
+import http
 import pytest
 import mock
 import requests
 from requests import Session
 from libcsm import api
 from libcsm.sls import api as slsApi
+from libcsm.tests.mock_objects.mock_http import MockHTTPResponse
 from libcsm.tests.mock_objects.mock_sls import MockSLSResponse
 
 
@@ -50,6 +52,7 @@ class TestSLSApi:
         """
         with mock.patch.object(api.Auth, 'refresh_token', return_value=None):
             self.sls_api = slsApi.API()
+            self.sls_api._get_auth()
 
     def test_get_management_components_from_sls(self, *_) -> None:
         """
@@ -63,12 +66,26 @@ class TestSLSApi:
     def test_get_management_components_from_sls_error(self, *_) -> None:
         """
         Tests unsuccessful run of the SLS get_management_components_from_sls
-        function because of bad response.
+        function because of bad response, closing the response.
         """
-        with mock.patch.object(Session, 'get', \
-            return_value=self.mock_setup.unauth_mock_http_response):
+        unauthorized = MockHTTPResponse(None, http.HTTPStatus.UNAUTHORIZED)
+        with mock.patch.object(Session, 'get', return_value=unauthorized):
             with pytest.raises(requests.exceptions.RequestException):
                 self.sls_api.get_management_components_from_sls()
+        assert unauthorized.closed
+
+    def test_iter_management_components(self, *_) -> None:
+        """
+        Tests management components are streamed with only the projected fields.
+        """
+        with mock.patch.object(Session, 'get', \
+            return_value=self.mock_setup.mock_http_response):
+            components = list(self.sls_api.iter_management_components())
+        assert components[0] == {
+            'Xname': 'xname1',
+            'ExtraProperties': {'Aliases': ['ncn-w001'], 'Role': 'Management', 'SubRole': 'Worker'},
+        }
+        assert len(components) == len(self.mock_setup.mock_components)
 
     def test_get_xname(self, *_) -> None:
         """
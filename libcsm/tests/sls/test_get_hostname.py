@@ -25,8 +25,12 @@
 Tests for the sls get_hostname function.
 """
 
+import os
+import tempfile
+
 import mock
 from click.testing import CliRunner
+from libcsm.sls import batch
 from libcsm.sls import get_hostname
 from libcsm.tests.mock_objects.mock_sls import MockSLSResponse
 
@@ -60,3 +64,52 @@ class TestGetHostname:
         cli_runner = CliRunner()
         result = cli_runner.invoke(get_hostname.main, ["--xname", "bad-xname"])
         assert result.exit_code == 1
+
+    @mock.patch('libcsm.sls.api.API.get_management_components_from_sls', spec=True)
+    def test_batch_from_file(self, mock_management_components, *_) -> None:
+        """
+        Tests resolving xnames from a file as TSV with one SLS request.
+        """
+        mock_management_components.return_value = self.mock_setup.mock_http_response
+        with tempfile.TemporaryDirectory() as directory:
+            name_file = os.path.join(directory, 'xnames')
+            with open(name_file, 'w', encoding='utf-8') as handle:
+                handle.write('xname1\nxname2\n')
+            cli_runner = CliRunner()
+            result = cli_runner.invoke(get_hostname.main, ["--file", name_file, "--format", "tsv"])
+        assert result.exit_code == 0
+        assert result.output == "xname1\tncn-w001\nxname2\tncn-s002\n"
+        mock_management_components.assert_called_once()
+
+    @mock.patch('libcsm.sls.api.API.get_management_components_from_sls', spec=True)
+    def test_batch_tsv_error(self, mock_management_components, *_) -> None:
+        """
+        Tests a failed lookup prints its error next to the xname as TSV.
+        """
+        mock_management_components.return_value = self.mock_setup.mock_http_response
+        cli_runner = CliRunner()
+        result = cli_runner.invoke(get_hostname.main, ["--xname", "bad-xname", "--xname", "xname1", \
+            "--format", "tsv"])
+        assert result.exit_code == 1
+        assert result.output == "bad-xname\tERROR xname:bad-xname was not found in management nodes.\n" \
+            "xname1\tncn-w001\n"
+
+    @mock.patch('libcsm.sls.batch.resolve')
+    @mock.patch('libcsm.sls.batch.get_api')
+    def test_snapshot_options(self, mock_get_api, *_) -> None:
+        """
+        Tests the snapshot options are passed on together.
+        """
+        cli_runner = CliRunner()
+        result = cli_runner.invoke(get_hostname.main, ["--xname", "xname1", "--offline"])
+        assert result.exit_code == 0
+        mock_get_api.assert_called_once_with('api-gw-service-nmn.local', \
+            batch.SnapshotOptions(max_age=None, offline=True))
+
+    def test_no_names(self, *_) -> None:
+        """
+        Tests that at least one xname is required.
+        """
+        cli_runner = CliRunner()
+        result = cli_runner.invoke(get_hostname.main, [])
+        assert result.exit_code != 0
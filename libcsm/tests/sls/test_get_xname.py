@@ -25,6 +25,8 @@
 Tests for the sls get_xnames function.
 """
 
+import json
+
 import mock
 from click.testing import CliRunner
 from libcsm.sls import get_xname
@@ -59,3 +61,20 @@ class TestGetXname:
         cli_runner = CliRunner()
         result = cli_runner.invoke(get_xname.main, ["--hostname", "bad-hostname"])
         assert result.exit_code == 1
+
+    def test_batch_from_stdin(self, mock_management_components, *_) -> None:
+        """
+        Tests resolving many hostnames from arguments and stdin with one SLS
+        request, printing JSON lines and failing for unknown hostnames.
+        """
+        mock_management_components.return_value = self.mock_setup.mock_http_response
+        cli_runner = CliRunner()
+        result = cli_runner.invoke(get_xname.main, ["--hostname", "ncn-w001", "--file", "-", \
+            "--format", "json"], input='ncn-s002\n\nbad-hostname\n')
+        assert result.exit_code == 1
+        lines = [json.loads(line) for line in result.output.splitlines()]
+        assert lines[0] == {'hostname': 'ncn-w001', 'xname': 'xname1'}
+        assert lines[1] == {'hostname': 'ncn-s002', 'xname': 'xname2'}
+        assert lines[2]['hostname'] == 'bad-hostname'
+        assert 'error' in lines[2]
+        mock_management_components.assert_called_once()
@@ -0,0 +1,127 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Tests for the SLS inventory submodule.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+import pytest
+import mock
+from libcsm.sls.inventory import Inventory
+from libcsm.tests.mock_objects.mock_sls import MockSLSResponse
+
+
+class TestInventory:
+    """
+    Testing the SLS inventory submodule.
+    """
+
+    mock_setup = MockSLSResponse
+
+    def _sls_api(self, response=None) -> mock.Mock:
+        """
+        Create a mocked SLS API returning ``response``.
+        """
+        sls_api = mock.Mock()
+        sls_api.get_management_components.return_value = \
+            (response or self.mock_setup.mock_http_response).json()
+        return sls_api
+
+    def test_lookups_share_one_fetch(self) -> None:
+        """
+        Tests that many lookups are served from a single SLS fetch.
+        """
+        sls_api = self._sls_api()
+        inventory = Inventory(sls_api)
+        assert inventory.get_xname('ncn-w001') == 'xname1'
+        assert inventory.get_hostname('xname2') == 'ncn-s002'
+        assert inventory.get_xnames(['ncn-w001', 'ncn-s002', 'ncn-BAD']) == {
+            'ncn-w001': 'xname1', 'ncn-s002': 'xname2'
+        }
+        assert inventory.get_hostnames(['xname1', 'badXname']) == {'xname1': 'ncn-w001'}
+        assert inventory.get_aliases('xname1') == ['ncn-w001']
+        sls_api.get_management_components.assert_called_once()
+
+    def test_concurrent_lookups_share_one_fetch(self) -> None:
+        """
+        Tests that threads finding the indexes stale at once wait for a single fetch.
+        """
+        sls_api = self._sls_api()
+        components = sls_api.get_management_components.return_value
+
+        def slow_fetch() -> list:
+            time.sleep(0.05)
+            return components
+
+        sls_api.get_management_components.side_effect = slow_fetch
+        inventory = Inventory(sls_api)
+        lookups = 4
+        hostnames = ['ncn-w001', 'ncn-s002'] * lookups
+        with ThreadPoolExecutor(max_workers=len(hostnames)) as executor:
+            xnames = list(executor.map(inventory.get_xname, hostnames))
+        assert xnames == ['xname1', 'xname2'] * lookups
+        sls_api.get_management_components.assert_called_once()
+
+    def test_by_role(self) -> None:
+        """
+        Tests role and role/subrole lookups.
+        """
+        inventory = Inventory(self._sls_api())
+        assert inventory.get_by_role('Management') == ['xname1', 'xname2']
+        assert inventory.get_by_role('Management', 'Storage') == ['xname2']
+        assert not inventory.get_by_role('Compute')
+
+    def test_ttl_and_invalidate(self) -> None:
+        """
+        Tests that expired or invalidated indexes are fetched again.
+        """
+        sls_api = self._sls_api()
+        inventory = Inventory(sls_api, ttl=0)
+        lookups = 2
+        for _ in range(lookups):
+            inventory.get_xname('ncn-w001')
+        assert sls_api.get_management_components.call_count == lookups
+
+        sls_api.reset_mock()
+        inventory.ttl = 60
+        inventory.get_xname('ncn-w001')
+        sls_api.get_management_components.assert_not_called()
+        inventory.invalidate()
+        inventory.get_xname('ncn-w001')
+        sls_api.get_management_components.assert_called_once()
+
+    def test_errors(self) -> None:
+        """
+        Tests unknown names raise ``ValueError`` and bad responses ``KeyError``.
+        """
+        inventory = Inventory(self._sls_api())
+        with pytest.raises(ValueError):
+            inventory.get_xname('ncn-BAD')
+        with pytest.raises(ValueError):
+            inventory.get_hostname('badXname')
+        inventory = Inventory(self._sls_api(self.mock_setup.bad_mock_http_response))
+        with pytest.raises(KeyError):
+            inventory.get_xname('ncn-w001')
@@ -0,0 +1,143 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Tests for the SLS snapshot submodule.
+"""
+import http
+import json
+import os
+import tempfile
+
+import pytest
+import mock
+import requests
+from requests import Session
+from libcsm.sls import api as slsApi
+from libcsm.sls import snapshot
+from libcsm.tests.mock_objects.mock_http import MockHTTPResponse
+from libcsm.tests.mock_objects.mock_sls import MockSLSResponse
+
+
+@mock.patch('libcsm.api.Auth', spec=True)
+class TestSnapshot:
+    """
+    Testing the SLS snapshot submodule.
+    """
+
+    mock_setup = MockSLSResponse
+    directory = None
+
+    def setup_method(self) -> None:
+        """
+        Create a directory for snapshots.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+
+    def teardown_method(self) -> None:
+        """
+        Remove the snapshot directory.
+        """
+        self.directory.cleanup()
+
+    def _snapshot(self, **kwargs) -> snapshot.Snapshot:
+        """
+        Create a snapshot in the test directory.
+        """
+        return snapshot.Snapshot(os.path.join(self.directory.name, 'sls.json'), **kwargs)
+
+    def test_default_path(self, *_) -> None:
+        """
+        Tests the default path is under ``XDG_CACHE_HOME``.
+        """
+        with mock.patch.dict(os.environ, {'XDG_CACHE_HOME': '/cache'}):
+            assert snapshot.default_path('api-gw/x') == '/cache/libcsm/sls-api-gw_x.json'
+
+    def test_fresh_snapshot_is_served(self, *_) -> None:
+        """
+        Tests a fresh snapshot is fetched once and then served from disk.
+        """
+        response = MockHTTPResponse(self.mock_setup.mock_components, http.HTTPStatus.OK,
+                                    headers={'ETag': '"v1"'})
+        with mock.patch.object(Session, 'get', return_value=response) as mock_get:
+            sls_api = slsApi.API(snapshot=self._snapshot())
+            assert sls_api.get_management_components() == self.mock_setup.mock_components
+            sls_api = slsApi.API(snapshot=self._snapshot())
+            assert sls_api.get_xname('ncn-s002') == 'xname2'
+            mock_get.assert_called_once()
+
+    def test_stale_snapshot_is_revalidated(self, *_) -> None:
+        """
+        Tests a stale snapshot is revalidated with its ETag and reused on a 304,
+        closing the 304 response.
+        """
+        cached = self._snapshot()
+        cached.save(self.mock_setup.mock_components, etag='"v1"')
+        not_modified = MockHTTPResponse(None, http.HTTPStatus.NOT_MODIFIED, headers={'ETag': '"v1"'})
+        with mock.patch.object(Session, 'get', return_value=not_modified) as mock_get:
+            sls_api = slsApi.API(snapshot=self._snapshot(max_age=0))
+            assert sls_api.get_management_components() == self.mock_setup.mock_components
+            assert mock_get.call_args.kwargs['headers']['If-None-Match'] == '"v1"'
+        assert not_modified.closed
+        with open(cached.path, encoding='utf-8') as handle:
+            assert json.load(handle)['etag'] == '"v1"'
+
+    def test_not_modified_keeps_validators(self, *_) -> None:
+        """
+        Tests a 304 without validators keeps the snapshot's, so the next
+        revalidation is still conditional.
+        """
+        cached = self._snapshot()
+        cached.save(self.mock_setup.mock_components, etag='"v1"', last_modified='Mon, 01 Jan 2024')
+        not_modified = MockHTTPResponse(None, http.HTTPStatus.NOT_MODIFIED, headers={})
+        with mock.patch.object(Session, 'get', return_value=not_modified):
+            sls_api = slsApi.API(snapshot=self._snapshot(max_age=0))
+            assert sls_api.get_management_components() == self.mock_setup.mock_components
+        with open(cached.path, encoding='utf-8') as handle:
+            saved = json.load(handle)
+        assert saved['etag'] == '"v1"'
+        assert saved['last_modified'] == 'Mon, 01 Jan 2024'
+
+    def test_fresh_snapshot_skips_auth(self, mock_auth) -> None:
+        """
+        Tests serving a fresh snapshot does not fetch a token.
+        """
+        self._snapshot().save(self.mock_setup.mock_components)
+        sls_api = slsApi.API(snapshot=self._snapshot())
+        assert sls_api.get_xname('ncn-s002') == 'xname2'
+        mock_auth.assert_not_called()
+
+    def test_offline(self, mock_auth) -> None:
+        """
+        Tests offline mode serves a stale snapshot without authenticating and
+        fails without one.
+        """
+        with mock.patch.object(Session, 'get') as mock_get:
+            sls_api = slsApi.API(snapshot=self._snapshot(offline=True))
+            with pytest.raises(requests.exceptions.RequestException):
+                sls_api.get_management_components()
+            self._snapshot().save(self.mock_setup.mock_components)
+            sls_api = slsApi.API(snapshot=self._snapshot(max_age=0, offline=True))
+            assert sls_api.get_hostname('xname1') == 'ncn-w001'
+            mock_get.assert_not_called()
+        mock_auth.assert_not_called()
@@ -28,6 +28,11 @@ from urllib import request
 
 import base64
 import io
+import os
+import stat
+import tempfile
+import threading
+import time
 from dataclasses import dataclass
 import pytest
 from kubernetes import client
@@ -73,7 +78,7 @@ class TestApi:
         Verify that refreshing a secret results in setting the token correctly.
         """
         expected = 123
-        auth = api.Auth()
+        auth = api.Auth(cache=api.TokenCache())
         auth.core.read_namespaced_secret.return_value = MockV1Secret
         mock_response = io.StringIO(f'{{"access_token": {expected}}}')
         with mock.patch.object(request, 'urlopen', return_value=mock_response):
@@ -84,7 +89,7 @@ class TestApi:
         """
         Verify our expected errors cause our custom error to be raised.
         """
-        auth = api.Auth()
+        auth = api.Auth(cache=api.TokenCache())
         auth.core.read_namespaced_secret.side_effect = \
             client.exceptions.ApiException
         with pytest.raises(api.AuthException):
@@ -94,3 +99,201 @@ class TestApi:
         )
         with pytest.raises(api.AuthException):
             auth.refresh_token()
+
+    def test_token_cache_shared(self, *_) -> None:
+        """
+        Verify that ``Auth`` objects sharing a cache only request a token once
+        while it is fresh, and that a forced refresh requests a new one.
+        """
+        cache = api.TokenCache()
+        bodies = ['{"access_token": "a", "expires_in": 300}',
+                  '{"access_token": "b", "expires_in": 300}']
+        responses = iter(bodies)
+        with mock.patch.object(request, 'urlopen',
+                               side_effect=lambda *_: io.StringIO(next(responses))) as urlopen:
+            first = api.Auth(cache=cache)
+            first.core.read_namespaced_secret.return_value = MockV1Secret
+            first.refresh_token()
+            second = api.Auth(cache=cache)
+            second.core.read_namespaced_secret.return_value = MockV1Secret
+            second.refresh_token()
+            assert first.token == second.token == 'a'
+            assert urlopen.call_count == 1
+            second.refresh_token(force=True)
+            assert second.token == 'b'
+            assert urlopen.call_count == len(bodies)
+
+    def test_credentials_cached(self, *_) -> None:
+        """
+        Verify that the secret is read once per cache, and that a fresh cached
+        token is used without reading it again.
+        """
+        cache = api.TokenCache()
+        mock_response = io.StringIO('{"access_token": "a", "expires_in": 300}')
+        with mock.patch.object(request, 'urlopen', return_value=mock_response) as urlopen:
+            first = api.Auth(cache=cache)
+            first.core.read_namespaced_secret.return_value = MockV1Secret
+            first.refresh_token()
+            second = api.Auth(cache=cache)
+            second.core.read_namespaced_secret.reset_mock()
+            second.refresh_token()
+            first.refresh_token()
+            assert second.token == first.token == 'a'
+            second.core.read_namespaced_secret.assert_not_called()
+            urlopen.assert_called_once()
+
+    def test_token_kept_during_refresh(self, *_) -> None:
+        """
+        Verify that threads sharing an ``Auth`` keep reading the old token
+        while it is being refreshed.
+        """
+        fetching = threading.Event()
+        finish = threading.Event()
+        responses = iter(['{"access_token": "a", "expires_in": 300}',
+                          '{"access_token": "b", "expires_in": 300}'])
+
+        def urlopen(*_) -> io.StringIO:
+            body = next(responses)
+            if body.startswith('{"access_token": "b"'):
+                fetching.set()
+                finish.wait(5)
+            return io.StringIO(body)
+
+        with mock.patch.object(request, 'urlopen', side_effect=urlopen):
+            auth = api.Auth(cache=api.TokenCache())
+            auth.core.read_namespaced_secret.return_value = MockV1Secret
+            auth.refresh_token()
+            refresh = threading.Thread(target=auth.refresh_token, kwargs={'force': True})
+            refresh.start()
+            fetching.wait(5)
+            assert auth.token == 'a'
+            finish.set()
+            refresh.join()
+            assert auth.token == 'b'
+
+    def test_forced_refresh_single_flight(self, *_) -> None:
+        """
+        Verify concurrent forced refreshes after the same rejection share one
+        fetch, however late each one starts.
+        """
+        cache = api.TokenCache()
+        bodies = iter([f'{{"access_token": "{token}", "expires_in": 300}}' for token in 'abc'])
+
+        def urlopen(*_) -> io.StringIO:
+            time.sleep(0.05)
+            return io.StringIO(next(bodies))
+
+        with mock.patch.object(request, 'urlopen', side_effect=urlopen):
+            auth = api.Auth(cache=cache)
+            auth.core.read_namespaced_secret.return_value = MockV1Secret
+            auth.refresh_token()
+            threads = [
+                threading.Thread(target=auth.refresh_token,
+                                 kwargs={'force': True, 'rejected': 'a'})
+                for _ in range(16)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            late = api.Auth(cache=cache)
+            late.refresh_token(force=True, rejected='a')
+            assert auth.token == late.token == 'b'
+            # Only the first token and one refresh shared by every thread were fetched.
+            assert '"c"' in next(bodies)
+            auth.core.read_namespaced_secret.assert_called_once()
+
+    def test_token_cache_expiry(self, *_) -> None:
+        """
+        Verify that a token inside the refresh margin is refreshed when read.
+        """
+        cache = api.TokenCache(refresh_margin=30)
+        responses = iter(['{"access_token": "a", "expires_in": 10}',
+                          '{"access_token": "b", "expires_in": 300}'])
+        with mock.patch.object(request, 'urlopen',
+                               side_effect=lambda *_: io.StringIO(next(responses))):
+            auth = api.Auth(cache=cache)
+            auth.core.read_namespaced_secret.return_value = MockV1Secret
+            auth.refresh_token()
+            assert auth.token == 'b'
+
+    def test_token_cache_single_flight(self, *_) -> None:
+        """
+        Verify concurrent fetches for the same key share one request.
+        """
+        cache = api.TokenCache()
+        calls = []
+
+        def fetch() -> tuple:
+            calls.append(1)
+            time.sleep(0.05)
+            return 'token', 300
+
+        threads = [
+            threading.Thread(target=cache.fetch, args=(('url', b'id'), fetch))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1
+        assert cache.get(('url', b'id')).token == 'token'
+        cache.invalidate(('url', b'id'))
+        assert cache.get(('url', b'id')) is None
+
+    def test_token_file(self, *_) -> None:
+        """
+        Verify a token persisted to a token file is reused by a new process
+        (simulated with a fresh cache) without requesting a new token.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            token_file = os.path.join(directory, 'libcsm', 'token.json')
+            mock_response = io.StringIO('{"access_token": "a", "expires_in": 300}')
+            with mock.patch.object(request, 'urlopen', return_value=mock_response):
+                auth = api.Auth(cache=api.TokenCache(), token_file=token_file)
+                auth.core.read_namespaced_secret.return_value = MockV1Secret
+                auth.refresh_token()
+            assert stat.S_IMODE(os.stat(token_file).st_mode) == stat.S_IRUSR | stat.S_IWUSR
+
+            with mock.patch.object(request, 'urlopen') as urlopen:
+                auth = api.Auth(cache=api.TokenCache(), token_file=token_file)
+                auth.refresh_token()
+                assert auth.token == 'a'
+                urlopen.assert_not_called()
+
+    def test_token_file_other_client(self, *_) -> None:
+        """
+        Verify a token file written for another endpoint or client is ignored.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            token_file = os.path.join(directory, 'token.json')
+            for endpoint, client_id in (('https://other.example.com', 'foo-client'),
+                                        ('https://example.com', 'other-client')):
+                with open(token_file, 'w', encoding='utf-8') as handle:
+                    handle.write(f'{{"endpoint": "{endpoint}", "client_id": "{client_id}", '
+                                 f'"access_token": "other", "expires_at": {time.time() + 300}}}')
+                os.chmod(token_file, 0o600)
+                mock_response = io.StringIO('{"access_token": "a", "expires_in": 300}')
+                with mock.patch.object(request, 'urlopen', return_value=mock_response):
+                    auth = api.Auth(cache=api.TokenCache(), token_file=token_file)
+                    auth.core.read_namespaced_secret.return_value = MockV1Secret
+                    auth.refresh_token()
+                    assert auth.token == 'a'
+
+    def test_token_file_permissions(self, *_) -> None:
+        """
+        Verify a token file readable by other users is ignored.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            token_file = os.path.join(directory, 'token.json')
+            with open(token_file, 'w', encoding='utf-8') as handle:
+                handle.write(f'{{"endpoint": "https://example.com", "client_id": "foo-client", '
+                             f'"access_token": "leaked", "expires_at": {time.time() + 300}}}')
+            os.chmod(token_file, 0o644)
+            mock_response = io.StringIO('{"access_token": "a", "expires_in": 300}')
+            with mock.patch.object(request, 'urlopen', return_value=mock_response):
+                auth = api.Auth(cache=api.TokenCache(), token_file=token_file)
+                auth.core.read_namespaced_secret.return_value = MockV1Secret
+                auth.refresh_token()
+                assert auth.token == 'a'
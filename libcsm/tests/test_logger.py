@@ -0,0 +1,219 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Tests for the ``logger`` module.
+"""
+import gzip
+import logging
+import os
+import threading
+import time
+
+import mock
+
+from libcsm import logger
+from libcsm.logger import Logger
+from libcsm.logger import flush_logs
+
+
+class BlockingHandler(logging.Handler):
+    """
+    A handler that waits for an event before writing each record.
+    """
+
+    def __init__(self) -> None:
+        """
+        Create the handler and its event.
+        """
+        super().__init__()
+        self.gate = threading.Event()
+        self.records = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """
+        Wait for ``gate``, then keep the record.
+        """
+        self.gate.wait(5)
+        self.records.append(record.getMessage())
+
+
+class TestLogger:
+    """
+    Tests for the ``Logger`` class and its shared queue handler.
+    """
+
+    def teardown_method(self) -> None:
+        """
+        Stop any listener started by a test.
+        """
+        logger._HANDLER.close()
+
+    def test_logger(self, tmp_path) -> None:
+        """
+        Assert that every ``Logger`` shares one handler, and that records are
+        written to the log file once flushed.
+        """
+        log_path = str(tmp_path / 'libcsm.log')
+        with mock.patch('libcsm.logger.LOG_PATH', log_path):
+            logger._HANDLER.close()
+            first = Logger('first')
+            second = Logger('second')
+            assert first.handlers == second.handlers == [logger._HANDLER]
+            first.info('hello %s', 'world')
+            second.error('goodbye')
+            flush_logs()
+        with open(log_path, encoding='utf-8') as log_file:
+            first_line, second_line = log_file.read().splitlines()
+        assert first_line.endswith('| hello world')
+        assert 'ERROR' in second_line
+        assert second_line.endswith('| goodbye')
+
+    def test_logger_drop(self) -> None:
+        """
+        Assert that records are dropped, not waited on, when the queue is full,
+        and that closing writes the records already queued.
+        """
+        handler = BlockingHandler()
+        log = Logger('drop')
+        with mock.patch('libcsm.logger._file_handler', return_value=handler), \
+                mock.patch('libcsm.logger.LOG_QUEUE_SIZE', 1):
+            logger._HANDLER.close()
+            logger._HANDLER.dropped = 0
+            log.info('written')
+            while not logger._HANDLER.queue.empty():
+                threading.Event().wait(0.01)
+            log.info('queued')
+            log.info('dropped')
+            assert logger._HANDLER.dropped == 1
+            handler.gate.set()
+            logger._HANDLER.close()
+        assert handler.records == ['written', 'queued']
+
+    def test_logger_fork(self) -> None:
+        """
+        Assert that a forked child starts its own listener.
+        """
+        log = Logger('fork')
+        log.info('parent')
+        listener = logger._HANDLER._listener
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_end)
+            started = logger._HANDLER._listener is None
+            log.info('child')
+            started = started and logger._HANDLER._listener not in (None, listener)
+            flush_logs()
+            os.write(write_end, b'1' if started else b'0')
+            os._exit(0)
+        os.close(write_end)
+        result = os.read(read_end, 1)
+        os.close(read_end)
+        os.waitpid(pid, 0)
+        assert result == b'1'
+
+
+def make_record(message: str) -> logging.LogRecord:
+    """
+    Create an INFO record with the given message.
+
+    :param message: The message to log.
+    """
+    return logging.LogRecord('test', logging.INFO, __file__, 0, message, None, None)
+
+
+class TestRotatingHandler:
+    """
+    Tests for rotating the log file.
+    """
+
+    def test_rollover_size(self, tmp_path) -> None:
+        """
+        Assert that the log rotates at ``LOG_MAX_BYTES``, keeping at most
+        ``LOG_BACKUP_COUNT`` compressed backups.
+        """
+        log_path = str(tmp_path / 'libcsm.log')
+        message = 'x' * 99
+        with mock.patch('libcsm.logger.LOG_MAX_BYTES', 250), \
+                mock.patch('libcsm.logger.LOG_BACKUP_COUNT', 2):
+            handler = logger._RotatingHandler(log_path)
+            for index in range(8):
+                handler.handle(make_record(f'{index}{message}'))
+            handler.close()
+        assert sorted(os.listdir(tmp_path)) == [
+            'libcsm.log', 'libcsm.log.1.gz', 'libcsm.log.2.gz', 'libcsm.log.lock'
+        ]
+        with open(log_path, encoding='utf-8') as log_file:
+            assert log_file.read().startswith('6')
+        with gzip.open(f'{log_path}.1.gz', 'rt') as log_file:
+            assert log_file.read().startswith('4')
+        with gzip.open(f'{log_path}.2.gz', 'rt') as log_file:
+            assert log_file.read().startswith('2')
+
+    def test_rollover_age(self, tmp_path) -> None:
+        """
+        Assert that the log rotates once the last rollover is older than
+        ``LOG_MAX_AGE``.
+        """
+        log_path = str(tmp_path / 'libcsm.log')
+        handler = logger._RotatingHandler(log_path)
+        handler.handle(make_record('old'))
+        assert not os.path.exists(f'{log_path}.1.gz')
+        handler._rollover_at = time.time() - 1
+        handler.handle(make_record('new'))
+        handler.close()
+        with gzip.open(f'{log_path}.1.gz', 'rt') as log_file:
+            assert log_file.read() == 'old\n'
+        with open(log_path, encoding='utf-8') as log_file:
+            assert log_file.read() == 'new\n'
+        assert handler._rollover_at > time.time()
+
+    def test_rollover_shared(self, tmp_path) -> None:
+        """
+        Assert that a log shared by two writers is rotated once, and the other
+        writer moves to the new file.
+        """
+        log_path = str(tmp_path / 'libcsm.log')
+        with mock.patch('libcsm.logger.LOG_MAX_BYTES', 10):
+            first = logger._RotatingHandler(log_path)
+            second = logger._RotatingHandler(log_path)
+            first.handle(make_record('first'))
+            second.handle(make_record('second'))
+            first.close()
+            second.close()
+        assert not os.path.exists(f'{log_path}.2.gz')
+        with gzip.open(f'{log_path}.1.gz', 'rt') as log_file:
+            assert log_file.read() == 'first\n'
+        first = logger._RotatingHandler(log_path)
+        second = logger._RotatingHandler(log_path)
+        first.doRollover()
+        second.doRollover()
+        second.handle(make_record('third'))
+        first.close()
+        second.close()
+        assert not os.path.exists(f'{log_path}.3.gz')
+        with gzip.open(f'{log_path}.1.gz', 'rt') as log_file:
+            assert log_file.read() == 'second\n'
+        with open(log_path, encoding='utf-8') as log_file:
+            assert log_file.read() == 'third\n'
@@ -25,13 +25,24 @@
 Tests for the ``os`` module.
 """
 from os import getcwd
+import asyncio
+import signal
 from subprocess import Popen
+import os
+import stat
+import time
+import tempfile
 
 import pytest
 import mock
 
 from libcsm.os import run_command
 from libcsm.os import chdir
+from libcsm.os import atomic_write
+from libcsm.os import file_lock
+from libcsm.os import run_commands
+from libcsm.os import run_command_async
+from libcsm.os import stream_command
 
 
 class TestCLI:
@@ -112,3 +123,161 @@ class TestCLI:
         with chdir('/'):
             assert getcwd() == '/'
         assert getcwd() == original
+
+    def test_atomic_write(self) -> None:
+        """
+        Assert that ``atomic_write`` creates missing directories, replaces the
+        file with restricted permissions, and leaves no temporary files behind.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'nested', 'file')
+            atomic_write(path, b'one')
+            with file_lock(f'{path}.lock'):
+                atomic_write(path, b'two')
+            with open(path, 'rb') as handle:
+                assert handle.read() == b'two'
+            assert stat.S_IMODE(os.stat(path).st_mode) == stat.S_IRUSR | stat.S_IWUSR
+            assert sorted(os.listdir(os.path.dirname(path))) == ['file', 'file.lock']
+
+    def test_run_commands(self) -> None:
+        """
+        Assert that ``run_commands`` runs commands concurrently, returning
+        their results in order or as they complete.
+        """
+        sleep = 0.3
+        commands = [['sleep', str(sleep)], ['echo', 'fast'], ['sleep', str(sleep)]]
+        start_time = time.time()
+        results = list(run_commands(commands, concurrency=len(commands), charset='utf-8'))
+        assert time.time() - start_time < 2 * sleep
+        assert [result.args for result in results] == commands
+        assert results[1].stdout == 'fast\n'
+        assert all(result.return_code == 0 and result.duration > self.init for result in results)
+
+        completed = list(run_commands(commands, concurrency=len(commands), ordered=False))
+        assert completed[0].args == ['echo', 'fast']
+
+        with pytest.raises(ValueError):
+            run_commands(commands, concurrency=0)
+
+    def test_run_command_async(self) -> None:
+        """
+        Assert that ``run_command_async`` returns the same results as ``run_command``.
+        """
+        result = asyncio.run(run_command_async(['echo', 'hello'], charset='utf-8'))
+        assert result.stdout == 'hello\n'
+        assert result.return_code == 0
+        assert not result.timed_out
+        assert result.duration > self.init
+        shell_result = asyncio.run(run_command_async(['echo', '$0'], in_shell=True))
+        assert shell_result.stdout
+        bad_result = asyncio.run(run_command_async(['foo!!!']))
+        assert isinstance(bad_result.return_code, int)
+        assert bad_result.stderr
+
+    def test_run_command_async_timeout(self) -> None:
+        """
+        Assert that a command running past its timeout is terminated, and
+        killed if it ignores ``SIGTERM``.
+        """
+        timeout = 0.2
+        result = asyncio.run(run_command_async(['sleep', '10'], timeout=timeout))
+        assert result.timed_out
+        assert result.return_code == -signal.SIGTERM
+        assert result.duration < 10 * timeout
+        with mock.patch('libcsm.os.TERMINATE_GRACE_PERIOD', timeout):
+            result = asyncio.run(run_command_async(
+                ['sh', '-c', 'trap "" TERM; sleep 10; true'], timeout=timeout))
+        assert result.timed_out
+        assert result.return_code == -signal.SIGKILL
+
+    def test_run_command_async_cancel(self) -> None:
+        """
+        Assert that cancelling the caller stops the command, and any process
+        it started, before the cancellation propagates.
+        """
+        timeout = 0.2
+
+        async def cancel() -> None:
+            task = asyncio.ensure_future(run_command_async(['sh', '-c', 'sleep 10; true']))
+            await asyncio.sleep(timeout)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        start_time = time.time()
+        asyncio.run(cancel())
+        assert time.time() - start_time < 10 * timeout
+
+    def test_stream_command(self) -> None:
+        """
+        Assert that ``stdout`` lines are yielded before the command finishes.
+        """
+        sleep = 0.3
+        result = stream_command(['sh', '-c', f'echo first; sleep {sleep}; echo second'])
+        start_time = time.time()
+        lines = []
+        for line in result:
+            lines.append((line, time.time() - start_time))
+        assert [line for line, _ in lines] == [b'first\n', b'second\n']
+        assert lines[0][1] < sleep
+        assert result.return_code == 0
+        assert result.stdout == b'first\nsecond\n'
+        assert result.duration >= sleep
+
+    def test_stream_command_decode(self) -> None:
+        """
+        Assert that streamed lines and captured output are decoded with the
+        given charset.
+        """
+        result = stream_command(['printf', 'caf\u00e9\\n\u00fcber\\n'], charset='utf-8')
+        assert list(result) == ['caf\u00e9\n', '\u00fcber\n']
+        assert result.stdout == 'caf\u00e9\n\u00fcber\n'
+        assert list(result.stdout_lines()) == ['caf\u00e9\n', '\u00fcber\n']
+        bad_result = stream_command(['foo!!!'])
+        assert not list(bad_result)
+        assert isinstance(bad_result.return_code, int)
+        assert bad_result.stderr
+
+    def test_stream_command_spill(self) -> None:
+        """
+        Assert that output beyond ``max_memory`` is spilled to disk and still
+        returned whole.
+        """
+        lines = 1000
+        max_memory = 1024
+        result = run_command(['seq', lines], max_memory=max_memory, charset='utf-8')
+        assert result._stdout_file._rolled
+        assert result.stdout.splitlines() == [str(i) for i in range(1, lines + 1)]
+        assert sum(1 for _ in result.stdout_lines()) == lines
+        err_result = run_command(['sh', '-c', f'seq {lines} >&2'], max_memory=max_memory)
+        assert err_result._stderr_file._rolled
+        assert err_result.stdout == b''
+        assert len(err_result.stderr.splitlines()) == lines
+
+    def test_stream_command_stop(self) -> None:
+        """
+        Assert that breaking out of the stream terminates the command.
+        """
+        result = stream_command(['sh', '-c', 'echo first; exec sleep 10'])
+        start_time = time.time()
+        stream = iter(result)
+        assert next(stream) == b'first\n'
+        stream.close()
+        assert time.time() - start_time < 1
+        assert result.return_code == -signal.SIGTERM
+
+    @pytest.mark.parametrize('in_shell', [False, True])
+    def test_stream_command_stop_group(self, in_shell) -> None:
+        """
+        Assert that breaking out of the stream stops processes the command
+        started, which would otherwise hold its pipes open.
+        """
+        script = 'echo first; sleep 10; true'
+        args = [script] if in_shell else ['sh', '-c', script]
+        result = stream_command(args, in_shell=in_shell)
+        start_time = time.time()
+        for line in result:
+            assert line == b'first\n'
+            break
+        assert time.time() - start_time < 1
+        assert result.return_code == -signal.SIGTERM
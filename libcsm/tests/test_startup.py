@@ -0,0 +1,88 @@
+#
+#  MIT License
+#
+#  (C) Copyright 2023 Hewlett Packard Enterprise Development LP
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a
+#  copy of this software and associated documentation files (the "Software"),
+#  to deal in the Software without restriction, including without limitation
+#  the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#  and/or sell copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included
+#  in all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+#  THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+#  OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+#  ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Startup benchmarks for the console scripts.
+
+Each console script's module is imported in a fresh interpreter with
+``python -X importtime`` to catch changes that pull slow imports back into
+startup.
+"""
+import configparser
+import os
+import subprocess
+import sys
+
+import pytest
+
+ENTRY_POINTS = os.path.join(os.path.dirname(__file__), '..', '..', 'entry_points.ini')
+
+# Dependencies that must only be imported once they are used.
+DEFERRED_MODULES = ('kubernetes', 'boto3', 'botocore')
+
+
+def console_script_modules() -> list:
+    """
+    Get the module of every console script in ``entry_points.ini``.
+    """
+    parser = configparser.ConfigParser()
+    parser.read(ENTRY_POINTS)
+    if not parser.has_section('console_scripts'):
+        return []
+    return sorted({target.split(':')[0].strip() for _, target in parser.items('console_scripts')})
+
+
+def import_times(module: str) -> dict:
+    """
+    Import ``module`` in a new interpreter and return the cumulative import
+    time, in microseconds, of every module it imported.
+
+    :param module: The module to import.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, check=True, text=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestStartup:
+    """
+    Test class for console script startup.
+    """
+
+    @pytest.mark.parametrize('module', console_script_modules())
+    def test_console_script_imports(self, module: str) -> None:
+        """
+        Assert that importing a console script does not import deferred dependencies.
+        """
+        times = import_times(module)
+        assert module in times
+        deferred = sorted(name for name in times if name.split('.')[0] in DEFERRED_MODULES)
+        assert not deferred, f'{module} imports {deferred} at startup'
@@ -61,6 +61,20 @@ def test(session):
     )
 
 
+@nox.session(python='3')
+def importtime(session):
+    """Report how long each console script takes to import."""
+    session.install('.[test]')
+    session.install('.')
+    session.run(
+        'python',
+        '-c',
+        'from libcsm.tests.test_startup import console_script_modules, import_times\n'
+        'for module in console_script_modules():\n'
+        '    print(f"{module}: {import_times(module)[module] / 1000:.1f} ms")',
+    )
+
+
 @nox.session(python='3')
 def lint(session):
     """Run flake8 linter and plugins."""